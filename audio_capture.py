@@ -0,0 +1,171 @@
+# audio_capture.py
+from threading import Thread, Condition
+
+import speech_recognition as sr
+
+
+class CaptureStopped(OSError):
+    """The capture thread has ended and every captured byte was read"""
+
+    def __init__(self, error=None):
+        super().__init__(f"microphone capture stopped: {error}" if error else "microphone capture stopped")
+        self.error = error  # Why the microphone thread died, None after stop()
+
+
+class AudioRingBuffer:
+    """Fixed-size PCM ring addressed by absolute byte offsets.
+
+    The writer never blocks; a reader that falls more than `capacity` bytes
+    behind loses the oldest audio and the gap is counted as an overrun.
+    """
+
+    def __init__(self, capacity):
+        self.capacity = capacity
+        self._buf = bytearray(capacity)
+        self._cond = Condition()
+        self.written = 0  # Total bytes ever written
+        self.closed = False
+
+    def write(self, data):
+        size = len(data)
+        data = memoryview(data)[-self.capacity:]
+        with self._cond:
+            start = (self.written + size - len(data)) % self.capacity
+            first = min(len(data), self.capacity - start)
+            self._buf[start:start + first] = data[:first]
+            self._buf[:len(data) - first] = data[first:]
+            self.written += size
+            self._cond.notify_all()
+
+    def read(self, offset, size, timeout=None):
+        """Bytes [offset, offset + size) once available.
+
+        Returns (data, next_offset, lost_bytes). `data` is shorter than
+        `size` only on timeout or after close().
+        """
+        with self._cond:
+            self._cond.wait_for(lambda: self.written >= offset + size or self.closed, timeout)
+            lost = max(0, self.written - self.capacity - offset)
+            offset += lost
+            end = max(offset, min(offset + size, self.written))
+            start, stop = offset % self.capacity, end % self.capacity
+            if end - offset == 0:
+                data = b''
+            elif start < stop:
+                data = bytes(self._buf[start:stop])
+            else:
+                data = bytes(self._buf[start:]) + bytes(self._buf[:stop])
+            return data, end, lost
+
+    def close(self):
+        with self._cond:
+            self.closed = True
+            self._cond.notify_all()
+
+
+class _RingStream:
+    """The subset of the PyAudio stream API that speech_recognition uses"""
+
+    def __init__(self, source):
+        self.source = source
+
+    def read(self, frames, exception_on_overflow=False):
+        return self.source.read_bytes(frames * self.source.SAMPLE_WIDTH)
+
+
+class RingBufferSource(sr.AudioSource):
+    """Reads captured audio from the ring as if it were the microphone.
+
+    Works with Recognizer.listen / adjust_for_ambient_noise and with
+    SpeechProcessor.stream_transcribe, so callers never touch the device.
+    Once capture has stopped and the ring is drained, reads raise
+    CaptureStopped.
+    """
+
+    def __init__(self, capture):
+        self.capture = capture
+        self.SAMPLE_RATE = capture.SAMPLE_RATE
+        self.SAMPLE_WIDTH = capture.SAMPLE_WIDTH
+        self.CHUNK = capture.CHUNK
+        self.offset = capture.ring.written  # Start at "now"
+        self.stream = _RingStream(self)
+        self.overruns = 0
+        self.lost_bytes = 0
+        self.max_lag = 0
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        pass
+
+    def read_bytes(self, size):
+        ring = self.capture.ring
+        self.max_lag = max(self.max_lag, ring.written - self.offset)
+        data, self.offset, lost = ring.read(self.offset, size, timeout=2.0)
+        if lost:
+            self.overruns += 1
+            self.lost_bytes += lost
+        if not data and ring.closed:
+            # Padding with silence here would spin listen() forever
+            raise CaptureStopped(self.capture.error)
+        if len(data) < size:
+            # Keep the consumer's framing intact on a stall or shutdown
+            data += b'\0' * (size - len(data))
+        return data
+
+    @property
+    def lag(self):
+        """Seconds of captured audio not read yet"""
+        return (self.capture.ring.written - self.offset) / (self.SAMPLE_RATE * self.SAMPLE_WIDTH)
+
+
+class MicrophoneCapture(Thread):
+    """Reads the microphone on its own thread into an AudioRingBuffer"""
+
+    def __init__(self, microphone, seconds=30.0):
+        super().__init__(daemon=True)
+        self.microphone = microphone
+        self.SAMPLE_RATE = microphone.SAMPLE_RATE
+        self.SAMPLE_WIDTH = microphone.SAMPLE_WIDTH
+        self.CHUNK = microphone.CHUNK
+        self.ring = AudioRingBuffer(int(seconds * self.SAMPLE_RATE) * self.SAMPLE_WIDTH)
+        self.running = True
+        self.error = None
+        self.readers = []
+
+    def run(self):
+        try:
+            with self.microphone as source:
+                while self.running:
+                    self.ring.write(source.stream.read(source.CHUNK))
+        except Exception as e:
+            self.error = e
+        finally:
+            self.ring.close()
+
+    def reader(self):
+        """A new independent RingBufferSource positioned at the live edge"""
+        source = RingBufferSource(self)
+        self.readers.append(source)
+        return source
+
+    def stop(self):
+        self.running = False
+        if self.is_alive():
+            self.join(timeout=1.0)
+        self.ring.close()
+
+    def stats(self):
+        bytes_per_second = self.SAMPLE_RATE * self.SAMPLE_WIDTH
+        return {
+            'captured_seconds': self.ring.written / bytes_per_second,
+            'overruns': sum(r.overruns for r in self.readers),
+            'lost_seconds': sum(r.lost_bytes for r in self.readers) / bytes_per_second,
+            'max_lag_seconds': max((r.max_lag for r in self.readers), default=0) / bytes_per_second,
+        }
+
+    def stats_summary(self):
+        s = self.stats()
+        return (f"Mic: {s['captured_seconds']:.0f} s captured, {s['overruns']} overruns "
+                f"({s['lost_seconds']:.1f} s lost), max backlog {s['max_lag_seconds']:.1f} s")
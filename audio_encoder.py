@@ -0,0 +1,65 @@
+# audio_encoder.py
+import shutil
+import subprocess
+import time
+
+import speech_recognition as sr
+
+# RecognitionConfig.AudioEncoding names for each encoder setting
+ENCODINGS = {
+    'linear16': 'LINEAR16',
+    'flac': 'FLAC',
+    'ogg_opus': 'OGG_OPUS',
+}
+# Opus only runs at these rates
+OPUS_RATES = (8000, 12000, 16000, 24000, 48000)
+
+
+class AudioEncoder:
+    """Encodes mono 16-bit PCM for upload, optionally downsampling first.
+
+    'flac' is lossless and uses the encoder bundled with speech_recognition.
+    'ogg_opus' pipes through ffmpeg (libopus); without ffmpeg it falls back
+    to FLAC.
+    """
+
+    def __init__(self, encoding='flac', sample_rate=16000, opus_bitrate='24k'):
+        if encoding not in ENCODINGS:
+            raise ValueError(f"Unknown encoding {encoding!r}, expected one of {list(ENCODINGS)}")
+        if encoding == 'ogg_opus' and not shutil.which('ffmpeg'):
+            print("ffmpeg not found, using FLAC instead of Opus")
+            encoding = 'flac'
+        self.encoding = encoding
+        self.sample_rate = sample_rate
+        self.opus_bitrate = opus_bitrate
+        self.encode_seconds = 0.0
+
+    def _target_rate(self, rate):
+        target = min(rate, self.sample_rate) if self.sample_rate else rate
+        if self.encoding == 'ogg_opus':
+            target = min((r for r in OPUS_RATES if r >= target), default=OPUS_RATES[-1])
+        return target
+
+    def encode(self, pcm, rate):
+        """(payload, RecognitionConfig encoding name, sample rate) for raw PCM"""
+        start = time.perf_counter()
+        target = self._target_rate(rate)
+        audio = sr.AudioData(pcm, rate, 2)
+        if self.encoding == 'flac':
+            payload = audio.get_flac_data(convert_rate=target, convert_width=2)
+        elif self.encoding == 'ogg_opus':
+            payload = self._encode_opus(audio.get_raw_data(convert_rate=target, convert_width=2), target)
+        else:
+            payload = audio.get_raw_data(convert_rate=target, convert_width=2)
+        self.encode_seconds += time.perf_counter() - start
+        return payload, ENCODINGS[self.encoding], target
+
+    def _encode_opus(self, pcm, rate):
+        result = subprocess.run(
+            ['ffmpeg', '-hide_banner', '-loglevel', 'error',
+             '-f', 's16le', '-ar', str(rate), '-ac', '1', '-i', 'pipe:0',
+             '-c:a', 'libopus', '-b:a', self.opus_bitrate, '-application', 'voip',
+             '-f', 'ogg', 'pipe:1'],
+            input=pcm, stdout=subprocess.PIPE, stderr=subprocess.PIPE, check=True
+        )
+        return result.stdout
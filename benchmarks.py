@@ -0,0 +1,811 @@
+# benchmarks.py
+"""Micro-benchmarks for the hot paths. Run `python benchmarks.py <name> -h`."""
+import argparse
+import random
+import struct
+import time
+from types import SimpleNamespace
+
+
+def _time_per_call(fn, iterations):
+    """Mean wall time of fn() in microseconds"""
+    fn()  # Warm up caches / lazy imports
+    start = time.perf_counter()
+    for _ in range(iterations):
+        fn()
+    return (time.perf_counter() - start) / iterations * 1e6
+
+
+def _report(title, rows):
+    print(title)
+    width = max(len(name) for name, _ in rows)
+    for name, value in rows:
+        print(f"  {name:<{width}}  {value}")
+
+
+# ---------------------------------------------------------------- landmarks
+
+def _legacy_gesture_features(landmarks):
+    """Per-attribute feature extraction as FaceController used to do it"""
+    import numpy as np
+
+    def ear(indices):
+        p = [landmarks[i] for i in indices]
+        v1 = np.linalg.norm([p[1].x - p[5].x, p[1].y - p[5].y])
+        v2 = np.linalg.norm([p[2].x - p[4].x, p[2].y - p[4].y])
+        h = np.linalg.norm([p[0].x - p[3].x, p[0].y - p[3].y])
+        return (v1 + v2) / (2 * h)
+
+    avg_ear = (ear([362, 385, 387, 263, 373, 380]) + ear([33, 160, 158, 133, 153, 144])) / 2
+    left = landmarks[362].y - np.mean([landmarks[i].y for i in [276, 283, 282, 295, 285]])
+    right = landmarks[133].y - np.mean([landmarks[i].y for i in [46, 53, 52, 65, 55]])
+    mouth = abs(landmarks[13].y - landmarks[14].y)
+    eye_x = (landmarks[362].x + landmarks[133].x) / 2
+    eye_y = (landmarks[362].y + landmarks[133].y) / 2
+    return avg_ear, left, right, mouth, eye_x, eye_y
+
+
+def _landmark_list(landmarks):
+    """A NormalizedLandmarkList for the given points, real or wire-compatible"""
+    try:
+        from mediapipe.framework.formats import landmark_pb2
+        msg = landmark_pb2.NormalizedLandmarkList()
+        for lm in landmarks:
+            msg.landmark.add(x=lm.x, y=lm.y, z=lm.z)
+        return msg
+    except ImportError:
+        raw = b"".join(b"\x0a\x0f" + struct.pack("<BfBfBf", 0x0d, lm.x, 0x15, lm.y, 0x1d, lm.z)
+                       for lm in landmarks)
+        return SimpleNamespace(landmark=landmarks, SerializeToString=lambda: raw)
+
+
+def bench_landmarks(args):
+    from landmark_features import LandmarkFeatures, NUM_LANDMARKS
+
+    rng = random.Random(0)
+    landmarks = [SimpleNamespace(x=rng.random(), y=rng.random(), z=rng.random())
+                 for _ in range(NUM_LANDMARKS)]
+    face = _landmark_list(landmarks)
+    landmarks = face.landmark
+    features = LandmarkFeatures()
+    features.update(face)
+
+    legacy = _legacy_gesture_features(landmarks)
+    vectorized = (features.avg_ear, features.brow_left, features.brow_right,
+                  features.mouth_open, features.eye_x, features.eye_y)
+    max_err = max(abs(a - b) for a, b in zip(legacy, vectorized))
+
+    _report(f"Landmark features ({args.iterations} iterations, max abs error {max_err:.2e})", [
+        ("legacy per-attribute", f"{_time_per_call(lambda: _legacy_gesture_features(landmarks), args.iterations):8.1f} us/frame"),
+        ("vectorized update(message)", f"{_time_per_call(lambda: features.update(face), args.iterations):8.1f} us/frame"),
+        ("vectorized update(sequence)", f"{_time_per_call(lambda: features.update(landmarks), args.iterations):8.1f} us/frame"),
+        ("  compute() only", f"{_time_per_call(features.compute, args.iterations):8.1f} us/frame"),
+    ])
+
+
+# --------------------------------------------------------------- preprocess
+
+def _load_frames(args):
+    import cv2
+    import numpy as np
+
+    if args.clip:
+        cap = cv2.VideoCapture(args.clip)
+        frames = []
+        while len(frames) < args.frames:
+            ret, frame = cap.read()
+            if not ret:
+                break
+            frames.append(frame)
+        cap.release()
+        if not frames:
+            raise SystemExit(f"Could not read frames from {args.clip}")
+        return frames
+    w, h = (int(v) for v in args.synthetic.split("x"))
+    rng = np.random.default_rng(0)
+    return [rng.integers(0, 256, (h, w, 3), dtype=np.uint8) for _ in range(args.frames)]
+
+
+def _profile_frames(fn, frames):
+    """Per-frame mean time (ms) and peak traced allocation (bytes)"""
+    import tracemalloc
+
+    fn(frames[0])
+    tracemalloc.start()
+    peak = 0
+    for frame in frames:
+        tracemalloc.reset_peak()
+        before = tracemalloc.get_traced_memory()[0]
+        out = fn(frame)
+        peak = max(peak, tracemalloc.get_traced_memory()[1] - before)
+        del out
+    tracemalloc.stop()
+    # Timing without tracemalloc overhead
+    start = time.perf_counter()
+    for frame in frames:
+        fn(frame)
+    return (time.perf_counter() - start) / len(frames) * 1000, peak
+
+
+def bench_preprocess(args):
+    import cv2
+    from frame_preprocessor import FramePreprocessor
+
+    frames = _load_frames(args)
+    frame_bytes = frames[0].nbytes
+    preprocessor = FramePreprocessor()
+
+    rows = []
+    for name, fn in (
+        ("flip + cvtColor (old)", lambda f: cv2.cvtColor(cv2.flip(f, 1), cv2.COLOR_BGR2RGB)),
+        ("FramePreprocessor", preprocessor.to_rgb),
+        ("FramePreprocessor 0.5x", lambda f: preprocessor.to_rgb(f, 0.5)),
+    ):
+        ms, peak = _profile_frames(fn, frames)
+        rows.append((name, f"{ms:6.2f} ms/frame, {peak / frame_bytes:4.1f} frame buffers "
+                           f"allocated ({peak / 1024:.0f} KiB peak)"))
+    h, w = frames[0].shape[:2]
+    _report(f"Frame preprocessing ({len(frames)} frames of {w}x{h})", rows)
+
+
+# ---------------------------------------------------------------- wakeword
+
+def bench_wakeword(args):
+    import glob
+    import os
+    from wake_word import WakeWordDetector, read_wav
+
+    detector = WakeWordDetector(args.templates, threshold=args.threshold)
+    if not detector.ready:
+        raise SystemExit(f"Need at least two enrolled .wav samples in {args.templates}")
+
+    def run(directory):
+        hits, latencies = 0, []
+        cpu_start = time.process_time()
+        audio_seconds = 0.0
+        for path in sorted(glob.glob(os.path.join(directory, "*.wav"))):
+            samples = read_wav(path)
+            audio_seconds += len(samples) / 16000
+            start = time.perf_counter()
+            score = detector.score(samples)
+            latencies.append((time.perf_counter() - start) * 1000)
+            hits += score is not None and score <= detector.threshold
+        cpu = time.process_time() - cpu_start
+        return hits, len(latencies), latencies, cpu, audio_seconds
+
+    rows = []
+    for label, directory in (("positives", args.positives), ("negatives", args.negatives)):
+        if not directory:
+            continue
+        hits, total, latencies, cpu, audio_seconds = run(directory)
+        if not total:
+            continue
+        rate = "detection rate" if label == "positives" else "false-accept rate"
+        rows.append((label, f"{total} clips, {rate} {hits / total:.1%}, "
+                            f"latency {sum(latencies) / total:.1f} ms mean / {max(latencies):.1f} ms max, "
+                            f"CPU {cpu / audio_seconds:.1%} of real time"))
+    _report(f"Wake word ({len(detector.templates)} templates, threshold {detector.threshold:.3f})", rows)
+
+
+# ---------------------------------------------------------------- encoding
+
+def bench_encoding(args):
+    import wave
+    from audio_encoder import AudioEncoder
+
+    clips = []
+    for path in args.wavs:
+        with wave.open(path, "rb") as wav:
+            if wav.getsampwidth() != 2 or wav.getnchannels() != 1:
+                raise SystemExit(f"{path}: expected mono 16-bit PCM")
+            clips.append((wav.readframes(wav.getnframes()), wav.getframerate()))
+    raw_bytes = sum(len(pcm) for pcm, _ in clips)
+    audio_seconds = sum(len(pcm) / 2 / rate for pcm, rate in clips)
+
+    rows = [("wav (before)", f"{raw_bytes / 1024:.1f} KB, "
+                             f"upload {raw_bytes * 8 / args.uplink:.0f} ms @ {args.uplink} kbps")]
+    for encoding in ("linear16", "flac", "ogg_opus"):
+        for rate in (None, 16000):
+            encoder = AudioEncoder(encoding, sample_rate=rate)
+            if encoder.encoding != encoding:
+                continue  # Opus without ffmpeg
+            size = sum(len(encoder.encode(pcm, clip_rate)[0]) for pcm, clip_rate in clips)
+            label = f"{encoding} @ {rate or 'native'}"
+            rows.append((label, f"{size / 1024:.1f} KB ({size / raw_bytes:.0%}), "
+                                f"encode {encoder.encode_seconds / audio_seconds * 1000:.1f} ms per audio s, "
+                                f"upload {size * 8 / args.uplink:.0f} ms @ {args.uplink} kbps"))
+    _report(f"Speech upload encoding ({len(clips)} clips, {audio_seconds:.1f} s audio)", rows)
+
+
+# ---------------------------------------------------------------- pipeline
+
+def bench_pipeline(args):
+    from command_pipeline import CommandPipeline
+
+    def plan(transcript):
+        time.sleep(args.plan_ms / 1000)
+        return [{"command": "sleep", "parameters": {"duration": args.exec_ms / 1000}}]
+
+    def execute(job):
+        for cmd in job.steps() if hasattr(job, "steps") else job.commands:
+            time.sleep(cmd["parameters"]["duration"])
+
+    transcripts = [f"request {i}" for i in range(args.requests)]
+
+    start = time.perf_counter()
+    for transcript in transcripts:
+        execute(SimpleNamespace(commands=plan(transcript)))
+    sequential = time.perf_counter() - start
+
+    order = []
+    pipeline = CommandPipeline(plan, lambda job: (execute(job), order.append(job.seq))).start()
+    start = time.perf_counter()
+    jobs = [pipeline.submit(t) for t in transcripts]
+    while pipeline.busy:
+        time.sleep(0.001)
+    pipelined = time.perf_counter() - start
+    pipeline.stop()
+    assert order == [job.seq for job in jobs], "jobs executed out of order"
+
+    _report(f"Back-to-back requests ({args.requests} x {args.plan_ms} ms planning + {args.exec_ms} ms execution)", [
+        ("sequential", f"{sequential:6.2f} s, {args.requests / sequential:5.2f} req/s"),
+        ("pipelined", f"{pipelined:6.2f} s, {args.requests / pipelined:5.2f} req/s "
+                      f"({sequential / pipelined:.2f}x)"),
+    ])
+
+
+# ------------------------------------------------------------------ intents
+
+def bench_intents(args):
+    from intent_parser import IntentParser
+
+    with open(args.corpus, encoding="utf-8") as f:
+        corpus = [line.strip() for line in f if line.strip() and not line.startswith("#")]
+    if not corpus:
+        raise SystemExit(f"No transcripts in {args.corpus}")
+
+    parser = IntentParser()
+    misses = [text for text in corpus if parser.parse(text) is None]
+    hits = len(corpus) - len(misses)
+    per_call = _time_per_call(lambda: [parser.parse(text) for text in corpus], args.iterations) / len(corpus)
+    llm_seconds = len(misses) * args.llm_ms / 1000
+
+    _report(f"Local intent parser ({len(corpus)} transcripts from {args.corpus})", [
+        ("local hits", f"{hits} ({hits / len(corpus):.1%}), {per_call:.1f} us per transcript"),
+        ("LLM fallbacks", f"{len(misses)} ({len(misses) / len(corpus):.1%})"),
+        ("planning time", f"{llm_seconds:.1f} s with fast path vs "
+                          f"{len(corpus) * args.llm_ms / 1000:.1f} s all-LLM @ {args.llm_ms} ms"),
+    ])
+    for text in misses[:args.show_misses]:
+        print(f"  miss: {text}")
+
+
+# -------------------------------------------------------------------- fuzzy
+
+def _synthetic_utterances(count, rng):
+    verbs = ["open", "close", "launch", "show", "find", "search for", "create", "delete",
+             "play", "send", "switch to", "go to", "rename", "download", "share"]
+    things = ["notepad", "the report", "gmail", "my calendar", "spotify", "the budget sheet",
+              "downloads folder", "a new document", "settings", "chrome", "the invoice",
+              "last email", "slack", "the presentation", "photos", "terminal"]
+    extras = ["", " in chrome", " on the desktop", " from yesterday", " for john", " now",
+              " in a new tab", " and maximize it", " with dark mode", " quickly"]
+    words = ["alpha", "beta", "gamma", "delta", "omega", "kilo", "zulu", "nova", "atlas", "echo"]
+    return [f"{rng.choice(verbs)} {rng.choice(things)}{rng.choice(extras)} "
+            f"{rng.choice(words)}{rng.randrange(1000)}" for _ in range(count)]
+
+
+def bench_fuzzy(args):
+    import statistics
+    from plan_index import FuzzyPlanIndex
+
+    rng = random.Random(0)
+    paraphrase = {"open": "launch", "launch": "open the", "close": "quit", "go to": "visit"}
+    rows = []
+    for size in args.sizes:
+        utterances = _synthetic_utterances(size, rng)
+        index = FuzzyPlanIndex(threshold=args.threshold)
+        start = time.perf_counter()
+        index.add_many((text, "Chrome_WidgetWin_1") for text in utterances)
+        build = time.perf_counter() - start
+
+        queries = []
+        for text in rng.sample(utterances, min(args.queries, size)):
+            verb = next((v for v in paraphrase if text.startswith(v + " ")), None)
+            queries.append((text, f"please {paraphrase[verb]}{text[len(verb):]}" if verb else f"{text} please"))
+
+        latencies, found = [], 0
+        for original, query in queries:
+            start = time.perf_counter()
+            match = index.search(query, "Chrome_WidgetWin_1")
+            latencies.append((time.perf_counter() - start) * 1000)
+            found += match is not None and match[0] == original
+        latencies.sort()
+        rows.append((f"{size} entries", f"build {build:5.2f} s, query {statistics.mean(latencies):6.2f} ms mean / "
+                                        f"{latencies[int(len(latencies) * 0.95)]:6.2f} ms p95, "
+                                        f"paraphrase recall {found / len(queries):.0%}"))
+    _report(f"Fuzzy plan index (threshold {args.threshold}, {args.queries} paraphrased queries)", rows)
+
+
+# -------------------------------------------------------------------- julep
+
+def bench_julep(args):
+    import statistics
+    from execution_waiter import Backoff, ExecutionTimeout, wait_for_execution
+    from fake_julep import FakeJulep
+
+    def legacy_wait(client, execution_id, **kwargs):
+        while True:
+            result = client.executions.get(execution_id)
+            if result.status in ['succeeded', 'failed']:
+                return result
+            time.sleep(0.5)
+
+    modes = [
+        ("fixed 0.5 s polling (old)", False, legacy_wait),
+        ("backoff polling", False, lambda c, e, **kw: wait_for_execution(c, e, stream=False, **kw)),
+        ("status stream", True, wait_for_execution),
+    ]
+    rows = []
+    for name, stream, wait in modes:
+        client = FakeJulep(latency=(args.min_latency, args.max_latency), stream=stream, seed=0)
+        overheads, timeouts = [], 0
+        for _ in range(args.requests):
+            execution = client.executions.create(task_id="task-fake", input={"prompt": "save"})
+            done_at = client.executions._runs[execution.id]['done_at']
+            try:
+                wait(client, execution.id, deadline=args.deadline, backoff=Backoff())
+                overheads.append((time.perf_counter() - done_at) * 1000)
+            except ExecutionTimeout:
+                timeouts += 1
+        gets = client.gets / args.requests
+        rows.append((name, f"{statistics.mean(overheads) if overheads else 0:6.1f} ms mean added latency, "
+                           f"{max(overheads, default=0):6.1f} ms max, {gets:4.1f} gets/request, "
+                           f"{timeouts} deadline fallbacks"))
+    _report(f"Planner completion ({args.requests} requests, {args.min_latency}-{args.max_latency} s "
+            f"simulated latency, {args.deadline} s deadline)", rows)
+
+
+# --------------------------------------------------------------- planstream
+
+def bench_planstream(args):
+    import json
+    from plan_stream import iter_plan
+
+    plan = [{"command": "press_keys", "parameters": {"keys": ["ctrl", "t"]}},
+            {"command": "type_text", "parameters": {"text": "weather in berlin tomorrow"}},
+            {"command": "press_keys", "parameters": {"keys": ["enter"]}},
+            {"command": "sleep", "parameters": {"duration": 0.3}}] * (args.steps // 4)
+    response = "Here is the plan:\n```json\n" + json.dumps(plan) + "\n```"
+    # ~4 characters per token
+    chunk_delay = 4 / args.tokens_per_second
+
+    def stream():
+        for i in range(0, len(response), 4):
+            time.sleep(chunk_delay)
+            yield response[i:i + 4]
+
+    start = time.perf_counter()
+    whole = "".join(stream())
+    text = whole.replace("```json", "").replace("```", "").strip()
+    json.loads(text[text.find("["):text.rfind("]") + 1])
+    buffered = time.perf_counter() - start
+
+    start = time.perf_counter()
+    first = None
+    count = 0
+    for _ in iter_plan(stream()):
+        count += 1
+        if first is None:
+            first = time.perf_counter() - start
+    total = time.perf_counter() - start
+
+    _report(f"Streamed plan ({count} steps, {len(response)} chars at {args.tokens_per_second} tokens/s)", [
+        ("json.loads after full response", f"first step after {buffered * 1000:6.0f} ms"),
+        ("incremental parser", f"first step after {first * 1000:6.0f} ms, last after {total * 1000:6.0f} ms"),
+    ])
+
+
+# ----------------------------------------------------------------- backends
+
+def bench_backends(args):
+    import statistics
+    import requests
+    from llm_backends import GeminiBackend, HedgedBackend, OpenAICompatibleBackend
+    from mock_llm_server import serve
+    from plan_stream import iter_plan
+
+    fast = serve(port=0, latency=args.latency, tokens_per_second=args.tokens_per_second)
+    slow = serve(port=0, latency=args.latency * 4, tokens_per_second=args.tokens_per_second)
+    base = f"http://127.0.0.1:{fast.server_address[1]}"
+    prompt = "Request: open notepad"
+
+    class FreshSession:
+        """One connection per request, like calling requests.post() directly"""
+
+        def post(self, *a, **kw):
+            with requests.Session() as session:
+                response = session.post(*a, **kw)
+                response.content  # Read it all before the connection closes
+                return response
+
+    def run(backend):
+        firsts, totals = [], []
+        for _ in range(args.requests):
+            start = time.perf_counter()
+            first = None
+            for _ in iter_plan(backend.stream(prompt)):
+                if first is None:
+                    first = time.perf_counter() - start
+            firsts.append(first * 1000)
+            totals.append((time.perf_counter() - start) * 1000)
+        return (f"{statistics.mean(firsts):6.1f} ms to first step, "
+                f"{statistics.mean(totals):6.1f} ms mean, {max(totals):6.1f} ms max")
+
+    gemini_url = base + "/v1beta/models/mock:generateContent"
+    rows = [
+        ("openai, new connection per call", run(OpenAICompatibleBackend(base + "/v1", "mock", session=FreshSession()))),
+        ("openai, pooled keep-alive", run(OpenAICompatibleBackend(base + "/v1", "mock"))),
+        ("gemini, pooled keep-alive", run(GeminiBackend(gemini_url, "mock"))),
+    ]
+
+    def valid(text):
+        return any(True for _ in iter_plan([text]))
+
+    slow_backend = OpenAICompatibleBackend(f"http://127.0.0.1:{slow.server_address[1]}/v1", "slow")
+    fast_backend = OpenAICompatibleBackend(base + "/v1", "fast")
+    slow_backend.name, fast_backend.name = 'slow', 'fast'
+    hedged = HedgedBackend([slow_backend, fast_backend], valid, delay=args.hedge_delay)
+    rows.append((f"slow only ({args.latency * 4:.2f} s first token)", run(slow_backend)))
+    rows.append((f"hedged slow+fast after {args.hedge_delay} s", run(hedged) + f", wins {hedged.wins}"))
+    _report(f"LLM backends against the mock server ({args.requests} requests, "
+            f"{args.latency} s latency, {args.tokens_per_second} tokens/s)", rows)
+    fast.shutdown()
+    slow.shutdown()
+
+
+# ------------------------------------------------------------------ windows
+
+def bench_windows(args):
+    from window_utils import (WindowInfo, WindowRegistry, enumerate_windows, get_active_window,
+                              get_active_window_class, get_all_open_windows)
+
+    def timed(fn):
+        start = time.perf_counter()
+        for _ in range(args.iterations):
+            fn()
+        return (time.perf_counter() - start) / args.iterations * 1e6
+
+    if args.synthetic:
+        # Platform-independent: the enumeration itself is the per-call path
+        windows = [WindowInfo(i, 1000 + i, f"Window {i} - App{i % 7}", f"App{i % 7}")
+                   for i in range(args.synthetic)]
+
+        def enumerate():
+            return [WindowInfo(*w) for w in windows], 0
+
+        per_call = [("enumerate per query", lambda: enumerate())]
+        label = f"{args.synthetic} synthetic windows"
+    else:
+        enumerate = enumerate_windows
+        per_call = [("get_active_window()", get_active_window),
+                    ("get_active_window_class()", get_active_window_class),
+                    ("get_all_open_windows()", get_all_open_windows)]
+        label = f"{len(enumerate()[0])} windows"
+
+    rows = [(name, f"{timed(fn):9.1f} us/query") for name, fn in per_call]
+    for max_age in args.max_ages:
+        registry = WindowRegistry(max_age=max_age, enumerate=enumerate)
+        rows.append((f"registry, max_age {max_age}s, title",
+                     f"{timed(registry.active_title):9.1f} us/query ({registry.stats['refreshes']} refreshes)"))
+        rows.append((f"registry, max_age {max_age}s, all titles", f"{timed(registry.titles):9.1f} us/query"))
+    _report(f"Window queries ({label}, {args.iterations} queries back to back)", rows)
+
+
+# ----------------------------------------------------------------- executor
+
+def bench_executor(args):
+    import threading
+    from plan_compiler import PlanCompiler
+    from plan_executor import PlanExecutor
+    from window_events import WindowWatcher
+    from window_utils import WindowInfo, WindowRegistry
+
+    settings = {'launch_timeout': 7.0, 'page_timeout': 1.5, 'focus_timeout': 0.3,
+                'input_settle': 0.05, 'clipboard_timeout': 0.5, 'poll_interval': 0.02}
+    plan = [
+        {"command": "run_command", "parameters": {"command": "start notepad"}},
+        {"command": "sleep", "parameters": {"duration": 2}},
+        {"command": "type_text", "parameters": {"text": "meeting notes"}},
+        {"command": "press_keys", "parameters": {"keys": ["ctrl", "s"]}},
+        {"command": "open_url", "parameters": {"url": "https://www.google.com"}},
+        {"command": "left_click"},
+        {"command": "type_text", "parameters": {"text": "AI trends"}},
+        {"command": "press_keys", "parameters": {"keys": ["enter"]}},
+    ]
+
+    def simulated_desktop():
+        """Actions with app-launch / page-load delays, visible through events and the registry"""
+        watcher = WindowWatcher()  # Events are emitted by hand, no platform thread
+        windows = {1: WindowInfo(1, 100, "Desktop", "Shell")}
+        focus = [1]
+
+        def open_window(handle, title):
+            windows[handle] = WindowInfo(handle, 200 + handle, title, "App")
+            focus[0] = handle
+            watcher._emit('created', handle, 200 + handle, title, "App")
+            watcher._emit('focus', handle, 200 + handle, title, "App")
+
+        def retitle(handle, title):
+            windows[handle] = windows[handle]._replace(title=title)
+            watcher._emit('title', handle, 200 + handle, title, "App")
+
+        def run_command(**kw):
+            threading.Timer(args.launch_ms / 1000, open_window, (2, "Untitled - Notepad")).start()
+
+        def open_url(**kw):
+            open_window(3, "New Tab - Browser")
+            threading.Timer(args.page_ms / 1000, retitle, (3, "Google - Browser")).start()
+
+        noop = lambda **kw: None
+        actions = {'run_command': run_command, 'open_url': open_url, 'type_text': noop,
+                   'press_keys': noop, 'left_click': noop, 'sleep': lambda duration=1, **kw: time.sleep(duration)}
+        registry = WindowRegistry(max_age=1.0, enumerate=lambda: (list(windows.values()), focus[0]))
+        return actions, watcher, registry, lambda: {w.title for w in windows.values()}
+
+    def legacy_run(actions, titles):
+        """The fixed-delay loop execute_commands used before"""
+        skip_long_sleep = False
+        for cmd in plan:
+            name, params = cmd["command"], cmd.get("parameters", {})
+            if skip_long_sleep and name == "sleep" and float(params.get("duration", 0)) > 0.5:
+                skip_long_sleep = False
+                continue
+            skip_long_sleep = False
+            before = titles()
+            start = time.time()
+            actions[name](**params)
+            exec_time = time.time() - start
+            if name == "run_command":
+                while time.time() - start < 7:
+                    if titles() - before:
+                        time.sleep(0.5)
+                        skip_long_sleep = True
+                        break
+                    time.sleep(0.1)
+            if name != "sleep":
+                time.sleep(max(0, 0.3 - exec_time))
+            if name == "open_url":
+                time.sleep(1.5)
+
+    actions, watcher, registry, titles = simulated_desktop()
+    start = time.perf_counter()
+    legacy_run(actions, titles)
+    legacy = time.perf_counter() - start
+
+    actions, watcher, registry, titles = simulated_desktop()
+    executor = PlanExecutor(actions, watcher, registry, settings, log=lambda message: None)
+    timeline = executor.run(PlanCompiler(actions).stream(plan))
+
+    _report(f"Plan execution ({len(plan)} steps, app starts in {args.launch_ms} ms, "
+            f"page loads in {args.page_ms} ms)", [
+        ("fixed delays (old)", f"{legacy:5.2f} s"),
+        ("readiness waits", f"{timeline.total:5.2f} s ({legacy / timeline.total:.1f}x faster)"),
+    ])
+    print(timeline.format())
+
+
+# ------------------------------------------------------------------- typing
+
+def bench_typing(args):
+    from text_injection import STRATEGIES, TextInjector
+
+    class SimulatedKeyboard:
+        """Costs one OS input event per key down/up, like SendInput"""
+
+        def write(self, text, delay=0):
+            for _ in text:
+                time.sleep(args.event_us * 2 / 1e6)
+                if delay:
+                    time.sleep(delay)
+
+        def send(self, hotkey):
+            time.sleep(args.event_us * 2 * len(hotkey.split('+')) / 1e6)
+
+    class SimulatedClipboard:
+        def __init__(self):
+            self.text = "previous clipboard"
+
+        def paste(self):
+            time.sleep(args.clipboard_us / 1e6)
+            return self.text
+
+        def copy(self, text):
+            time.sleep(args.clipboard_us / 1e6)
+            self.text = text
+
+    if args.real:
+        print("Typing into the focused window in 3 s...")
+        time.sleep(3)
+        keyboard = clipboard = None
+    else:
+        keyboard, clipboard = SimulatedKeyboard(), SimulatedClipboard()
+
+    settings = {'paste_min_chars': 40, 'paced_delay': 0.05, 'restore_delay': 0.15, 'window_overrides': {}}
+    rows = []
+    for length in args.lengths:
+        text = ("The quick brown fox jumps over the lazy dog. " * (length // 45 + 1))[:length]
+        for strategy in STRATEGIES:
+            if strategy == 'paced' and length > args.max_paced:
+                rows.append((f"{length:5d} chars, {strategy}", f"~{length * 0.05:6.1f} s (not run)"))
+                continue
+            typer = TextInjector(settings, keyboard=keyboard, clipboard=clipboard)
+            start = time.perf_counter()
+            typer.type(text, strategy=strategy)
+            elapsed = time.perf_counter() - start
+            rows.append((f"{length:5d} chars, {strategy}",
+                         f"{elapsed * 1000:8.1f} ms, {length / elapsed:9.0f} chars/s"))
+        rows.append((f"{length:5d} chars, auto", f"-> {TextInjector(settings, keyboard=keyboard, clipboard=clipboard).choose(text)}"))
+    source = "real keyboard/clipboard" if args.real else (
+        f"simulated: {args.event_us} us per key event, {args.clipboard_us} us per clipboard call")
+    _report(f"type_text strategies ({source})", rows)
+    time.sleep(0.2)  # Let pending clipboard restores finish
+
+
+# ----------------------------------------------------------------- compiler
+
+SAMPLE_PLANS = [
+    [{"command": "run_command", "parameters": {"command": "start notepad"}},
+     {"command": "sleep", "parameters": {"duration": 2}},
+     {"command": "type_text", "parameters": {"text": "Dear team,"}},
+     {"command": "type_text", "parameters": {"text": " the meeting moved to 3pm."}},
+     {"command": "press_keys", "parameters": {"keys": ["ctrl", "s"]}},
+     {"command": "press_keys", "parameters": {"keys": ["ctrl", "s"]}},
+     {"command": "sleep", "parameters": {"duration": 0.5}}],
+    [{"command": "move_mouse", "parameters": {"move_x": 0.5, "move_y": 0.5}},
+     {"command": "move_mouse", "parameters": {"move_x": 0.3, "move_y": 0.8}},
+     {"command": "left_click"},
+     {"command": "scroll", "parameters": {"scroll_amount": -5}},
+     {"command": "scroll", "parameters": {"scroll_amount": -5}}],
+    [{"command": "open_url", "parameters": {"url": "https://www.google.com"}},
+     {"command": "sleep", "parameters": {"duration": 1.5}},
+     {"command": "type_text", "parameters": {"text": "AI trends"}},
+     {"command": "press_keys", "parameters": {"keys": ["enter"]}},
+     {"command": "sleep", "parameters": {"duration": 0.2}},
+     {"command": "sleep", "parameters": {"duration": 0.3}},
+     {"command": "llm_response", "parameters": {"text": "Here are the latest trends..."}}],
+    [{"command": "press_keys", "parameters": {"keys": "alt+tab"}},
+     {"command": "move_mouse", "parameters": {"move_x": 640, "move_y": 400}},
+     {"command": "scroll", "parameters": {"scroll_amount": "lots"}}],
+]
+
+
+def bench_compiler(args):
+    from plan_compiler import PlanCompiler, load_plans
+
+    if args.corpus:
+        plans, source = load_plans(args.corpus), args.corpus
+    else:
+        plans, source = SAMPLE_PLANS, "built-in sample plans"
+
+    actions, checked = None, "command names not checked"
+    try:
+        from command_handler import CommandHandler
+        actions = CommandHandler(backend=SimpleNamespace(name='none')).actions
+        checked = "checked against CommandHandler.actions"
+    except Exception as e:
+        print(f"CommandHandler unavailable ({e}); validating parameter types only")
+
+    compiler = PlanCompiler(actions, log=lambda message: None)
+    start = time.perf_counter()
+    for plan in plans:
+        compiler.compile(plan)
+    elapsed = time.perf_counter() - start
+    s = compiler.stats
+    removed = s['steps_in'] - s['steps_out']
+    rows = [
+        ("steps in / out", f"{s['steps_in']} / {s['steps_out']} ({removed / max(s['steps_in'], 1):.0%} removed)"),
+        ("plans stopped at an invalid step", f"{s['rejected']}"),
+        ("execution time saved", f"~{s['seconds_saved']:.1f} s total, "
+                                 f"~{s['seconds_saved'] / max(len(plans), 1):.2f} s per plan"),
+        ("compile time", f"{elapsed / max(len(plans), 1) * 1e6:.0f} us per plan"),
+    ]
+    rows += [(key.replace('_', ' '), f"{s[key]}") for key in
+             ('merged_sleeps', 'redundant_sleeps', 'dead_moves', 'coalesced_text',
+              'coalesced_scrolls', 'duplicate_keys', 'noops')]
+    _report(f"Plan compiler ({len(plans)} plans from {source}, {checked})", rows)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    sub = parser.add_subparsers(dest="name", required=True)
+
+    p = sub.add_parser("landmarks", help="Vectorized vs per-attribute landmark features")
+    p.add_argument("--iterations", type=int, default=20000)
+    p.set_defaults(func=bench_landmarks)
+
+    p = sub.add_parser("preprocess", help="Frame flip/convert allocations and timing")
+    p.add_argument("clip", nargs="?", help="Recorded video file")
+    p.add_argument("--synthetic", default="640x480", help="Frame size when no clip is given")
+    p.add_argument("--frames", type=int, default=300)
+    p.set_defaults(func=bench_preprocess)
+
+    p = sub.add_parser("wakeword", help="Local wake-word detection on WAV fixtures")
+    p.add_argument("--templates", required=True, help="Directory of enrolled wake-word WAVs")
+    p.add_argument("--positives", help="WAVs that contain the wake word")
+    p.add_argument("--negatives", help="WAVs that do not")
+    p.add_argument("--threshold", type=float)
+    p.set_defaults(func=bench_wakeword)
+
+    p = sub.add_parser("encoding", help="STT payload size and encode time per encoder")
+    p.add_argument("wavs", nargs="+", help="Recorded mono 16-bit WAV fixtures")
+    p.add_argument("--uplink", type=int, default=256, help="Link speed in kbps for upload estimates")
+    p.set_defaults(func=bench_encoding)
+
+    p = sub.add_parser("pipeline", help="Sequential vs pipelined plan/execute throughput (simulated)")
+    p.add_argument("--requests", type=int, default=10)
+    p.add_argument("--plan-ms", type=int, default=1200, help="Simulated LLM planning latency")
+    p.add_argument("--exec-ms", type=int, default=800, help="Simulated execution time per plan")
+    p.set_defaults(func=bench_pipeline)
+
+    p = sub.add_parser("intents", help="Local intent hit rate and latency over a transcript corpus")
+    p.add_argument("corpus", help="Text file with one recorded transcript per line")
+    p.add_argument("--iterations", type=int, default=20)
+    p.add_argument("--llm-ms", type=int, default=1500, help="Assumed LLM round trip for misses")
+    p.add_argument("--show-misses", type=int, default=10)
+    p.set_defaults(func=bench_intents)
+
+    p = sub.add_parser("fuzzy", help="Paraphrase lookup latency in the fuzzy plan index")
+    p.add_argument("--sizes", type=int, nargs="+", default=[10000, 100000])
+    p.add_argument("--queries", type=int, default=200)
+    p.add_argument("--threshold", type=float, default=0.75)
+    p.set_defaults(func=bench_fuzzy)
+
+    p = sub.add_parser("julep", help="Planner completion latency against the fake Julep client")
+    p.add_argument("--requests", type=int, default=20)
+    p.add_argument("--min-latency", type=float, default=0.2)
+    p.add_argument("--max-latency", type=float, default=1.5)
+    p.add_argument("--deadline", type=float, default=20.0)
+    p.set_defaults(func=bench_julep)
+
+    p = sub.add_parser("planstream", help="Time to first step: incremental vs whole-response plan parsing")
+    p.add_argument("--steps", type=int, default=12)
+    p.add_argument("--tokens-per-second", type=float, default=100)
+    p.set_defaults(func=bench_planstream)
+
+    p = sub.add_parser("backends", help="Pooled vs per-call connections and hedged requests on the mock LLM")
+    p.add_argument("--requests", type=int, default=20)
+    p.add_argument("--latency", type=float, default=0.05)
+    p.add_argument("--tokens-per-second", type=float, default=0, help="0 streams without pacing")
+    p.add_argument("--hedge-delay", type=float, default=0.05)
+    p.set_defaults(func=bench_backends)
+
+    p = sub.add_parser("windows", help="Per-call window enumeration vs the cached WindowRegistry")
+    p.add_argument("--iterations", type=int, default=200)
+    p.add_argument("--synthetic", type=int, default=0, help="Fake this many windows instead of the real desktop")
+    p.add_argument("--max-ages", type=float, nargs="+", default=[0.25, 5.0])
+    p.set_defaults(func=bench_windows)
+
+    p = sub.add_parser("executor", help="Fixed delays vs readiness waits on a simulated desktop")
+    p.add_argument("--launch-ms", type=int, default=400, help="Time until a launched app's window appears")
+    p.add_argument("--page-ms", type=int, default=300, help="Time until a page's title updates")
+    p.set_defaults(func=bench_executor)
+
+    p = sub.add_parser("typing", help="Characters per second for paste, bulk and paced typing")
+    p.add_argument("--lengths", type=int, nargs="+", default=[20, 100, 500])
+    p.add_argument("--event-us", type=float, default=50, help="Simulated cost of one key event")
+    p.add_argument("--clipboard-us", type=float, default=500, help="Simulated cost of one clipboard call")
+    p.add_argument("--max-paced", type=int, default=100, help="Longer texts only estimate paced typing")
+    p.add_argument("--real", action="store_true", help="Use the real keyboard and clipboard")
+    p.set_defaults(func=bench_typing)
+
+    p = sub.add_parser("compiler", help="Steps removed and time saved by the plan compiler")
+    p.add_argument("corpus", nargs="?", help="Plans as JSON lines, or the plan cache .sqlite3 file")
+    p.set_defaults(func=bench_compiler)
+
+    args = parser.parse_args()
+    args.func(args)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,168 @@
+# camera.py
+import time
+from threading import Thread, Condition
+
+import cv2
+
+
+class FrameGrabber(Thread):
+    """Reads frames on its own thread and keeps only the newest one"""
+
+    def __init__(self, cap, realtime=None):
+        super().__init__(daemon=True)
+        self.cap = cap
+        self.running = True
+        self.finished = False
+        self._cond = Condition()
+        self._frame = None
+        self._frame_time = 0.0
+        self._seq = 0
+        self._read_seq = 0
+        self.dropped = 0
+
+        # Video files are read as fast as the decoder allows, so pace them
+        # at the recorded FPS to behave like a live camera. Live devices
+        # report a frame count of 0 / -1 and are never paced.
+        if realtime is None:
+            realtime = cap.get(cv2.CAP_PROP_FRAME_COUNT) > 0
+        fps = cap.get(cv2.CAP_PROP_FPS) if realtime else 0
+        self._frame_interval = 1.0 / fps if fps and fps > 0 else 0.0
+
+    def run(self):
+        next_due = time.perf_counter()
+        while self.running:
+            ret, frame = self.cap.read()
+            if not ret:
+                if self._frame_interval:
+                    break  # End of a recorded clip
+                time.sleep(0.005)
+                continue
+
+            if self._frame_interval:
+                next_due += self._frame_interval
+                delay = next_due - time.perf_counter()
+                if delay > 0:
+                    time.sleep(delay)
+
+            with self._cond:
+                # Single-slot buffer: an unread frame is simply overwritten
+                if self._seq > self._read_seq:
+                    self.dropped += 1
+                self._frame = frame
+                self._frame_time = time.time()
+                self._seq += 1
+                self._cond.notify_all()
+
+        with self._cond:
+            self.finished = True
+            self._cond.notify_all()
+
+    def read(self, timeout=1.0):
+        """Block until a frame newer than the last one read is available.
+
+        Returns (frame, capture_time), or (None, None) on timeout or once the
+        source is exhausted.
+        """
+        with self._cond:
+            if not self._cond.wait_for(
+                    lambda: self._seq > self._read_seq or self.finished or not self.running,
+                    timeout):
+                return None, None
+            if self._seq == self._read_seq:
+                return None, None
+            self._read_seq = self._seq
+            return self._frame, self._frame_time
+
+    def stop(self):
+        self.running = False
+        with self._cond:
+            self._cond.notify_all()
+        if self.is_alive():
+            self.join(timeout=1.0)
+
+
+class CameraSession:
+    """Opens the camera once and shares it between calibration and tracking.
+
+    `timings` records seconds since open() began for each startup milestone
+    ('opened', 'warmed_up', then whatever the caller marks).
+    """
+
+    def __init__(self, source=0, width=None, height=None, fps=None, backend=None,
+                 warmup_frames=5):
+        self.source = source
+        self.width = width
+        self.height = height
+        self.fps = fps
+        self.backend = backend
+        self.warmup_frames = warmup_frames
+        self.cap = None
+        self.grabber = None
+        self.timings = {}
+        self._start = None
+
+    @classmethod
+    def from_settings(cls, settings, source=None):
+        """Build from Config.CAMERA_SETTINGS; an explicit source (e.g. a clip) wins"""
+        if source is None:
+            source = settings.get('index', 0)
+        live = isinstance(source, int)
+        return cls(
+            source,
+            width=settings.get('width') if live else None,
+            height=settings.get('height') if live else None,
+            fps=settings.get('fps') if live else None,
+            backend=settings.get('backend'),
+            warmup_frames=settings.get('warmup_frames', 0) if live else 0,
+        )
+
+    def open(self):
+        self._start = time.perf_counter()
+        if self.backend:
+            api = getattr(cv2, f"CAP_{self.backend.upper()}", cv2.CAP_ANY)
+            self.cap = cv2.VideoCapture(self.source, api)
+        else:
+            self.cap = cv2.VideoCapture(self.source)
+        if not self.cap.isOpened():
+            raise RuntimeError(f"Cannot open camera source {self.source!r}")
+
+        # Request the mode before the first read so the driver negotiates once
+        if self.width:
+            self.cap.set(cv2.CAP_PROP_FRAME_WIDTH, self.width)
+        if self.height:
+            self.cap.set(cv2.CAP_PROP_FRAME_HEIGHT, self.height)
+        if self.fps:
+            self.cap.set(cv2.CAP_PROP_FPS, self.fps)
+        self.mark('opened')
+
+        # Auto-exposure and white balance settle over the first frames
+        warmed, deadline = 0, time.perf_counter() + 3.0
+        while warmed < self.warmup_frames and time.perf_counter() < deadline:
+            ret, _ = self.cap.read()
+            if ret:
+                warmed += 1
+            else:
+                time.sleep(0.01)
+        self.mark('warmed_up')
+
+        self.grabber = FrameGrabber(self.cap)
+        self.grabber.start()
+        return self
+
+    def read(self, timeout=1.0):
+        return self.grabber.read(timeout)
+
+    @property
+    def finished(self):
+        return self.grabber is None or self.grabber.finished
+
+    def mark(self, milestone):
+        """Record a startup milestone once"""
+        if self._start is not None and milestone not in self.timings:
+            self.timings[milestone] = time.perf_counter() - self._start
+
+    def close(self):
+        if self.grabber:
+            self.grabber.stop()
+        if self.cap:
+            self.cap.release()
@@ -4,16 +4,21 @@ import pyautogui
 import subprocess
 import webbrowser
 import time
-import yaml
-from julep import Julep
-from window_utils import get_active_window
-from window_utils import get_all_open_windows
+from window_utils import window_registry
 import dotenv
 import os
 import pyttsx3 
 import pyperclip
 import threading
 from dotenv import load_dotenv
+from config import Config
+from intent_parser import IntentParser
+from plan_cache import PlanCache
+from plan_index import FuzzyPlanIndex
+from plan_stream import iter_plan
+from llm_backends import LLMTimeout, build_backend
+from plan_executor import wait_for_clipboard
+from text_injection import TextInjector
 
 load_dotenv()
 
@@ -59,6 +64,7 @@ class CommandHandler:
         - Always try key combinations before complex solutions
         
         5.abrogate is for stop listening
+        6.forget_last_plan is for when the user says the previous result was wrong
         
         Available Commands: {commands}
         Current Window: {window_title}
@@ -124,7 +130,7 @@ class CommandHandler:
         Respond ONLY with a valid JSON array:
     """
 
-    def __init__(self, assistant=None, julep_api_key=None):
+    def __init__(self, assistant=None, julep_api_key=None, client=None, backend=None):
         self.assistant = assistant
         self.actions = {
             'press_keys': self.press_keys,
@@ -143,6 +149,7 @@ class CommandHandler:
             'stop_speaking': self.stop_speaking,
             'hold_mouse': self.hold_mouse,
             'release_mouse': self.release_mouse,
+            'forget_last_plan': self.forget_last_plan,
         }
         
         # Text-to-speech engine setup
@@ -157,56 +164,46 @@ class CommandHandler:
             
         self.is_speaking = False
         self.speech_thread = None
-        
-        # Initialize Julep client
-        self.client = Julep(api_key=os.environ['JULEP_API_KEY'])
-        # Create or reuse the agent
-        self.agent = self.client.agents.create(
-            name="VoiceControl",
-            model="gpt-4o",
-            about="System control assistant that outputs valid JSON commands"
+
+        # type_text pastes or bulk-writes instead of one keystroke per 50 ms
+        self.typer = TextInjector(
+            Config.TYPING_SETTINGS,
+            window_class=lambda: window_registry().active_class(),
+            keyboard=kb,
+            clipboard=pyperclip
         )
         
-        # Create the task template
-        self.task = self.client.tasks.create(
-            agent_id=self.agent.id,
-            name="Voice Command Handler",
-            description="Interpret user voice command and return system-level actions in JSON",
-            main=yaml.safe_load("""
-                - prompt:
-                  - role: system
-                    content: You are a system control agent. Return a JSON array of commands only.
-                  - role: user
-                    content: $ f\"\"\"{steps[0].input.prompt}\"\"\"
-            """)
+        # Planner LLM; tests and benchmarks pass a FakeJulep client or a backend
+        self.backend = backend or build_backend(
+            client=client,
+            julep_api_key=julep_api_key,
+            validate=lambda text: any(True for _ in iter_plan([text]))
         )
         
         # Add conversation history
         self.conversation_history = []
-        
-        # Initialize Julep client
-        self.client = Julep(api_key=os.getenv("JULEP_API_KEY"))
-        
-        # Create or reuse the agent
-        self.agent = self.client.agents.create(
-            name="VoiceControl",
-            model="gpt-4o",
-            about="System control assistant that outputs valid JSON commands"
-        )
-        
-        # Create the task template
-        self.task = self.client.tasks.create(
-            agent_id=self.agent.id,
-            name="Voice Command Handler",
-            description="Interpret user voice command and return system-level actions in JSON",
-            main=yaml.safe_load("""
-                - prompt:
-                  - role: system
-                    content: You are a system control agent. Return a JSON array of commands only.
-                  - role: user
-                    content: $ f\"\"\"{steps[0].input.prompt}\"\"\"
-            """)
-        )
+
+        # Frequent phrases skip the LLM entirely
+        self.intent_parser = IntentParser() if Config.COMMAND_SETTINGS['local_intents'] else None
+        # LLM plans are reused for the same request in the same kind of window
+        self.plan_cache = None
+        if Config.COMMAND_SETTINGS['plan_cache']:
+            self.plan_cache = PlanCache(
+                Config.COMMAND_SETTINGS['plan_cache'],
+                max_entries=Config.COMMAND_SETTINGS['plan_cache_size'],
+                ttl=Config.COMMAND_SETTINGS['plan_cache_ttl']
+            )
+        # Paraphrases ("launch notepad" vs "open the notepad") reuse plans too
+        self.plan_index = None
+        if self.plan_cache and Config.COMMAND_SETTINGS['fuzzy_threshold']:
+            self.plan_index = FuzzyPlanIndex(threshold=Config.COMMAND_SETTINGS['fuzzy_threshold'])
+            self.plan_index.add_many(self.plan_cache.keys())
+        self._last_plan_key = None
+        self.path_stats = {
+            'local': {'count': 0, 'seconds': 0.0},
+            'cache': {'count': 0, 'seconds': 0.0},
+            'llm': {'count': 0, 'seconds': 0.0}
+        }
 
     def speak_text(self, text="", **kwargs):
         """Handle text-to-speech output in background thread"""
@@ -248,23 +245,22 @@ class CommandHandler:
             
             # Clear existing selection and position cursor
             pyautogui.press('esc')
-            time.sleep(0.2)
             
-            # Select from cursor position using keyboard
+            # Select from cursor position using keyboard; ctrl+c lands in the
+            # clipboard asynchronously, so wait for it to change
+            pyperclip.copy('')
             pyautogui.hotkey('shift', 'end')  # Select to line end
-            time.sleep(0.3)
             pyautogui.hotkey('ctrl', 'c')
-            time.sleep(0.5)
-            current_text = pyperclip.paste().strip()
+            current_text = (wait_for_clipboard('', Config.EXECUTOR_SETTINGS['clipboard_timeout']) or '').strip()
             
             if current_text:
                 # Expand selection downward
                 for _ in range(10):  # Max 10 paragraphs
+                    copied = pyperclip.paste()
                     pyautogui.hotkey('shift', 'down')
-                    time.sleep(0.2)
                     pyautogui.hotkey('ctrl', 'c')
-                    time.sleep(0.3)
-                    new_text = pyperclip.paste().strip()
+                    # Unchanged clipboard: nothing more to select
+                    new_text = (wait_for_clipboard(copied, Config.EXECUTOR_SETTINGS['clipboard_timeout']) or '').strip()
                     if not new_text or new_text == current_text:
                         break
                     current_text = new_text
@@ -317,8 +313,152 @@ class CommandHandler:
             self.assistant.gui.log(f"Assistant: {text}")
 
     def generate_commands(self, text):
+        """Command JSON for a transcript: local intent match, then plan cache, then the LLM"""
+        return list(self.stream_commands(text))
+
+    def stream_commands(self, text):
+        """Like generate_commands, but yields each command as soon as it is known.
+
+        LLM plans are parsed incrementally, so the executor can start on the
+        first step while the rest of the JSON array is still arriving.
+        """
+        # "That was wrong" may only forget the plan of the request right
+        # before it; local and uncached requests leave nothing to forget.
+        # The key is bound here because the planner runs ahead of execution.
+        previous, self._last_plan_key = self._last_plan_key, None
+        for command in self._plan_commands(text):
+            if command.get('command') == 'forget_last_plan':
+                text_key, window_class = previous or (None, None)
+                command = {'command': 'forget_last_plan',
+                           'parameters': {'text': text_key, 'window_class': window_class}}
+                previous = None
+            yield command
+
+    def _plan_commands(self, text):
+        """Commands from the local parser, the plan cache or the LLM, in that order"""
+        start = time.perf_counter()
+        commands = self.intent_parser.parse(text) if self.intent_parser else None
+        if commands is not None:
+            self._record_path('local', start)
+            self.conversation_history.append({
+                'user': text,
+                'assistant': json.dumps(commands),
+                'window': None,
+                'timestamp': time.time()
+            })
+            if self.assistant:
+                self.assistant.log(f"⚡ Local match: {[cmd['command'] for cmd in commands]}")
+            yield from commands
+            return
+
+        window_class = window_registry().active_class() if self.plan_cache else None
+        if self.plan_cache:
+            commands, cached_text = self._cached_plan(text, window_class)
+            if commands is not None:
+                self._record_path('cache', start)
+                self._last_plan_key = (cached_text, window_class)
+                self.conversation_history.append({
+                    'user': text,
+                    'assistant': json.dumps(commands),
+                    'window': window_class,
+                    'timestamp': time.time()
+                })
+                if self.assistant:
+                    self.assistant.log(f"⚡ Reusing cached plan for '{cached_text}' (say 'that was wrong' to forget it)")
+                yield from commands
+                return
+
+        commands = []
+        for command in self._stream_from_llm(text):
+            commands.append(command)
+            yield command
+        self._record_path('llm', start)
+        if self.plan_cache and self._cacheable(commands):
+            self.plan_cache.put(text, window_class, commands)
+            if self.plan_index:
+                self.plan_index.add(text, window_class)
+            self._last_plan_key = (text, window_class)
+
+    def _cached_plan(self, text, window_class):
+        """(commands, cached utterance) from an exact or close-enough match"""
+        commands = self.plan_cache.get(text, window_class)
+        if commands is not None or not self.plan_index:
+            return commands, text
+        match = self.plan_index.search(text, window_class)
+        if match is None:
+            return None, None
+        commands = self.plan_cache.get(match[0], window_class, count=False)
+        if commands is None:
+            # Expired or evicted from the cache since it was indexed
+            self.plan_index.remove(match[0], window_class)
+        return commands, match[0]
+
+    def _planner_timeout(self, text, error):
+        """Fallback once the LLM misses its deadline: say so"""
+        if self.assistant:
+            self.assistant.log(f"⏱️ Planner timed out: {error}")
+        return [{"command": "llm_response",
+                 "parameters": {"text": f"Sorry, planning \"{text}\" took too long. Please try again."}}]
+
+    def _cacheable(self, commands):
+        """Only well-formed plans that do not depend on when they were asked"""
+        if not isinstance(commands, list) or not commands:
+            return False
+        for cmd in commands:
+            if not isinstance(cmd, dict) or cmd.get('command') not in self.actions:
+                return False
+            if not isinstance(cmd.get('parameters', {}), dict):
+                return False
+            # Spoken/written answers go stale; forgetting/stopping is per-moment
+            if cmd['command'] in ('llm_response', 'speak_text', 'abrogate', 'forget_last_plan'):
+                return False
+        return True
+
+    def forget_last_plan(self, text=None, window_class=None, **kwargs):
+        """Drop a cached plan after the user says it was wrong.
+
+        stream_commands fills in `text` and `window_class` with the plan that
+        preceded the request when it was planned.
+        """
+        if not self.plan_cache or text is None:
+            return
+        self.plan_cache.invalidate(text, window_class)
+        if self.plan_index:
+            self.plan_index.remove(text, window_class)
+        if self.assistant:
+            self.assistant.log(f"🗑️ Forgot the plan for '{text}'")
+
+    def _record_path(self, path, start):
+        self.path_stats[path]['count'] += 1
+        self.path_stats[path]['seconds'] += time.perf_counter() - start
+
+    def stats_summary(self):
+        local, cache, llm = (self.path_stats[path] for path in ('local', 'cache', 'llm'))
+        total = local['count'] + cache['count'] + llm['count']
+        if not total:
+            return "Commands: no requests yet"
+
+        def mean_ms(path):
+            return path['seconds'] / path['count'] * 1000 if path['count'] else 0.0
+
+        summary = (f"Commands: {local['count']}/{total} local ({local['count'] / total:.0%}, "
+                   f"{mean_ms(local):.2f} ms mean), {cache['count']} cached ({mean_ms(cache):.2f} ms mean), "
+                   f"{llm['count']} via LLM ({mean_ms(llm):.0f} ms mean)")
+        if self.plan_cache:
+            c = self.plan_cache.stats()
+            summary += (f"\nPlan cache: {c['hits']} hits, {c['misses']} misses "
+                        f"({c['hit_rate']:.0%}), {c['entries']} entries")
+        if self.plan_index:
+            f = self.plan_index.stats()
+            summary += f", {f['hits']} fuzzy hits of {f['hits'] + f['misses']} lookups"
+        summary += "\nLLM " + self.backend.summary()
+        summary += "\n" + self.typer.stats_summary()
+        return summary
+
+    def _stream_from_llm(self, text):
+        """Yield the planner's commands as they are parsed from its output"""
         try:
-            current_window = get_active_window()
+            current_window = window_registry().active_title()
             
             # Build context-aware prompt
             context = "\n".join(
@@ -336,57 +476,42 @@ class CommandHandler:
             # Combine with context
             prompt = f"Previous conversation context:\n{context}\n\n{main_prompt}"
             
-            execution = self.client.executions.create(
-                task_id=self.task.id,
-                input={"prompt": prompt}
-            )
+            commands = []
+            # Fences and stray text around the array are skipped by the parser
+            for command in iter_plan(self._plan_chunks(text, prompt)):
+                commands.append(command)
+                yield command
 
-            while True:
-                result = self.client.executions.get(execution.id)
-                if result.status in ['succeeded', 'failed']:
-                    break
-                time.sleep(0.5)
-            
-            if result.status == "succeeded":
-                if isinstance(result.output, dict):
-                    raw_text = result.output.get('choices', [{}])[0].get('message', {}).get('content', '')
-                else:
-                    raw_text = str(result.output)
-                
-                clean_text = raw_text.replace('```json', '').replace('```', '').strip()
-                
-                try:
-                    commands = json.loads(clean_text)
-                    # Update conversation history
-                    self.conversation_history.append({
-                        'user': text,
-                        'assistant': raw_text,
-                        'window': current_window,
-                        'timestamp': time.time()
-                    })
-                    return commands
-                except json.JSONDecodeError:
-                    start_idx = clean_text.find('[')
-                    end_idx = clean_text.rfind(']') + 1
-                    if start_idx != -1 and end_idx != 0:
-                        commands = json.loads(clean_text[start_idx:end_idx])
-                        self.conversation_history.append({
-                            'user': text,
-                            'assistant': clean_text[start_idx:end_idx],
-                            'window': current_window,
-                            'timestamp': time.time()
-                        })
-                        return commands
-                    raise
-            else:
-                if self.assistant:
-                    self.assistant.log(f"Julep AI failed: {result.error}")
-                return []
+            # Update conversation history
+            if commands:
+                self.conversation_history.append({
+                    'user': text,
+                    'assistant': json.dumps(commands),
+                    'window': current_window,
+                    'timestamp': time.time()
+                })
                 
         except Exception as e:
             if self.assistant:
                 self.assistant.log(f"Command processing failed: {e}")
-            return []
+
+    def _plan_chunks(self, text, prompt):
+        """Raw planner output as text chunks"""
+        streamed = False
+        try:
+            for chunk in self.backend.stream(prompt):
+                streamed = True
+                yield chunk
+        except LLMTimeout as e:
+            # A half-streamed plan has already started executing; only
+            # answer for plans that never began
+            if not streamed:
+                yield json.dumps(self._planner_timeout(text, e))
+            elif self.assistant:
+                self.assistant.log(f"⏱️ Planner stopped mid-plan: {e}")
+        except Exception as e:
+            if self.assistant:
+                self.assistant.log(f"{self.backend.name} failed: {e}")
 
     # Command implementations (remain the same as before)
     def left_click(self, **kwargs):
@@ -429,18 +554,17 @@ class CommandHandler:
             self.assistant.log(f"Command execution error: {str(e)}")
             return False
 
-    def type_text(self, text: str = "", delay: float = 0.05):
+    def type_text(self, text: str = "", delay=None, strategy=None, **kwargs):
             """
-            Prints the text to stdout and “types” it via the keyboard library,
-            pausing delay seconds between each keystroke.
+            Prints the text to stdout and puts it into the focused window:
+            pasted when long, written in one go when short, or typed with
+            `delay` seconds between keystrokes where paste is not accepted.
             """
             if not text:
                 return
 
             print(text)  # still print it out
-            for char in text:
-                kb.write(char)
-                time.sleep(delay)
+            self.typer.type(text, strategy=strategy, delay=delay)
 
     def pause_command(self, **kwargs):
         if self.assistant:
@@ -0,0 +1,186 @@
+# command_pipeline.py
+import queue
+import time
+from threading import Thread, Lock, Event
+
+_END = object()
+
+
+class Job:
+    """One spoken request on its way through planning and execution"""
+
+    def __init__(self, seq, transcript):
+        self.seq = seq
+        self.transcript = transcript
+        self.commands = []  # Grows as the planner streams steps in
+        self.cancelled = Event()
+        self._steps = queue.Queue()
+        self._head = None
+        self.submitted = time.perf_counter()
+        self.planned = None
+        self.started = None
+        self.finished = None
+
+    def _push(self, command):
+        self.commands.append(command)
+        self._steps.put(command)
+
+    def _close(self):
+        self._steps.put(_END)
+
+    def wait_started(self):
+        """Block until the first step is planned; False if the plan is empty"""
+        item = self._steps.get()
+        if item is _END:
+            self._steps.put(_END)
+            return False
+        self._head = item
+        return True
+
+    def steps(self):
+        """Planned commands in order, waiting for ones not planned yet"""
+        if self._head is not None:
+            head, self._head = self._head, None
+            yield head
+        while True:
+            item = self._steps.get()
+            if item is _END:
+                self._steps.put(_END)
+                return
+            yield item
+
+
+class CommandPipeline:
+    """Planner and executor workers joined by bounded FIFO queues.
+
+    While one plan executes, the next transcript is already being planned.
+    With a single worker per stage, jobs execute strictly in the order they
+    were submitted. `plan` may return a list or yield commands one by one;
+    a job is handed to the executor as soon as its first step exists and
+    job.steps() waits for the rest. A plan that contains one of
+    `cancel_commands` (e.g. 'abrogate') cancels every older job, including
+    the one executing, which `execute` should check via job.cancelled
+    between steps.
+    """
+
+    def __init__(self, plan, execute, max_pending=4, max_planned=2,
+                 cancel_commands=('abrogate',), on_idle=None):
+        self.plan = plan
+        self.execute = execute
+        self.cancel_commands = set(cancel_commands)
+        self.on_idle = on_idle
+        self._transcripts = queue.Queue(max_pending)
+        self._plans = queue.Queue(max_planned)
+        self._lock = Lock()
+        self._jobs = {}  # seq -> Job still in flight
+        self._seq = 0
+        self._threads = []
+        self.current = None
+        self.stats = {
+            'submitted': 0,
+            'completed': 0,
+            'cancelled': 0,
+            'plan_total': 0.0,
+            'execute_total': 0.0,
+            'latency_total': 0.0
+        }
+
+    def start(self):
+        for target in (self._plan_worker, self._execute_worker):
+            thread = Thread(target=target, daemon=True)
+            thread.start()
+            self._threads.append(thread)
+        return self
+
+    def submit(self, transcript, timeout=None):
+        """Queue a transcript; blocks while the planner backlog is full"""
+        with self._lock:
+            self._seq += 1
+            job = Job(self._seq, transcript)
+            self._jobs[job.seq] = job
+            self.stats['submitted'] += 1
+        try:
+            self._transcripts.put(job, timeout=timeout)
+        except queue.Full:
+            with self._lock:
+                del self._jobs[job.seq]
+            raise
+        return job
+
+    def cancel(self, before=None):
+        """Cancel in-flight jobs older than seq `before` (all if None)"""
+        with self._lock:
+            for job in self._jobs.values():
+                if before is None or job.seq < before:
+                    job.cancelled.set()
+
+    @property
+    def pending(self):
+        """Jobs submitted but not finished"""
+        return len(self._jobs)
+
+    @property
+    def busy(self):
+        return bool(self._jobs)
+
+    def stop(self):
+        self._transcripts.put(None)
+        for thread in self._threads:
+            thread.join(timeout=1.0)
+
+    def _plan_worker(self):
+        while True:
+            job = self._transcripts.get()
+            if job is None:
+                self._plans.put(None)
+                return
+            # Queued right away so execution can begin with the first step
+            self._plans.put(job)
+            if not job.cancelled.is_set():
+                start = time.perf_counter()
+                try:
+                    for command in self.plan(job.transcript) or []:
+                        if job.cancelled.is_set():
+                            break
+                        job._push(command)
+                        if command.get('command') in self.cancel_commands:
+                            self.cancel(before=job.seq)
+                except Exception as e:
+                    print(f"Planning failed: {e}")
+                job.planned = time.perf_counter()
+                self.stats['plan_total'] += job.planned - start
+            job._close()
+
+    def _execute_worker(self):
+        while True:
+            job = self._plans.get()
+            if job is None:
+                return
+            if not job.cancelled.is_set() and job.wait_started() and not job.cancelled.is_set():
+                job.started = time.perf_counter()
+                self.current = job
+                try:
+                    self.execute(job)
+                except Exception as e:
+                    print(f"Execution failed: {e}")
+                self.current = None
+                self.stats['execute_total'] += time.perf_counter() - job.started
+            job.finished = time.perf_counter()
+
+            with self._lock:
+                del self._jobs[job.seq]
+                idle = not self._jobs
+                if job.cancelled.is_set():
+                    self.stats['cancelled'] += 1
+                else:
+                    self.stats['completed'] += 1
+                    self.stats['latency_total'] += job.finished - job.submitted
+            if idle and self.on_idle:
+                self.on_idle()
+
+    def stats_summary(self):
+        s = self.stats
+        done = s['completed'] or 1
+        return (f"Pipeline: {s['completed']} of {s['submitted']} requests completed, "
+                f"{s['cancelled']} cancelled, {s['plan_total'] / done * 1000:.0f} ms mean planning, "
+                f"{s['latency_total'] / done * 1000:.0f} ms mean request latency")
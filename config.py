@@ -13,5 +13,75 @@ class Config:
     'energy_threshold': 200,  # Lower for sensitive mics
     'pause_threshold': 1.0,   # Longer pause allowance
     'dynamic_energy': False,   # Disable dynamic adjustment
-    'adjust_for_ambient_noise': True
-    }
\ No newline at end of file
+    'adjust_for_ambient_noise': True,
+    'buffer_seconds': 30      # Mic ring buffer; audio older than this is lost if not consumed
+    }
+    WAKE_WORD_SETTINGS = {
+    'enabled': True,          # Local keyword spotting before the cloud check
+    'samples_dir': './wake_word_samples',  # Filled by `python wake_word.py enroll`
+    'threshold': None         # None derives it from the enrolled samples
+    }
+    SPEECH_SETTINGS = {
+    'streaming': False,       # Stream raw mic audio instead of one recognize() per phrase (skips VAD trim and encoding)
+    'language_code': 'en-US',
+    'model': 'latest_long',
+    'encoding': 'flac',       # 'linear16', 'flac' or 'ogg_opus' (needs ffmpeg)
+    'sample_rate': 16000,     # Downsample uploads to this rate, None keeps the mic rate
+    'opus_bitrate': '24k'
+    }
+    COMMAND_SETTINGS = {
+    'local_intents': True,    # Match common phrases locally before asking the LLM
+    'plan_cache': './plan_cache.sqlite3',  # None disables reuse of LLM plans
+    'plan_cache_size': 500,
+    'plan_cache_ttl': 7 * 24 * 3600,      # Seconds
+    'fuzzy_threshold': 0.75,  # Cosine similarity for reusing a paraphrased plan, None disables
+    'llm_deadline': 20.0,     # Seconds before a planner call is abandoned
+    'poll_initial': 0.02,     # First status poll delay, grows up to poll_max
+    'poll_max': 0.25
+    }
+    LLM_SETTINGS = {
+    'backend': 'julep',       # julep, gemini, openai, mock or hedged
+    'hedge': ('julep', 'gemini'),  # Raced in this order when backend is 'hedged'
+    'hedge_delay': 1.0,       # Seconds before the next hedged backend is started
+    'julep_model': 'gpt-4o',
+    'openai_url': 'http://127.0.0.1:8080/v1',  # llama.cpp / vLLM / Ollama server
+    'openai_model': 'local',
+    'mock_url': 'http://127.0.0.1:8765/v1'     # `python mock_llm_server.py`
+    }
+    PIPELINE_SETTINGS = {
+    'max_pending': 4,         # Transcripts waiting for the planner
+    'max_planned': 2          # Plans waiting for the executor
+    }
+    WINDOW_SETTINGS = {
+    'watcher': 'auto',        # auto, win32, x11 or poll
+    'poll_interval': 0.1,     # Seconds, only for the polling fallback
+    'registry_max_age': 0.25, # Seconds a cached window list may be stale when polling
+    'registry_max_age_events': 5.0  # Same, with window events (incl. retitles) keeping it current
+    }
+    EXECUTOR_SETTINGS = {
+    'launch_timeout': 7.0,    # Max wait for a launched app's window
+    'page_timeout': 1.5,      # Max wait for a browser title change after open_url
+    'focus_timeout': 0.3,     # Max wait for focus to move after alt+tab style keys
+    'input_settle': 0.05,     # Pause after clicks/keys that have no observable effect
+    'clipboard_timeout': 0.5, # Max wait for ctrl+c to land in the clipboard
+    'poll_interval': 0.02,    # Seconds between checks of polled conditions
+    'trace': True             # Log each plan's timeline
+    }
+    TYPING_SETTINGS = {
+    'paste_min_chars': 40,    # Longer text is pasted through the clipboard, shorter is written in one go
+    'paced_delay': 0.05,      # Seconds between keystrokes for 'paced' windows
+    'restore_delay': 0.15,    # Seconds before the previous clipboard is put back
+    'window_overrides': {     # Window class -> 'paste', 'bulk' or 'paced'
+        'ConsoleWindowClass': 'bulk',        # Legacy consoles may not take ctrl+v
+        'TscShellContainerClass': 'paced',   # Remote desktop drops fast keystrokes
+        'VirtualConsoleClass': 'bulk'
+    }
+    }
+    CAMERA_SETTINGS = {
+    'index': 0,           # cv2.VideoCapture device index
+    'width': 640,
+    'height': 480,
+    'fps': 30,
+    'backend': None,      # e.g. 'DSHOW' or 'MSMF' on Windows, 'V4L2' on Linux
+    'warmup_frames': 5    # Frames discarded while exposure settles
+    }
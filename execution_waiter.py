@@ -0,0 +1,102 @@
+# execution_waiter.py
+import queue
+import random
+import time
+from threading import Thread
+
+TERMINAL_STATUSES = ('succeeded', 'failed', 'cancelled')
+
+
+class ExecutionTimeout(Exception):
+    """The planner did not finish before its deadline"""
+
+    def __init__(self, execution_id, waited, status):
+        super().__init__(f"Execution {execution_id} still '{status}' after {waited:.1f}s")
+        self.execution_id = execution_id
+        self.waited = waited
+        self.status = status
+
+
+class Backoff:
+    """Poll delays growing from `initial` by `factor` up to `maximum`, with jitter"""
+
+    def __init__(self, initial=0.02, factor=1.5, maximum=0.25, jitter=0.1):
+        self.initial = initial
+        self.factor = factor
+        self.maximum = maximum
+        self.jitter = jitter
+
+    def __iter__(self):
+        delay = self.initial
+        while True:
+            yield delay * (1 + random.uniform(-self.jitter, self.jitter))
+            delay = min(delay * self.factor, self.maximum)
+
+
+def _status_stream(client, execution_id):
+    """The SDK's server-sent status stream if this version has one"""
+    status = getattr(client.executions, 'status', None)
+    stream = getattr(status, 'stream', None)
+    return stream(execution_id=execution_id) if stream else None
+
+
+def wait_for_execution(client, execution_id, deadline=20.0, backoff=None, stream=True, stats=None):
+    """Block until a Julep execution reaches a terminal status and return it.
+
+    Follows the status stream when the SDK offers one (no polling delay at
+    all) and falls back to polling executions.get with `backoff`. Raises
+    ExecutionTimeout once `deadline` seconds have passed. `stats` is reset
+    to this call's mode and poll count.
+    """
+    start = time.perf_counter()
+    stop_at = start + deadline
+    stats = stats if stats is not None else {}
+    stats.update(mode=None, polls=0)
+    status = 'queued'
+
+    if stream:
+        try:
+            events = _status_stream(client, execution_id)
+        except Exception:
+            events = None
+        if events is not None:
+            # Read the stream on a helper thread so the deadline holds even
+            # while the server is silent
+            statuses = queue.Queue()
+
+            def pump():
+                try:
+                    for event in events:
+                        statuses.put(getattr(event, 'status', None))
+                except Exception as e:
+                    statuses.put(e)
+                statuses.put(StopIteration)
+
+            Thread(target=pump, daemon=True).start()
+            while True:
+                remaining = stop_at - time.perf_counter()
+                try:
+                    item = statuses.get(timeout=max(remaining, 0))
+                except queue.Empty:
+                    raise ExecutionTimeout(execution_id, time.perf_counter() - start, status)
+                if item is StopIteration:
+                    break
+                if isinstance(item, Exception):
+                    print(f"Status stream failed, polling instead: {item}")
+                    break
+                status = item or status
+                if status in TERMINAL_STATUSES:
+                    stats['mode'] = 'stream'
+                    stats['polls'] += 1
+                    return client.executions.get(execution_id)
+
+    stats['mode'] = 'poll'
+    for delay in (backoff or Backoff()):
+        result = client.executions.get(execution_id)
+        stats['polls'] += 1
+        if result.status in TERMINAL_STATUSES:
+            return result
+        remaining = stop_at - time.perf_counter()
+        if remaining <= 0:
+            raise ExecutionTimeout(execution_id, time.perf_counter() - start, result.status)
+        time.sleep(min(delay, remaining))
@@ -1,15 +1,17 @@
 # face_controller.py (updated)
 import cv2
 import mediapipe as mp
-import pyautogui
 import numpy as np
 import time
-import keyboard
 from threading import Thread
 import sys
 import os
-
-pyautogui.FAILSAFE = False
+from camera import CameraSession
+from config import Config
+from landmark_features import LandmarkFeatures
+from frame_scheduler import AdaptiveRateScheduler
+from frame_preprocessor import FramePreprocessor
+from input_sink import PyAutoGuiSink, InputDispatcher
 
 if getattr(sys, 'frozen', False):
     base_path = sys._MEIPASS
@@ -18,10 +20,42 @@ if getattr(sys, 'frozen', False):
         'mediapipe/modules'
     )
 
+DEFAULT_PARAMS = {
+    'EMA_ALPHA': 0.15,
+    'CURSOR_SENSITIVITY_X': 8,
+    'CURSOR_SENSITIVITY_Y': 8,
+    'BLINK_THRESHOLD_RATIO': 0.75,
+    'CALIBRATION_FRAMES': 30,
+    'MOVEMENT_THRESHOLD': 0.02,
+    'DOUBLE_CLICK_THRESHOLD': 0.8,
+    'EYEBROW_RAISE_THRESHOLD_RATIO': 1.4,
+    'RIGHT_CLICK_COOLDOWN': 1.0,
+    'MOUTH_OPEN_THRESHOLD_RATIO': 1.5,
+    'SCROLL_THRESHOLD': 0.03,
+    'SCROLL_STEP': 50,
+    'SCROLL_INTERVAL': 0.05,
+    'MIN_FPS': 5,
+    'MAX_FPS': 30,
+    'IDLE_MOTION_THRESHOLD': 0.004,
+    'IDLE_HOLD_TIME': 1.5,
+    'ROI_PADDING': 0.3,
+    'ROI_SCALE': 1.0
+}
+
 class FaceController(Thread):
-    def __init__(self, params):
+    def __init__(self, params, video_source=None, sink=None):
         super().__init__()
         self.params = params
+        self.video_source = video_source  # None uses Config.CAMERA_SETTINGS['index']
+        # Where pointer events go. By default OS calls run on a dispatch
+        # thread so a slow X11/Win32 call never stalls the vision loop;
+        # replay runs pass a RecordingSink instead
+        self.dispatcher = None
+        if sink is None:
+            sink = self.dispatcher = InputDispatcher(PyAutoGuiSink())
+        self.sink = sink
+        self.clock = time.time
+        self.stage_timer = None  # Optional object with record(stage, seconds)
         self.paused = False
         self.running = True
         self._setup_mediapipe()
@@ -54,47 +88,85 @@ class FaceController(Thread):
         self.initial_smooth_y = None
         self.last_scroll_time = 0
         self.mouth_open_threshold = 0
-        self.screen_w, self.screen_h = pyautogui.size()
+        self.screen_w, self.screen_h = self.sink.size()
+        self.features = LandmarkFeatures()
+        self.scheduler = AdaptiveRateScheduler(self.params)
+        self.roi = None  # Face crop in raw frame pixels: (x0, y0, x1, y1)
+        self.preprocessor = FramePreprocessor()
+        self.camera = None
+        self._first_move = False
         
     def run(self):
-        self._calibrate()
-        cap = cv2.VideoCapture(0)
+        # One camera session for calibration and tracking. Capture runs on
+        # its own thread so inference always sees the newest frame instead
+        # of draining stale ones from the driver buffer
+        self.camera = CameraSession.from_settings(Config.CAMERA_SETTINGS, self.video_source)
         try:
-            while self.running:
-                if not self.paused:
-                    self._process_frame(cap)
-                time.sleep(0.01)
+            self.camera.open()
+            self._calibrate()
+            if self.dispatcher:
+                self.dispatcher.start()
+            while self.running and not self.camera.finished:
+                frame, _ = self.camera.read(timeout=0.5)
+                if frame is None or self.paused:
+                    continue
+                self.scheduler.frame_started()
+                self._process_frame(frame)
+                self.scheduler.wait(lambda: self.running)
+        except RuntimeError as e:
+            print(f"Camera error: {e}")
         finally:
-            cap.release()
+            self.camera.close()
             cv2.destroyAllWindows()
+            if self.dispatcher:
+                self.dispatcher.stop()
+            self._report_stats()
+
+    def _report_startup(self):
+        t = self.camera.timings
+        print("Startup: " + ", ".join(f"{name.replace('_', ' ')} {seconds:.2f}s"
+                                      for name, seconds in t.items()))
+
+    def _report_stats(self):
+        stats = self.scheduler.stats()
+        if stats:
+            print(f"Adaptive frame rate: {stats['avg_fps']:.1f} FPS average, "
+                  f"idle {stats['idle_fraction']:.0%} of the time, "
+                  f"~{stats['cpu_saved_fraction']:.0%} CPU saved "
+                  f"({stats['cpu_saved_seconds']:.1f}s)")
+        if self.dispatcher:
+            m = self.dispatcher.metrics()
+            print(f"Input dispatch: {m['delivered']} delivered, {m['coalesced']} coalesced, "
+                  f"{m['dropped']} dropped, max queue depth {m['max_queue_depth']}, "
+                  f"latency {m['mean_latency_ms']:.1f} ms mean / {m['max_latency_ms']:.1f} ms max")
             
     def _calibrate(self):
         print("Calibrating...")
-        cap = cv2.VideoCapture(0)
         calibration_counter = 0
-        while calibration_counter < self.params['CALIBRATION_FRAMES'] and self.running:
-            ret, frame = cap.read()
-            if ret:
-                results = self.face_mesh.process(cv2.cvtColor(frame, cv2.COLOR_BGR2RGB))
-                if results.multi_face_landmarks:
-                    landmarks = results.multi_face_landmarks[0].landmark
-                    self._collect_calibration_data(landmarks)
-                    calibration_counter += 1
-        cap.release()
+        while (calibration_counter < self.params['CALIBRATION_FRAMES'] and self.running
+               and not self.camera.finished):
+            frame, _ = self.camera.read(timeout=0.5)
+            if frame is None:
+                continue
+            self.camera.mark('first_frame')
+            if self._calibration_step(frame):
+                calibration_counter += 1
         self._finalize_calibration()
+        self.camera.mark('calibrated')
+
+    def _calibration_step(self, frame):
+        results = self.face_mesh.process(self.preprocessor.to_rgb(frame))
+        if not results.multi_face_landmarks:
+            return False
+        self.features.update(results.multi_face_landmarks[0], mirror=True)
+        self._collect_calibration_data(self.features)
+        return True
         
-    def _collect_calibration_data(self, landmarks):
-        left_ear = self._calculate_ear(landmarks, [362, 385, 387, 263, 373, 380])
-        right_ear = self._calculate_ear(landmarks, [33, 160, 158, 133, 153, 144])
-        self.normal_ear += (left_ear + right_ear) / 2
-        
-        left_eyebrow_y = np.mean([landmarks[i].y for i in [276, 283, 282, 295, 285]])
-        self.calibration_eyebrow_left += (landmarks[362].y - left_eyebrow_y)
-        
-        right_eyebrow_y = np.mean([landmarks[i].y for i in [46, 53, 52, 65, 55]])
-        self.calibration_eyebrow_right += (landmarks[133].y - right_eyebrow_y)
-        
-        self.normal_mouth += self._calculate_mouth_open(landmarks)
+    def _collect_calibration_data(self, features):
+        self.normal_ear += features.avg_ear
+        self.calibration_eyebrow_left += features.brow_left
+        self.calibration_eyebrow_right += features.brow_right
+        self.normal_mouth += features.mouth_open
         
     def _finalize_calibration(self):
         self.normal_ear /= self.params['CALIBRATION_FRAMES']
@@ -105,45 +177,118 @@ class FaceController(Thread):
         self.mouth_open_threshold = self.normal_mouth * self.params['MOUTH_OPEN_THRESHOLD_RATIO']
         print("Calibration complete")
         
-    def _process_frame(self, cap):
-        ret, frame = cap.read()
-        if not ret: return
-        
-        results = self.face_mesh.process(cv2.cvtColor(cv2.flip(frame, 1), cv2.COLOR_BGR2RGB))
-        if results.multi_face_landmarks:
-            self._handle_face_landmarks(results.multi_face_landmarks[0].landmark)
+    def _process_frame(self, frame):
+        """Run inference and gesture handling on one frame, True if a face was found"""
+        start = time.perf_counter()
+        frame_h, frame_w = frame.shape[:2]
+        roi = self.roi
+        if roi:
+            x0, y0, x1, y1 = roi
+            crop = frame[y0:y1, x0:x1]  # A view, no copy
+        else:
+            crop = frame
+
+        # The frame is never flipped: landmarks are mirrored (x -> 1 - x)
+        # afterwards, which is all the cursor mapping needs
+        scale = self.params['ROI_SCALE'] if roi else 1.0
+        image = self.preprocessor.to_rgb(crop, scale)
+        preprocessed = time.perf_counter()
+        results = self.face_mesh.process(image)
+        inferred = time.perf_counter()
+
+        found = bool(results.multi_face_landmarks)
+        if found:
+            norm_roi = None
+            if roi:
+                norm_roi = (x0 / frame_w, y0 / frame_h, (x1 - x0) / frame_w, (y1 - y0) / frame_h)
+            self.features.update(results.multi_face_landmarks[0], norm_roi, mirror=True)
+            self._update_roi(frame_w, frame_h)
+            self._handle_face_landmarks(self.features)
+        else:
+            self.roi = None  # Tracking lost, search the full frame again
+            self.scheduler.observe_no_face(self.clock())
+
+        if self.stage_timer:
+            done = time.perf_counter()
+            self.stage_timer.record('preprocess', preprocessed - start)
+            self.stage_timer.record('inference', inferred - preprocessed)
+            self.stage_timer.record('gestures', done - inferred)
+        return found
+
+    def _update_roi(self, frame_w, frame_h):
+        padding = self.params['ROI_PADDING']
+        if padding <= 0:
+            self.roi = None
+            return
+        min_x, min_y, max_x, max_y = self.features.bounds()
+        # Features are mirrored, the crop is taken from the raw frame
+        face_x0, face_x1 = (1 - max_x) * frame_w, (1 - min_x) * frame_w
+        face_y0, face_y1 = min_y * frame_h, max_y * frame_h
+
+        # Keep the current crop while the face stays clear of its edges so
+        # the tracker sees a stable image size and position
+        if self.roi:
+            x0, y0, x1, y1 = self.roi
+            margin_x = (face_x1 - face_x0) * padding / 2
+            margin_y = (face_y1 - face_y0) * padding / 2
+            if (face_x0 - margin_x >= x0 and face_x1 + margin_x <= x1 and
+                    face_y0 - margin_y >= y0 and face_y1 + margin_y <= y1):
+                return
+
+        pad_x = (face_x1 - face_x0) * padding
+        pad_y = (face_y1 - face_y0) * padding
+        x0 = max(0, int(face_x0 - pad_x))
+        y0 = max(0, int(face_y0 - pad_y))
+        x1 = min(frame_w, int(face_x1 + pad_x) + 1)
+        y1 = min(frame_h, int(face_y1 + pad_y) + 1)
+
+        # Tiny or nearly full-frame crops are not worth it
+        if x1 - x0 < 64 or y1 - y0 < 64 or (x1 - x0) * (y1 - y0) > 0.8 * frame_w * frame_h:
+            self.roi = None
+        else:
+            self.roi = (x0, y0, x1, y1)
             
-    def _handle_face_landmarks(self, landmarks):
-        current_time = time.time()
+    def _handle_face_landmarks(self, features):
+        current_time = self.clock()
         
-        # Calculate EAR early for blink detection
-        left_ear = self._calculate_ear(landmarks, [362, 385, 387, 263, 373, 380])
-        right_ear = self._calculate_ear(landmarks, [33, 160, 158, 133, 153, 144])
-        avg_ear = (left_ear + right_ear) / 2
+        # EAR, brow and mouth features are computed once per frame
+        avg_ear = features.avg_ear
         is_blink_frame = avg_ear < self.ear_threshold
         
         # Only update cursor when eyes are open
         if not is_blink_frame:
-            self._handle_cursor(landmarks)
-        
-        self._handle_blinks(landmarks, current_time, avg_ear)
-        self._handle_eyebrow_gestures(landmarks, current_time)
-        self._handle_mouth_gestures(landmarks, current_time)
+            self._handle_cursor(features)
         
-    def _handle_cursor(self, landmarks):
-        left_eye = landmarks[362]
-        right_eye = landmarks[133]
-        new_x = (left_eye.x + right_eye.x) / 2
-        new_y = (left_eye.y + right_eye.y) / 2
+        self._handle_blinks(features, current_time, avg_ear)
+        self._handle_eyebrow_gestures(features, current_time)
+        self._handle_mouth_gestures(features, current_time)
+        self.scheduler.observe(features.eye_x, features.eye_y,
+                               self._gesture_active(features, current_time), current_time)
+
+    def _gesture_active(self, features, current_time):
+        # Eyes already half-way to the blink threshold count as a closure starting
+        eyes_closing = features.avg_ear < (self.normal_ear + self.ear_threshold) / 2
+        return (eyes_closing or
+                self.blink_counter > 0 or
+                self.scrolling or
+                self.initial_smooth_x is not None or
+                features.mouth_open > self.mouth_open_threshold or
+                (self.waiting_for_double and
+                 current_time - self.first_blink_time <= self.params['DOUBLE_CLICK_THRESHOLD']))
         
-        smooth_x, smooth_y = self._exponential_smoothing(new_x, new_y)
+    def _handle_cursor(self, features):
+        smooth_x, smooth_y = self._exponential_smoothing(features.eye_x, features.eye_y)
         delta_x = (smooth_x - 0.5) * self.params['CURSOR_SENSITIVITY_X']
         delta_y = (smooth_y - 0.5) * self.params['CURSOR_SENSITIVITY_Y']
         
         if abs(delta_x) > self.params['MOVEMENT_THRESHOLD'] or abs(delta_y) > self.params['MOVEMENT_THRESHOLD']:
             cursor_x = self.screen_w * np.clip(0.5 + delta_x, 0, 1)
             cursor_y = self.screen_h * np.clip(0.5 + delta_y, 0, 1)
-            pyautogui.moveTo(cursor_x, cursor_y, _pause=False)
+            self.sink.move_to(cursor_x, cursor_y)
+            if not self._first_move and self.camera:
+                self._first_move = True
+                self.camera.mark('first_cursor_move')
+                self._report_startup()
             
     def _exponential_smoothing(self, new_x, new_y):
         alpha = self.params['EMA_ALPHA']
@@ -152,7 +297,7 @@ class FaceController(Thread):
         self.prev_smooth_x, self.prev_smooth_y = smooth_x, smooth_y
         return smooth_x, smooth_y
     
-    def _handle_blinks(self, landmarks, current_time, avg_ear):
+    def _handle_blinks(self, features, current_time, avg_ear):
         if avg_ear < self.ear_threshold:
             self.blink_counter += 1
         else:
@@ -165,27 +310,27 @@ class FaceController(Thread):
     def _handle_possible_click(self, current_time):
         if self.waiting_for_double:
             if (current_time - self.first_blink_time) <= self.params['DOUBLE_CLICK_THRESHOLD']:
-                pyautogui.doubleClick()
+                self.sink.double_click()
                 self.waiting_for_double = False
             else:
-                pyautogui.click()
+                self.sink.click()
                 self.first_blink_time = current_time
         else:
             self.waiting_for_double = True
             self.first_blink_time = current_time
             
-    def _handle_eyebrow_gestures(self, landmarks, current_time):
-        left_dist = landmarks[362].y - np.mean([landmarks[i].y for i in [276, 283, 282, 295, 285]])
-        right_dist = landmarks[133].y - np.mean([landmarks[i].y for i in [46, 53, 52, 65, 55]])
+    def _handle_eyebrow_gestures(self, features, current_time):
+        left_dist = features.brow_left
+        right_dist = features.brow_right
         
         if (left_dist > self.calibration_eyebrow_left * self.params['EYEBROW_RAISE_THRESHOLD_RATIO'] or
             right_dist > self.calibration_eyebrow_right * self.params['EYEBROW_RAISE_THRESHOLD_RATIO']):
             if (current_time - self.last_right_click_time) > self.params['RIGHT_CLICK_COOLDOWN']:
-                pyautogui.rightClick()
+                self.sink.right_click()
                 self.last_right_click_time = current_time
                 
-    def _handle_mouth_gestures(self, landmarks, current_time):
-        current_mouth = self._calculate_mouth_open(landmarks)
+    def _handle_mouth_gestures(self, features, current_time):
+        current_mouth = features.mouth_open
         mouth_open = current_mouth > self.mouth_open_threshold
         
         if mouth_open:
@@ -217,24 +362,14 @@ class FaceController(Thread):
             
     def _execute_scroll(self):
         if self.scroll_direction == 'up':
-            pyautogui.scroll(self.params['SCROLL_STEP'])
+            self.sink.scroll(self.params['SCROLL_STEP'])
         elif self.scroll_direction == 'down':
-            pyautogui.scroll(-self.params['SCROLL_STEP'])
+            self.sink.scroll(-self.params['SCROLL_STEP'])
         elif self.scroll_direction == 'left':
-            pyautogui.hscroll(-self.params['SCROLL_STEP'])
+            self.sink.hscroll(-self.params['SCROLL_STEP'])
         elif self.scroll_direction == 'right':
-            pyautogui.hscroll(self.params['SCROLL_STEP'])
+            self.sink.hscroll(self.params['SCROLL_STEP'])
             
-    def _calculate_ear(self, landmarks, eye_indices):
-        points = [landmarks[i] for i in eye_indices]
-        vertical1 = np.linalg.norm([points[1].x - points[5].x, points[1].y - points[5].y])
-        vertical2 = np.linalg.norm([points[2].x - points[4].x, points[2].y - points[4].y])
-        horizontal = np.linalg.norm([points[0].x - points[3].x, points[0].y - points[3].y])
-        return (vertical1 + vertical2) / (2 * horizontal)
-    
-    def _calculate_mouth_open(self, landmarks):
-        return abs(landmarks[13].y - landmarks[14].y)
-    
     def stop(self):
         self.running = False
         self.join()
@@ -0,0 +1,84 @@
+# fake_julep.py
+"""In-process stand-in for the Julep client with simulated planner latency.
+
+    handler = CommandHandler(client=FakeJulep(latency=(0.3, 1.5)))
+
+Implements the calls CommandHandler makes (agents.create, tasks.create,
+executions.create / get and executions.status.stream) without a network.
+"""
+import itertools
+import json
+import random
+import time
+from threading import Lock
+from types import SimpleNamespace
+
+DEFAULT_PLAN = [{"command": "press_keys", "parameters": {"keys": ["ctrl", "s"]}}]
+
+
+class _FakeStatus:
+    def __init__(self, executions):
+        self._executions = executions
+
+    def stream(self, execution_id):
+        """Yields a status event on every state change, like the SSE endpoint"""
+        execution = self._executions._runs[execution_id]
+        yield SimpleNamespace(status='running')
+        remaining = execution['done_at'] - time.perf_counter()
+        if remaining > 0:
+            time.sleep(remaining)
+        yield SimpleNamespace(status=execution['final'])
+
+
+class _FakeExecutions:
+    def __init__(self, fake):
+        self._fake = fake
+        self._runs = {}
+        self._ids = itertools.count(1)
+        self._lock = Lock()
+        if fake.stream:
+            self.status = _FakeStatus(self)
+
+    def create(self, task_id, input):
+        latency = self._fake.rng.uniform(*self._fake.latency)
+        failed = self._fake.rng.random() < self._fake.fail_rate
+        with self._lock:
+            execution_id = f"exec-{next(self._ids)}"
+            self._runs[execution_id] = {
+                'done_at': time.perf_counter() + latency,
+                'final': 'failed' if failed else 'succeeded',
+                'prompt': input.get('prompt', ''),
+            }
+        self._fake.created += 1
+        return SimpleNamespace(id=execution_id, status='queued')
+
+    def get(self, execution_id):
+        self._fake.gets += 1
+        run = self._runs[execution_id]
+        if time.perf_counter() < run['done_at']:
+            return SimpleNamespace(id=execution_id, status='running', output=None, error=None)
+        if run['final'] == 'failed':
+            return SimpleNamespace(id=execution_id, status='failed', output=None, error="simulated failure")
+        content = self._fake.respond(run['prompt'])
+        return SimpleNamespace(id=execution_id, status='succeeded', error=None,
+                               output={'choices': [{'message': {'content': content}}]})
+
+
+class FakeJulep:
+    """`latency` is a (min, max) range in seconds drawn per execution"""
+
+    def __init__(self, latency=(0.2, 1.2), plan=None, fail_rate=0.0, stream=True, seed=None):
+        self.latency = latency
+        self.plan = plan or DEFAULT_PLAN
+        self.fail_rate = fail_rate
+        self.stream = stream
+        self.rng = random.Random(seed)
+        self.created = 0
+        self.gets = 0
+        self.agents = SimpleNamespace(create=lambda **kwargs: SimpleNamespace(id='agent-fake'))
+        self.tasks = SimpleNamespace(create=lambda **kwargs: SimpleNamespace(id='task-fake'))
+        self.executions = _FakeExecutions(self)
+
+    def respond(self, prompt):
+        """Planner output for a prompt; wrapped in a fence like the real model often does"""
+        return "```json\n" + json.dumps(self.plan) + "\n```"
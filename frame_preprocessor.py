@@ -0,0 +1,33 @@
+# frame_preprocessor.py
+import cv2
+import numpy as np
+
+
+class FramePreprocessor:
+    """BGR->RGB conversion and optional downscale into reused buffers.
+
+    Each stage writes through `dst=` into a flat buffer that only grows, so
+    a steady stream of same-sized frames (or crops) allocates nothing.
+    """
+
+    def __init__(self):
+        self._storage = {}
+
+    def _buffer(self, stage, shape):
+        size = shape[0] * shape[1] * shape[2]
+        storage = self._storage.get(stage)
+        if storage is None or storage.size < size:
+            storage = self._storage[stage] = np.empty(size, dtype=np.uint8)
+        # Contiguous view over the front of the storage, no data copy
+        return storage[:size].reshape(shape)
+
+    def to_rgb(self, bgr, scale=1.0):
+        if scale < 1:
+            h, w = bgr.shape[:2]
+            size = (max(1, int(w * scale)), max(1, int(h * scale)))
+            small = self._buffer('resize', (size[1], size[0], 3))
+            cv2.resize(bgr, size, dst=small, interpolation=cv2.INTER_AREA)
+            bgr = small
+        rgb = self._buffer('rgb', bgr.shape)
+        cv2.cvtColor(bgr, cv2.COLOR_BGR2RGB, dst=rgb)
+        return rgb
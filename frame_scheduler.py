@@ -0,0 +1,92 @@
+# frame_scheduler.py
+import math
+import time
+
+
+class AdaptiveRateScheduler:
+    """Throttles face inference while the head is still and no gesture is live.
+
+    Drops to MIN_FPS after IDLE_HOLD_TIME seconds without landmark motion or
+    gesture activity and returns to MAX_FPS on the first active frame.
+    """
+
+    def __init__(self, params):
+        self.params = params
+        self.idle = False
+        self._last_active = None  # Set from the first frame's clock, which may be a replay's
+        self._last_x = None
+        self._last_y = None
+        self._frame_start = 0.0
+
+        # Stats for the CPU-saved report
+        self._started = None
+        self._cpu_start = 0.0
+        self._idle_since = 0.0
+        self.idle_seconds = 0.0
+        self.processed = 0
+
+    def interval(self):
+        fps = self.params['MIN_FPS'] if self.idle else self.params['MAX_FPS']
+        return 1.0 / max(fps, 1)
+
+    def frame_started(self):
+        """Mark the start of one processed frame"""
+        self._frame_start = time.perf_counter()
+        if self._started is None:
+            self._started = self._frame_start
+            self._cpu_start = time.thread_time()
+        self.processed += 1
+
+    def wait(self, is_running=lambda: True):
+        """Sleep until the next frame is due at the current rate"""
+        due = self._frame_start + self.interval()
+        # Short slices keep stop() responsive at low rates
+        while is_running():
+            delay = due - time.perf_counter()
+            if delay <= 0:
+                break
+            time.sleep(min(delay, 0.05))
+
+    def observe(self, x, y, gesture_active, now):
+        """Feed the cursor anchor and gesture state of the current frame"""
+        moved = False
+        if self._last_x is not None:
+            motion = math.hypot(x - self._last_x, y - self._last_y)
+            moved = motion > self.params['IDLE_MOTION_THRESHOLD']
+        self._last_x, self._last_y = x, y
+        self._set_active(moved or gesture_active, now)
+
+    def observe_no_face(self, now):
+        """No face in view counts as idle once the hold period passes"""
+        self._last_x = self._last_y = None
+        self._set_active(False, now)
+
+    def _set_active(self, active, now):
+        if self._last_active is None:
+            self._last_active = now
+        if active:
+            self._last_active = now
+            if self.idle:
+                self.idle = False
+                self.idle_seconds += now - self._idle_since
+        elif not self.idle and now - self._last_active >= self.params['IDLE_HOLD_TIME']:
+            self.idle = True
+            self._idle_since = now
+
+    def stats(self):
+        """Average rate and estimated CPU saved versus always running at MAX_FPS"""
+        if self._started is None:
+            return None
+        elapsed = max(time.perf_counter() - self._started, 1e-6)
+        cpu_per_frame = (time.thread_time() - self._cpu_start) / self.processed
+        full_rate_frames = max(elapsed * self.params['MAX_FPS'], self.processed)
+        idle_seconds = self.idle_seconds
+        if self.idle:
+            idle_seconds += time.time() - self._idle_since
+        return {
+            'avg_fps': self.processed / elapsed,
+            'idle_fraction': min(1.0, idle_seconds / elapsed),
+            'cpu_ms_per_frame': cpu_per_frame * 1000,
+            'cpu_saved_fraction': 1 - self.processed / full_rate_frames,
+            'cpu_saved_seconds': (full_rate_frames - self.processed) * cpu_per_frame,
+        }
@@ -0,0 +1,180 @@
+# input_sink.py
+import time
+from collections import Counter, deque
+from threading import Thread, Condition
+
+
+class PyAutoGuiSink:
+    """Sends pointer events to the OS through pyautogui"""
+
+    def __init__(self):
+        import pyautogui
+        pyautogui.FAILSAFE = False
+        self._gui = pyautogui
+
+    def size(self):
+        return self._gui.size()
+
+    def move_to(self, x, y):
+        self._gui.moveTo(x, y, _pause=False)
+
+    def click(self):
+        self._gui.click()
+
+    def double_click(self):
+        self._gui.doubleClick()
+
+    def right_click(self):
+        self._gui.rightClick()
+
+    def scroll(self, amount):
+        self._gui.scroll(amount)
+
+    def hscroll(self, amount):
+        self._gui.hscroll(amount)
+
+
+class RecordingSink:
+    """Records pointer events with timestamps instead of sending them"""
+
+    def __init__(self, size=(1920, 1080), clock=time.time):
+        self._size = size
+        self.clock = clock
+        self.events = []  # (timestamp, event, args)
+
+    def _record(self, event, *args):
+        self.events.append((self.clock(), event, args))
+
+    def size(self):
+        return self._size
+
+    def move_to(self, x, y):
+        self._record('move_to', float(x), float(y))
+
+    def click(self):
+        self._record('click')
+
+    def double_click(self):
+        self._record('double_click')
+
+    def right_click(self):
+        self._record('right_click')
+
+    def scroll(self, amount):
+        self._record('scroll', amount)
+
+    def hscroll(self, amount):
+        self._record('hscroll', amount)
+
+    def counts(self):
+        return Counter(event for _, event, _ in self.events)
+
+
+class InputDispatcher(Thread):
+    """Delivers pointer events to another sink on its own thread.
+
+    The vision loop only enqueues. Consecutive cursor moves collapse to the
+    newest position, consecutive scrolls on one axis merge into one call,
+    and clicks are delivered in order. When the bounded queue is full the
+    oldest pending move is dropped first, then the incoming event.
+    """
+
+    _MERGEABLE = ('scroll', 'hscroll')
+
+    def __init__(self, sink, max_queue=64):
+        super().__init__(daemon=True)
+        self.sink = sink
+        self.max_queue = max_queue
+        self.running = True
+        self._queue = deque()  # [event, args, enqueue_time]
+        self._cond = Condition()
+
+        self.enqueued = 0
+        self.delivered = 0
+        self.coalesced = 0
+        self.dropped = 0
+        self.max_depth = 0
+        self._latency_total = 0.0
+        self.max_latency = 0.0
+
+    def size(self):
+        return self.sink.size()
+
+    def move_to(self, x, y):
+        self._put('move_to', (x, y))
+
+    def click(self):
+        self._put('click', ())
+
+    def double_click(self):
+        self._put('double_click', ())
+
+    def right_click(self):
+        self._put('right_click', ())
+
+    def scroll(self, amount):
+        self._put('scroll', (amount,))
+
+    def hscroll(self, amount):
+        self._put('hscroll', (amount,))
+
+    def _put(self, event, args):
+        with self._cond:
+            self.enqueued += 1
+            last = self._queue[-1] if self._queue else None
+            if last and last[0] == event == 'move_to':
+                last[1] = args  # Keep the older timestamp so latency stays honest
+                self.coalesced += 1
+                return
+            if last and last[0] == event and event in self._MERGEABLE:
+                last[1] = (last[1][0] + args[0],)
+                self.coalesced += 1
+                return
+            if len(self._queue) >= self.max_queue:
+                stale = next((item for item in self._queue if item[0] == 'move_to'), None)
+                if stale is None:
+                    self.dropped += 1
+                    return
+                self._queue.remove(stale)
+                self.dropped += 1
+            self._queue.append([event, args, time.perf_counter()])
+            self.max_depth = max(self.max_depth, len(self._queue))
+            self._cond.notify()
+
+    def run(self):
+        while True:
+            with self._cond:
+                self._cond.wait_for(lambda: self._queue or not self.running)
+                if not self._queue:
+                    return
+                event, args, queued_at = self._queue.popleft()
+            try:
+                getattr(self.sink, event)(*args)
+            except Exception as e:
+                print(f"Input dispatch error ({event}): {e}")
+            latency = time.perf_counter() - queued_at
+            with self._cond:
+                self.delivered += 1
+                self._latency_total += latency
+                self.max_latency = max(self.max_latency, latency)
+
+    def stop(self):
+        """Deliver what is already queued, then stop the thread"""
+        with self._cond:
+            self.running = False
+            self._cond.notify()
+        if self.is_alive():
+            self.join(timeout=1.0)
+
+    def metrics(self):
+        with self._cond:
+            return {
+                'queue_depth': len(self._queue),
+                'max_queue_depth': self.max_depth,
+                'enqueued': self.enqueued,
+                'delivered': self.delivered,
+                'coalesced': self.coalesced,
+                'dropped': self.dropped,
+                'mean_latency_ms': self._latency_total / self.delivered * 1000 if self.delivered else 0.0,
+                'max_latency_ms': self.max_latency * 1000,
+            }
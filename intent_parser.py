@@ -0,0 +1,215 @@
+# intent_parser.py
+"""Deterministic parser for frequent voice commands.
+
+Maps phrases like "press control S", "scroll down 3" or "open notepad and
+type hello" straight to CommandHandler action JSON. Anything it does not
+fully understand returns None and goes to the LLM instead.
+"""
+import re
+import time
+
+# Spoken key names -> `keyboard` library names
+KEY_ALIASES = {
+    'control': 'ctrl', 'ctrl': 'ctrl', 'shift': 'shift', 'alt': 'alt', 'option': 'alt',
+    'windows': 'windows', 'win': 'windows', 'super': 'windows', 'command': 'windows',
+    'enter': 'enter', 'return': 'enter', 'escape': 'esc', 'esc': 'esc', 'tab': 'tab',
+    'space': 'space', 'spacebar': 'space', 'backspace': 'backspace', 'delete': 'delete',
+    'del': 'delete', 'insert': 'insert', 'home': 'home', 'end': 'end',
+    'up': 'up', 'down': 'down', 'left': 'left', 'right': 'right',
+    'page up': 'page up', 'page down': 'page down', 'caps lock': 'caps lock',
+    'print screen': 'print screen', 'plus': None, 'and': None,
+}
+
+# Spoken shortcuts -> key combination
+SHORTCUTS = {
+    'save': ['ctrl', 's'], 'save file': ['ctrl', 's'], 'save this': ['ctrl', 's'],
+    'copy': ['ctrl', 'c'], 'copy that': ['ctrl', 'c'], 'cut': ['ctrl', 'x'],
+    'paste': ['ctrl', 'v'], 'paste it': ['ctrl', 'v'], 'undo': ['ctrl', 'z'],
+    'redo': ['ctrl', 'y'], 'select all': ['ctrl', 'a'], 'find': ['ctrl', 'f'],
+    'new tab': ['ctrl', 't'], 'close tab': ['ctrl', 'w'], 'reopen tab': ['ctrl', 'shift', 't'],
+    'next tab': ['ctrl', 'tab'], 'previous tab': ['ctrl', 'shift', 'tab'],
+    'refresh': ['f5'], 'reload': ['f5'], 'close window': ['alt', 'f4'],
+    'switch window': ['alt', 'tab'], 'next window': ['alt', 'tab'],
+    'minimize all': ['windows', 'd'], 'show desktop': ['windows', 'd'],
+    'task manager': ['ctrl', 'shift', 'esc'], 'open task manager': ['ctrl', 'shift', 'esc'],
+    'lock screen': ['windows', 'l'], 'go back': ['alt', 'left'], 'go forward': ['alt', 'right'],
+}
+
+# Spoken app names -> `start` target
+APPS = {
+    'notepad': 'notepad', 'calculator': 'calc', 'calc': 'calc', 'paint': 'mspaint',
+    'command prompt': 'cmd', 'cmd': 'cmd', 'terminal': 'wt', 'powershell': 'powershell',
+    'file explorer': 'explorer', 'explorer': 'explorer', 'files': 'explorer',
+    'word': 'winword', 'excel': 'excel', 'powerpoint': 'powerpnt', 'outlook': 'outlook',
+    'chrome': 'chrome', 'google chrome': 'chrome', 'edge': 'msedge', 'firefox': 'firefox',
+    'settings': 'ms-settings:', 'control panel': 'control', 'vs code': 'code', 'vscode': 'code',
+    'spotify': 'spotify', 'snipping tool': 'snippingtool',
+}
+
+SITES = {
+    'youtube': 'https://www.youtube.com', 'google': 'https://www.google.com',
+    'gmail': 'https://mail.google.com', 'github': 'https://github.com',
+    'maps': 'https://maps.google.com', 'google maps': 'https://maps.google.com',
+    'wikipedia': 'https://www.wikipedia.org', 'chatgpt': 'https://chat.openai.com',
+}
+
+FIXED = {
+    'stop listening': [{'command': 'abrogate'}], 'go to sleep': [{'command': 'abrogate'}],
+    'abrogate': [{'command': 'abrogate'}],
+    'stop speaking': [{'command': 'stop_speaking'}], 'stop talking': [{'command': 'stop_speaking'}],
+    'be quiet': [{'command': 'stop_speaking'}], 'shut up': [{'command': 'stop_speaking'}],
+    'read this': [{'command': 'read_from_cursor'}], 'read from cursor': [{'command': 'read_from_cursor'}],
+    'click': [{'command': 'left_click'}], 'left click': [{'command': 'left_click'}],
+    'right click': [{'command': 'right_click'}],
+    'hold mouse': [{'command': 'hold_mouse'}], 'release mouse': [{'command': 'release_mouse'}],
+    'that was wrong': [{'command': 'forget_last_plan'}], "that's wrong": [{'command': 'forget_last_plan'}],
+    'wrong command': [{'command': 'forget_last_plan'}], 'forget that': [{'command': 'forget_last_plan'}],
+}
+
+NUMBERS = {'one': 1, 'two': 2, 'three': 3, 'four': 4, 'five': 5, 'six': 6,
+           'seven': 7, 'eight': 8, 'nine': 9, 'ten': 10, 'a bit': 3, 'a lot': 15}
+
+_PUNCT = re.compile(r"[^\w\s'.:/+-]")
+_CLAUSE_SPLIT = re.compile(r"\s*(?:,|\band then\b|\bthen\b|\band\b)\s*")
+_PRESS = re.compile(r"^(?:press|hit|push|tap)\s+(?:the\s+)?(.+?)(?:\s+keys?)?$")
+_SCROLL = re.compile(r"^scroll\s+(up|down)(?:\s+(?:by\s+)?(\d+|[a-z]+(?: [a-z]+)?))?(?:\s+times)?$")
+_OPEN = re.compile(r"^(?:open|launch|start|run)\s+(?:the\s+|my\s+)?(.+?)(?:\s+app)?$")
+_URL = re.compile(r"^(?:open|go to|visit|browse to)\s+((?:https?://)?(?:[\w-]+\.)+"
+                  r"(?:com|org|net|io|dev|ai|app|edu|gov|in|co|uk|me)(?:/\S*)?)$")
+_TYPE = re.compile(r"^(?:type|write|enter text)\s+(.+)$")
+_TYPE_RAW = re.compile(r"\b(?:type|write|enter text)\s+(.+)$", re.IGNORECASE)
+_SLEEP = re.compile(r"^(?:wait|pause)(?:\s+for)?\s+(\d+(?:\.\d+)?)\s+seconds?$")
+
+
+def normalize(text):
+    text = _PUNCT.sub(' ', text.lower().replace('’', "'"))
+    return ' '.join(text.split()).strip(' .')
+
+
+class IntentParser:
+    """Regex + keyword table matcher; parse() returns command JSON or None"""
+
+    def __init__(self):
+        self.hits = 0
+        self.misses = 0
+        self.total_seconds = 0.0
+
+    def parse(self, text):
+        start = time.perf_counter()
+        commands = self._parse(text)
+        self.total_seconds += time.perf_counter() - start
+        if commands is None:
+            self.misses += 1
+        else:
+            self.hits += 1
+        return commands
+
+    def _parse(self, text):
+        original = ' '.join(text.split())
+        text = normalize(text)
+        if not text:
+            return None
+        whole = self._clause(text, original)
+        if whole is not None:
+            return whole
+
+        # "open notepad and type hello": every clause must match
+        commands = []
+        rest = text
+        while rest:
+            typed = _TYPE.match(rest)
+            if typed:
+                # Everything after "type" is literal text, "and" included
+                commands.extend(self._type(typed.group(1), original))
+                break
+            parts = _CLAUSE_SPLIT.split(rest, maxsplit=1)
+            clause = self._clause(parts[0], original)
+            if clause is None:
+                return None
+            commands.extend(clause)
+            rest = parts[1] if len(parts) > 1 else ''
+        return commands or None
+
+    def _clause(self, text, original):
+        if text in FIXED:
+            return [dict(cmd) for cmd in FIXED[text]]
+        if text in SHORTCUTS:
+            return [{'command': 'press_keys', 'parameters': {'keys': list(SHORTCUTS[text])}}]
+
+        match = _PRESS.match(text)
+        if match:
+            keys = self._keys(match.group(1))
+            return keys and [{'command': 'press_keys', 'parameters': {'keys': keys}}]
+
+        match = _SCROLL.match(text)
+        if match:
+            amount = match.group(2)
+            if amount is None:
+                amount = 5
+            elif amount.isdigit():
+                amount = int(amount)
+            elif amount in NUMBERS:
+                amount = NUMBERS[amount]
+            else:
+                return None
+            amount = amount if match.group(1) == 'up' else -amount
+            return [{'command': 'scroll', 'parameters': {'scroll_amount': amount}}]
+
+        match = _URL.match(text)
+        if match:
+            url = match.group(1)
+            if not url.startswith('http'):
+                url = 'https://' + url
+            return [{'command': 'open_url', 'parameters': {'url': url}}]
+
+        match = _OPEN.match(text)
+        if match:
+            target = match.group(1)
+            if target in APPS:
+                return [{'command': 'run_command', 'parameters': {'command': f"start {APPS[target]}"}}]
+            if target in SITES:
+                return [{'command': 'open_url', 'parameters': {'url': SITES[target]}}]
+            return None
+
+        match = _TYPE.match(text)
+        if match:
+            return self._type(match.group(1), original)
+
+        match = _SLEEP.match(text)
+        if match:
+            return [{'command': 'sleep', 'parameters': {'duration': float(match.group(1))}}]
+        return None
+
+    @staticmethod
+    def _type(text, original):
+        # Recover the user's casing and punctuation from the raw transcript
+        raw = _TYPE_RAW.search(original)
+        if raw:
+            text = raw.group(1).rstrip('.')
+        return [{'command': 'type_text', 'parameters': {'text': text}}]
+
+    @staticmethod
+    def _keys(spoken):
+        words = re.split(r"[\s+-]+", spoken)
+        keys, i = [], 0
+        while i < len(words):
+            pair = ' '.join(words[i:i + 2])
+            if pair in KEY_ALIASES:
+                name, i = KEY_ALIASES[pair], i + 2
+            elif words[i] in KEY_ALIASES:
+                name, i = KEY_ALIASES[words[i]], i + 1
+            elif len(words[i]) == 1 or re.fullmatch(r"f\d{1,2}", words[i]):
+                name, i = words[i], i + 1
+            else:
+                return None  # Unknown word: let the LLM decide
+            if name:
+                keys.append(name)
+        return keys or None
+
+    def stats(self):
+        total = self.hits + self.misses
+        return {
+            'parsed': total,
+            'hit_rate': self.hits / total if total else 0.0,
+            'mean_us': self.total_seconds / total * 1e6 if total else 0.0,
+        }
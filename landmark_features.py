@@ -0,0 +1,188 @@
+# landmark_features.py
+import math
+from itertools import chain, islice
+from operator import attrgetter
+
+import numpy as np
+
+# MediaPipe FaceMesh indices (refine_landmarks=True gives 478 points)
+NUM_LANDMARKS = 478
+LEFT_EYE = [362, 385, 387, 263, 373, 380]
+RIGHT_EYE = [33, 160, 158, 133, 153, 144]
+LEFT_BROW = [276, 283, 282, 295, 285]
+RIGHT_BROW = [46, 53, 52, 65, 55]
+EYE_ANCHORS = [362, 133]  # Inner eye corners, also used for the cursor
+UPPER_LIP, LOWER_LIP = 13, 14
+# Every third point of the face outline (forehead, temples, cheeks, jaw,
+# chin); their extent is the face's bounding box
+FACE_OVAL = [10, 297, 389, 454, 361, 378, 152, 149, 132, 234, 162, 67]
+
+# A serialized NormalizedLandmarkList with only x/y/z set is a run of
+# fixed-size records: 0x0a <len=15> 0x0d <x:f4> 0x15 <y:f4> 0x1d <z:f4>
+_RECORD_SIZE = 17
+_RECORD_KEYS = np.array([0x0d, 0x15, 0x1d], dtype=np.uint8)
+
+
+def _build_projection():
+    """Index list plus a matrix mapping the gathered points to linear features.
+
+    Every feature is linear in the landmark coordinates except the final
+    norms of the EAR segments, so one gather and one matrix product give:
+    rows 0-11  x/y deltas of the six EAR segments (left v1, v2, h, right ...)
+    rows 12-13 left/right eye-to-brow distance
+    row  14    upper-to-lower lip delta
+    rows 15-16 cursor anchor (mean of the inner eye corners)
+    """
+    indices = sorted(set(LEFT_EYE + RIGHT_EYE + LEFT_BROW + RIGHT_BROW +
+                         EYE_ANCHORS + [UPPER_LIP, LOWER_LIP]))
+    col = {idx: i * 3 for i, idx in enumerate(indices)}  # x at +0, y at +1
+    proj = np.zeros((17, len(indices) * 3), dtype=np.float32)
+
+    row = 0
+    for eye in (LEFT_EYE, RIGHT_EYE):
+        for a, b in ((1, 5), (2, 4), (0, 3)):
+            for axis in (0, 1):
+                proj[row, col[eye[a]] + axis] += 1
+                proj[row, col[eye[b]] + axis] -= 1
+                row += 1
+    for anchor, brow in zip(EYE_ANCHORS, (LEFT_BROW, RIGHT_BROW)):
+        proj[row, col[anchor] + 1] += 1
+        for idx in brow:
+            proj[row, col[idx] + 1] -= 1 / len(brow)
+        row += 1
+    proj[row, col[UPPER_LIP] + 1] += 1
+    proj[row, col[LOWER_LIP] + 1] -= 1
+    row += 1
+    for axis in (0, 1):
+        for anchor in EYE_ANCHORS:
+            proj[row, col[anchor] + axis] += 1 / len(EYE_ANCHORS)
+        row += 1
+    return np.array(indices), proj
+
+
+class LandmarkFeatures:
+    """Converts FaceMesh landmarks to one array and derives gesture features.
+
+    update() only reads the landmarks the features and bounds() use; the
+    other rows of `points` are left stale unless `keep_all` is set (e.g.
+    when dumping landmarks for replay).
+    """
+
+    _indices, _projection = _build_projection()
+    _used = np.union1d(_indices, FACE_OVAL)
+    _used_list = _used.tolist()
+    # Byte offsets of the used records' field keys and float bytes in the wire format
+    _key_offsets = (_used[:, None] * _RECORD_SIZE + [2, 7, 12]).ravel()
+    _key_bytes = np.tile(_RECORD_KEYS, len(_used))
+    _coord_offsets = (_used[:, None] * _RECORD_SIZE + [3, 8, 13]).repeat(4) + np.tile(np.arange(4), len(_used) * 3)
+    _xyz = attrgetter('x', 'y', 'z')
+
+    def __init__(self, num_landmarks=NUM_LANDMARKS, keep_all=False):
+        self.points = np.zeros((num_landmarks, 3), dtype=np.float32)
+        self.count = 0
+        self.keep_all = keep_all
+        self._compact = np.zeros((len(self._used), 3), dtype='<f4')  # The used rows, in _used order
+        self._gathered = np.zeros((len(self._indices), 3), dtype=np.float32)
+        self._linear = np.zeros(len(self._projection), dtype=np.float32)
+
+        self.left_ear = self.right_ear = self.avg_ear = 0.0
+        self.brow_left = self.brow_right = 0.0
+        self.mouth_open = 0.0
+        self.eye_x = self.eye_y = 0.5
+
+    def update(self, face, roi=None, mirror=False):
+        """Load one face and recompute features.
+
+        `face` is a NormalizedLandmarkList (fast path, decoded straight from
+        its wire format) or any sequence of objects with .x/.y/.z. When the
+        landmarks came from a crop, `roi` is its (x, y, width, height) in
+        normalized frame coordinates and points are mapped back to the frame.
+        `mirror` flips x so an unflipped frame behaves like a mirrored one.
+        """
+        raw = face.SerializeToString() if hasattr(face, 'SerializeToString') else None
+        face = getattr(face, 'landmark', face)
+        compact = not self.keep_all and (self._gather_serialized(raw) if raw is not None
+                                         else self._gather_sequence(face))
+        if compact:
+            pts = self._compact
+        else:
+            if raw is None or not self._load_serialized(raw):
+                n = min(len(face), len(self.points))
+                self.points[:n] = [(lm.x, lm.y, lm.z) for lm in islice(face, n)]
+                self.count = n
+            pts = self.points[:self.count]
+        if roi is not None:
+            x, y, w, h = roi
+            pts *= (w, h, w)  # z shares the x scale
+            pts[:, :2] += (x, y)
+        if mirror:
+            xs = pts[:, 0]
+            np.subtract(1, xs, out=xs)
+        if compact:
+            self.points[self._used] = pts
+        return self.compute()
+
+    def load(self, points):
+        """Load an (N, 3) array of already mapped points, e.g. from a replay dump"""
+        n = min(len(points), len(self.points))
+        self.points[:n] = points[:n]
+        self.count = n
+        return self.compute()
+
+    def bounds(self):
+        """(min_x, min_y, max_x, max_y) of the face outline"""
+        xy = self.points[FACE_OVAL, :2]
+        lo, hi = xy.min(axis=0), xy.max(axis=0)
+        return lo[0], lo[1], hi[0], hi[1]
+
+    def _gather_sequence(self, face):
+        """Copy just the used landmarks into self._compact; False if some are missing"""
+        n = min(len(face), len(self.points))
+        if n <= self._used_list[-1]:
+            return False
+        xyz = self._xyz
+        flat = chain.from_iterable([xyz(face[i]) for i in self._used_list])
+        self._compact[:] = np.fromiter(flat, np.float32, self._compact.size).reshape(-1, 3)
+        self.count = n
+        return True
+
+    def _gather_serialized(self, raw):
+        """Decode just the used landmarks' floats into self._compact"""
+        n, rem = divmod(len(raw), _RECORD_SIZE)
+        if rem or not self._used_list[-1] < n <= len(self.points):
+            return False
+        data = np.frombuffer(raw, np.uint8)
+        if not np.array_equal(data[self._key_offsets], self._key_bytes):
+            return False
+        np.take(data, self._coord_offsets, out=self._compact.reshape(-1).view(np.uint8))
+        self.count = n
+        return True
+
+    def _load_serialized(self, raw):
+        n, rem = divmod(len(raw), _RECORD_SIZE)
+        if rem or not 0 < n <= len(self.points):
+            return False
+        # Strided views over the message bytes, no per-landmark Python work
+        keys = np.ndarray((n, 3), np.uint8, raw, offset=2, strides=(_RECORD_SIZE, 5))
+        if not (keys == _RECORD_KEYS).all():
+            return False
+        coords = np.ndarray((n, 3), '<f4', raw, offset=3, strides=(_RECORD_SIZE, 5))
+        np.copyto(self.points[:n], coords)
+        self.count = n
+        return True
+
+    def compute(self):
+        """Recompute all features from self.points"""
+        np.take(self.points, self._indices, axis=0, out=self._gathered)
+        np.dot(self._projection, self._gathered.reshape(-1), out=self._linear)
+        (lv1x, lv1y, lv2x, lv2y, lhx, lhy,
+         rv1x, rv1y, rv2x, rv2y, rhx, rhy,
+         brow_l, brow_r, mouth, eye_x, eye_y) = self._linear.tolist()
+
+        self.left_ear = (math.hypot(lv1x, lv1y) + math.hypot(lv2x, lv2y)) / (2 * math.hypot(lhx, lhy))
+        self.right_ear = (math.hypot(rv1x, rv1y) + math.hypot(rv2x, rv2y)) / (2 * math.hypot(rhx, rhy))
+        self.avg_ear = (self.left_ear + self.right_ear) / 2
+        self.brow_left, self.brow_right = brow_l, brow_r
+        self.mouth_open = abs(mouth)
+        self.eye_x, self.eye_y = eye_x, eye_y
+        return self
@@ -0,0 +1,304 @@
+# llm_backends.py
+"""Planner backends: Julep, Gemini REST and any OpenAI-compatible endpoint.
+
+Every backend streams the model's text with stream(prompt); HTTP backends
+share one keep-alive session pool. Pick one with Config.LLM_SETTINGS.
+"""
+import json
+import os
+import time
+from concurrent.futures import ThreadPoolExecutor, FIRST_COMPLETED, wait
+from threading import Lock
+
+import yaml
+
+from execution_waiter import Backoff, ExecutionTimeout, wait_for_execution
+
+_session = None
+_session_lock = Lock()
+
+
+def get_session(pool_size=8):
+    """Process-wide requests.Session, so every call reuses warm connections"""
+    global _session
+    with _session_lock:
+        if _session is None:
+            import requests
+            from requests.adapters import HTTPAdapter
+
+            _session = requests.Session()
+            adapter = HTTPAdapter(pool_connections=pool_size, pool_maxsize=pool_size)
+            _session.mount('http://', adapter)
+            _session.mount('https://', adapter)
+        return _session
+
+
+class LLMTimeout(Exception):
+    """The backend did not answer before its deadline"""
+
+
+class LLMBackend:
+    name = 'base'
+
+    def __init__(self, timeout=20.0):
+        self.timeout = timeout
+        self._lock = Lock()
+        self.metrics = {
+            'calls': 0,
+            'errors': 0,
+            'timeouts': 0,
+            'first_chunk_total': 0.0,
+            'latency_total': 0.0
+        }
+
+    def stream(self, prompt):
+        """Yield the response text in chunks, recording latency metrics"""
+        start = time.perf_counter()
+        first = None
+        with self._lock:
+            self.metrics['calls'] += 1
+        try:
+            for chunk in self._stream(prompt, start + self.timeout):
+                if first is None:
+                    first = time.perf_counter() - start
+                yield chunk
+        except LLMTimeout:
+            with self._lock:
+                self.metrics['timeouts'] += 1
+            raise
+        except Exception:
+            with self._lock:
+                self.metrics['errors'] += 1
+            raise
+        with self._lock:
+            self.metrics['first_chunk_total'] += first if first is not None else 0.0
+            self.metrics['latency_total'] += time.perf_counter() - start
+
+    def complete(self, prompt):
+        return ''.join(self.stream(prompt))
+
+    def _stream(self, prompt, deadline):
+        raise NotImplementedError
+
+    def summary(self):
+        m = self.metrics
+        ok = m['calls'] - m['errors'] - m['timeouts']
+        if not m['calls']:
+            return f"{self.name}: no calls"
+        return (f"{self.name}: {m['calls']} calls, {m['errors']} errors, {m['timeouts']} timeouts, "
+                f"{m['first_chunk_total'] / max(ok, 1) * 1000:.0f} ms to first chunk, "
+                f"{m['latency_total'] / max(ok, 1) * 1000:.0f} ms mean")
+
+
+class JulepBackend(LLMBackend):
+    """Julep task execution; waits with backoff or the status stream"""
+
+    name = 'julep'
+
+    def __init__(self, client=None, api_key=None, model='gpt-4o', timeout=20.0,
+                 poll_initial=0.02, poll_max=0.25):
+        super().__init__(timeout)
+        if client is None:
+            from julep import Julep
+            client = Julep(api_key=api_key or os.environ['JULEP_API_KEY'])
+        self.client = client
+        self.backoff = Backoff(initial=poll_initial, maximum=poll_max)
+        self.wait_stats = {}  # Completion mode / poll count of the last call
+
+        self.agent = self.client.agents.create(
+            name="VoiceControl",
+            model=model,
+            about="System control assistant that outputs valid JSON commands"
+        )
+        self.task = self.client.tasks.create(
+            agent_id=self.agent.id,
+            name="Voice Command Handler",
+            description="Interpret user voice command and return system-level actions in JSON",
+            main=yaml.safe_load("""
+                - prompt:
+                  - role: system
+                    content: You are a system control agent. Return a JSON array of commands only.
+                  - role: user
+                    content: $ f\"\"\"{steps[0].input.prompt}\"\"\"
+            """)
+        )
+
+    def _stream(self, prompt, deadline):
+        execution = self.client.executions.create(task_id=self.task.id, input={"prompt": prompt})
+        try:
+            result = wait_for_execution(self.client, execution.id, deadline=deadline - time.perf_counter(),
+                                        backoff=self.backoff, stats=self.wait_stats)
+        except ExecutionTimeout as e:
+            try:
+                self.client.executions.change_status(execution_id=execution.id, status='cancelled')
+            except Exception:
+                pass  # Not every SDK version can cancel; the result is ignored anyway
+            raise LLMTimeout(str(e))
+
+        if result.status != "succeeded":
+            raise RuntimeError(f"Julep execution {result.status}: {result.error}")
+        if isinstance(result.output, dict):
+            yield result.output.get('choices', [{}])[0].get('message', {}).get('content', '')
+        else:
+            yield str(result.output)
+
+
+def _sse_data(response, deadline):
+    """`data:` payloads of a server-sent event stream"""
+    for line in response.iter_lines(decode_unicode=True):
+        if time.perf_counter() > deadline:
+            response.close()
+            raise LLMTimeout("response still streaming at the deadline")
+        if line and line.startswith('data:'):
+            yield line[5:].strip()
+
+
+class _HttpBackend(LLMBackend):
+    def __init__(self, timeout=20.0, connect_timeout=3.0, session=None):
+        super().__init__(timeout)
+        self.connect_timeout = connect_timeout
+        self.session = session
+
+    def _post(self, url, payload, headers, deadline):
+        import requests
+
+        session = self.session or get_session()
+        try:
+            response = session.post(url, json=payload, headers=headers, stream=True,
+                                    timeout=(self.connect_timeout, max(deadline - time.perf_counter(), 0.1)))
+        except requests.Timeout as e:
+            raise LLMTimeout(str(e))
+        try:
+            response.raise_for_status()
+        except requests.HTTPError:
+            # A streamed error response holds its pooled connection until closed
+            response.close()
+            raise
+        return response
+
+
+class GeminiBackend(_HttpBackend):
+    """Gemini generateContent REST API, streamed over SSE"""
+
+    name = 'gemini'
+
+    def __init__(self, url, api_key, **kwargs):
+        super().__init__(**kwargs)
+        self.url = url.replace(':generateContent', ':streamGenerateContent')
+        self.api_key = api_key
+
+    def _stream(self, prompt, deadline):
+        payload = {"contents": [{"role": "user", "parts": [{"text": prompt}]}]}
+        headers = {"x-goog-api-key": self.api_key or ''}
+        with self._post(self.url + '?alt=sse', payload, headers, deadline) as response:
+            for data in _sse_data(response, deadline):
+                event = json.loads(data)
+                for candidate in event.get('candidates', []):
+                    for part in candidate.get('content', {}).get('parts', []):
+                        if part.get('text'):
+                            yield part['text']
+
+
+class OpenAICompatibleBackend(_HttpBackend):
+    """Any /v1/chat/completions server (llama.cpp, vLLM, Ollama, the mock server)"""
+
+    name = 'openai'
+
+    def __init__(self, base_url, model, api_key=None, **kwargs):
+        super().__init__(**kwargs)
+        self.url = base_url.rstrip('/') + '/chat/completions'
+        self.model = model
+        self.api_key = api_key
+
+    def _stream(self, prompt, deadline):
+        payload = {
+            "model": self.model,
+            "stream": True,
+            "temperature": 0,
+            "messages": [
+                {"role": "system", "content": "You are a system control agent. Return a JSON array of commands only."},
+                {"role": "user", "content": prompt}
+            ]
+        }
+        headers = {"Authorization": f"Bearer {self.api_key}"} if self.api_key else {}
+        with self._post(self.url, payload, headers, deadline) as response:
+            for data in _sse_data(response, deadline):
+                if data == '[DONE]':
+                    return
+                for choice in json.loads(data).get('choices', []):
+                    text = choice.get('delta', {}).get('content')
+                    if text:
+                        yield text
+
+
+class HedgedBackend(LLMBackend):
+    """Races backends and returns the first response that passes `validate`.
+
+    The first backend starts at once; each next one starts `delay` seconds
+    later if nothing valid has arrived yet. Losing calls finish in the
+    background and are ignored.
+    """
+
+    def __init__(self, backends, validate, delay=0.3, timeout=20.0):
+        super().__init__(timeout)
+        self.backends = backends
+        self.validate = validate
+        self.delay = delay
+        self.name = 'hedged(' + ', '.join(b.name for b in backends) + ')'
+        self.wins = {b.name: 0 for b in backends}
+        self._pool = ThreadPoolExecutor(max_workers=2 * len(backends))
+
+    def _stream(self, prompt, deadline):
+        pending = {}
+        queued = list(self.backends)
+        errors = []
+        while queued or pending:
+            if queued:
+                backend = queued.pop(0)
+                pending[self._pool.submit(backend.complete, prompt)] = backend
+            remaining = deadline - time.perf_counter()
+            if remaining <= 0:
+                raise LLMTimeout(f"no valid response from {self.name}")
+            done, _ = wait(pending, timeout=min(self.delay, remaining) if queued else remaining,
+                           return_when=FIRST_COMPLETED)
+            for future in done:
+                backend = pending.pop(future)
+                try:
+                    text = future.result()
+                except Exception as e:
+                    errors.append(f"{backend.name}: {e}")
+                    continue
+                if self.validate(text):
+                    self.wins[backend.name] += 1
+                    yield text
+                    return
+                errors.append(f"{backend.name}: invalid response")
+        raise RuntimeError("; ".join(errors) or "no backends")
+
+    def summary(self):
+        lines = [super().summary() + f", wins {self.wins}"]
+        lines += ['  ' + b.summary() for b in self.backends]
+        return '\n'.join(lines)
+
+
+def build_backend(name=None, client=None, validate=None, julep_api_key=None):
+    """Backend named in Config.LLM_SETTINGS; 'hedged' races the ones listed in 'hedge'"""
+    from config import Config
+
+    settings = Config.LLM_SETTINGS
+    name = name or settings['backend']
+    timeout = Config.COMMAND_SETTINGS['llm_deadline']
+    if name == 'julep':
+        return JulepBackend(client=client, api_key=julep_api_key, model=settings['julep_model'], timeout=timeout,
+                            poll_initial=Config.COMMAND_SETTINGS['poll_initial'],
+                            poll_max=Config.COMMAND_SETTINGS['poll_max'])
+    if name == 'gemini':
+        return GeminiBackend(Config.GEMINI_URL, Config.GEMINI_API_KEY, timeout=timeout)
+    if name in ('openai', 'mock'):
+        base_url = settings['mock_url'] if name == 'mock' else settings['openai_url']
+        return OpenAICompatibleBackend(base_url, settings['openai_model'],
+                                       api_key=os.getenv('OPENAI_API_KEY'), timeout=timeout)
+    if name == 'hedged':
+        backends = [build_backend(partner, client=client, julep_api_key=julep_api_key) for partner in settings['hedge']]
+        return HedgedBackend(backends, validate, delay=settings['hedge_delay'], timeout=timeout)
+    raise ValueError(f"Unknown LLM backend {name!r}")
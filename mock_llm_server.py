@@ -0,0 +1,146 @@
+# mock_llm_server.py
+"""Local stand-in LLM that answers with canned plans.
+
+    python mock_llm_server.py --port 8765 --latency 0.3
+
+Speaks the OpenAI /v1/chat/completions API (streamed or not) and Gemini's
+generateContent / streamGenerateContent, so any backend in llm_backends can
+be pointed at it. Set LLM_SETTINGS['backend'] = 'mock' to use it.
+"""
+import argparse
+import json
+import re
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from threading import Thread
+
+# First keyword found in the request picks the plan
+CANNED_PLANS = [
+    ('notepad', [{"command": "run_command", "parameters": {"command": "start notepad"}}]),
+    ('calculator', [{"command": "run_command", "parameters": {"command": "calc"}}]),
+    ('save', [{"command": "press_keys", "parameters": {"keys": ["ctrl", "s"]}}]),
+    ('search', [
+        {"command": "open_url", "parameters": {"url": "https://www.google.com"}},
+        {"command": "type_text", "parameters": {"text": "AI trends"}},
+        {"command": "press_keys", "parameters": {"keys": ["enter"]}}
+    ]),
+    ('scroll', [{"command": "scroll", "parameters": {"scroll_amount": -5}}]),
+]
+FALLBACK_PLAN = [{"command": "llm_response", "parameters": {"text": "This is the mock planner."}}]
+
+_REQUEST = re.compile(r'Request:\s*(.+)')
+
+
+def canned_plan(prompt):
+    """Plan for the 'Request:' line of a planner prompt"""
+    matches = _REQUEST.findall(prompt)
+    request = (matches[-1] if matches else prompt).lower()
+    for keyword, plan in CANNED_PLANS:
+        if keyword in request:
+            return plan
+    return FALLBACK_PLAN
+
+
+def _tokens(text, size=4):
+    """Split text into token-sized pieces for streaming"""
+    return [text[i:i + size] for i in range(0, len(text), size)]
+
+
+class MockLLMHandler(BaseHTTPRequestHandler):
+    protocol_version = 'HTTP/1.1'  # Keep-alive, like a real API server
+
+    def log_message(self, format, *args):
+        if self.server.verbose:
+            super().log_message(format, *args)
+
+    def do_POST(self):
+        body = json.loads(self.rfile.read(int(self.headers.get('Content-Length', 0))) or b'{}')
+        time.sleep(self.server.latency)
+        self.server.requests += 1
+
+        if self.path.rstrip('/').endswith('/chat/completions'):
+            prompt = body.get('messages', [{}])[-1].get('content', '')
+            if body.get('stream'):
+                self._stream(prompt, self._openai_chunk, final='[DONE]')
+            else:
+                self._json({"choices": [{"index": 0, "finish_reason": "stop",
+                                         "message": {"role": "assistant", "content": self._plan_text(prompt)}}]})
+        elif ':streamGenerateContent' in self.path:
+            self._stream(self._gemini_prompt(body), self._gemini_chunk)
+        elif ':generateContent' in self.path:
+            self._json(self._gemini_chunk(self._plan_text(self._gemini_prompt(body))))
+        else:
+            self.send_error(404)
+
+    def _plan_text(self, prompt):
+        return "```json\n" + json.dumps(canned_plan(prompt), indent=2) + "\n```"
+
+    def _gemini_prompt(self, body):
+        parts = body.get('contents', [{}])[-1].get('parts', [{}])
+        return ''.join(part.get('text', '') for part in parts)
+
+    def _openai_chunk(self, text):
+        return {"choices": [{"index": 0, "delta": {"content": text}}]}
+
+    def _gemini_chunk(self, text):
+        return {"candidates": [{"content": {"role": "model", "parts": [{"text": text}]}}]}
+
+    def _json(self, payload):
+        data = json.dumps(payload).encode()
+        self.send_response(200)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(data)))
+        self.end_headers()
+        self.wfile.write(data)
+
+    def _stream(self, prompt, wrap, final=None):
+        """Server-sent events, paced at the server's tokens per second"""
+        self.send_response(200)
+        self.send_header('Content-Type', 'text/event-stream')
+        self.send_header('Transfer-Encoding', 'chunked')
+        self.end_headers()
+        events = [json.dumps(wrap(token)) for token in _tokens(self._plan_text(prompt))]
+        if final:
+            events.append(final)
+        for event in events:
+            self._chunk(f"data: {event}\n\n".encode())
+            if self.server.tokens_per_second:
+                time.sleep(1 / self.server.tokens_per_second)
+        self._chunk(b'')
+
+    def _chunk(self, data):
+        self.wfile.write(f"{len(data):x}\r\n".encode() + data + b"\r\n")
+        self.wfile.flush()
+
+
+def serve(host='127.0.0.1', port=8765, latency=0.3, tokens_per_second=200, verbose=False):
+    """Start the server on a daemon thread and return it; port 0 picks a free one"""
+    server = ThreadingHTTPServer((host, port), MockLLMHandler)
+    server.daemon_threads = True
+    server.latency = latency
+    server.tokens_per_second = tokens_per_second
+    server.verbose = verbose
+    server.requests = 0
+    Thread(target=server.serve_forever, daemon=True).start()
+    return server
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--host", default='127.0.0.1')
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--latency", type=float, default=0.3, help="seconds before the first token")
+    parser.add_argument("--tokens-per-second", type=float, default=200, help="0 streams without pacing")
+    args = parser.parse_args()
+
+    server = serve(args.host, args.port, args.latency, args.tokens_per_second, verbose=True)
+    print(f"Mock LLM listening on http://{args.host}:{server.server_address[1]}/v1")
+    try:
+        while True:
+            time.sleep(1)
+    except KeyboardInterrupt:
+        server.shutdown()
+
+
+if __name__ == "__main__":
+    main()
@@ -1,25 +1,10 @@
 # mouse_gui.py
 import tkinter as tk
 from tkinter import ttk, messagebox
-from face_controller import FaceController
+from face_controller import FaceController, DEFAULT_PARAMS
 import keyboard
 from css import Style  # Renamed from config.py to css.py
 
-DEFAULT_PARAMS = {
-    'EMA_ALPHA': 0.15,
-    'CURSOR_SENSITIVITY_X': 8,
-    'CURSOR_SENSITIVITY_Y': 8,
-    'BLINK_THRESHOLD_RATIO': 0.75,
-    'CALIBRATION_FRAMES': 30,
-    'MOVEMENT_THRESHOLD': 0.02,
-    'DOUBLE_CLICK_THRESHOLD': 0.8,
-    'EYEBROW_RAISE_THRESHOLD_RATIO': 1.4,
-    'RIGHT_CLICK_COOLDOWN': 1.0,
-    'MOUTH_OPEN_THRESHOLD_RATIO': 1.5,
-    'SCROLL_THRESHOLD': 0.03,
-    'SCROLL_STEP': 50,
-    'SCROLL_INTERVAL': 0.05
-}
 
 class MouseTab(ttk.Frame):
     def __init__(self, master):
@@ -53,7 +38,13 @@ class MouseTab(ttk.Frame):
             ('Mouth Open Ratio', 'MOUTH_OPEN_THRESHOLD_RATIO'),
             ('Scroll Threshold', 'SCROLL_THRESHOLD'),
             ('Scroll Step', 'SCROLL_STEP'),
-            ('Scroll Interval', 'SCROLL_INTERVAL')
+            ('Scroll Interval', 'SCROLL_INTERVAL'),
+            ('Idle FPS', 'MIN_FPS'),
+            ('Active FPS', 'MAX_FPS'),
+            ('Idle Motion Threshold', 'IDLE_MOTION_THRESHOLD'),
+            ('Idle Hold Time', 'IDLE_HOLD_TIME'),
+            ('Face Crop Padding', 'ROI_PADDING'),
+            ('Face Crop Scale', 'ROI_SCALE')
         ]
 
         for row, (label_text, param) in enumerate(parameters):
@@ -0,0 +1,152 @@
+# plan_cache.py
+import json
+import re
+import sqlite3
+import time
+from threading import Lock
+
+from intent_parser import normalize
+
+# Politeness that never changes what the user wants done
+_FILLER = re.compile(r"^(?:(?:please|hey|ok|okay|can you|could you|would you|will you|i want to|"
+                     r"i'd like to|go ahead and)\s+)+|(?:\s+(?:please|for me|now))+$")
+
+
+def cache_key(text):
+    """Normalized transcript used as the cache key"""
+    return _FILLER.sub('', normalize(text)).strip()
+
+
+class PlanCache:
+    """SQLite-backed cache of validated command plans.
+
+    Keyed on (normalized transcript, active window class). Entries expire
+    after `ttl` seconds and the least recently used ones are evicted beyond
+    `max_entries`. Hits are served from an in-memory mirror so they never
+    touch the disk; recency updates are written back on the next store.
+    """
+
+    def __init__(self, path, max_entries=500, ttl=7 * 24 * 3600):
+        self.path = path
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self._lock = Lock()
+        self._db = sqlite3.connect(path, check_same_thread=False)
+        self._db.execute("PRAGMA journal_mode=WAL")
+        self._db.execute("""
+            CREATE TABLE IF NOT EXISTS plans (
+                utterance TEXT NOT NULL,
+                window TEXT NOT NULL,
+                commands TEXT NOT NULL,
+                created REAL NOT NULL,
+                last_used REAL NOT NULL,
+                PRIMARY KEY (utterance, window)
+            )""")
+        self._db.commit()
+        self._entries = {}  # (utterance, window) -> [commands, created, last_used]
+        self._touched = set()
+        self._load()
+        self.hits = 0
+        self.misses = 0
+
+    def _load(self):
+        cutoff = time.time() - self.ttl
+        with self._lock:
+            self._db.execute("DELETE FROM plans WHERE created < ?", (cutoff,))
+            self._db.commit()
+            for utterance, window, commands, created, last_used in self._db.execute(
+                    "SELECT utterance, window, commands, created, last_used FROM plans"):
+                self._entries[(utterance, window)] = [json.loads(commands), created, last_used]
+
+    def get(self, text, window='', count=True):
+        """Cached command list or None; count=False leaves hit/miss stats alone"""
+        key = (cache_key(text), window or '')
+        now = time.time()
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and now - entry[1] > self.ttl:
+                self._remove(key)
+                entry = None
+            if entry is None:
+                self.misses += count
+                return None
+            entry[2] = now
+            self._touched.add(key)
+            self.hits += count
+            return json.loads(json.dumps(entry[0]))  # Callers may mutate their copy
+
+    def put(self, text, window, commands):
+        key = (cache_key(text), window or '')
+        if not key[0]:
+            return
+        now = time.time()
+        with self._lock:
+            self._entries[key] = [commands, now, now]
+            self._touched.discard(key)
+            self._db.execute(
+                "INSERT OR REPLACE INTO plans VALUES (?, ?, ?, ?, ?)",
+                (key[0], key[1], json.dumps(commands), now, now))
+            self._flush_touched()
+            self._evict()
+            self._db.commit()
+
+    def invalidate(self, text, window=None):
+        """Drop a plan the user said was wrong; every window if window is None"""
+        utterance = cache_key(text)
+        with self._lock:
+            keys = [key for key in self._entries
+                    if key[0] == utterance and (window is None or key[1] == (window or ''))]
+            for key in keys:
+                self._remove(key)
+            self._db.commit()
+        return len(keys)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self._touched.clear()
+            self._db.execute("DELETE FROM plans")
+            self._db.commit()
+
+    def close(self):
+        with self._lock:
+            self._flush_touched()
+            self._db.commit()
+            self._db.close()
+
+    def _remove(self, key):
+        self._entries.pop(key, None)
+        self._touched.discard(key)
+        self._db.execute("DELETE FROM plans WHERE utterance = ? AND window = ?", key)
+
+    def _flush_touched(self):
+        if self._touched:
+            self._db.executemany(
+                "UPDATE plans SET last_used = ? WHERE utterance = ? AND window = ?",
+                [(self._entries[key][2],) + key for key in self._touched if key in self._entries])
+            self._touched.clear()
+
+    def _evict(self):
+        excess = len(self._entries) - self.max_entries
+        if excess <= 0:
+            return
+        oldest = sorted(self._entries, key=lambda key: self._entries[key][2])[:excess]
+        for key in oldest:
+            self._remove(key)
+
+    def keys(self):
+        """(normalized utterance, window) of every stored plan"""
+        with self._lock:
+            return list(self._entries)
+
+    def __len__(self):
+        return len(self._entries)
+
+    def stats(self):
+        total = self.hits + self.misses
+        return {
+            'entries': len(self._entries),
+            'hits': self.hits,
+            'misses': self.misses,
+            'hit_rate': self.hits / total if total else 0.0,
+        }
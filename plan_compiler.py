@@ -0,0 +1,206 @@
+# plan_compiler.py
+import inspect
+import json
+
+# Steps held back briefly because the next one may merge with them
+MERGEABLE = ('sleep', 'move_mouse', 'type_text', 'scroll', 'press_keys')
+# Shortcuts where pressing twice in a row does nothing more than once
+# (not Escape: the second press closes whatever the first one uncovered)
+IDEMPOTENT_KEYS = {('ctrl', 's'), ('ctrl', 'a'), ('ctrl', 'c'), ('ctrl', 'shift', 's')}
+NUMERIC = {'duration': float, 'scroll_amount': int, 'move_x': float, 'move_y': float, 'delay': float}
+# Rough execution cost of a step, for the "time saved" estimate
+STEP_SECONDS = {'move_mouse': 0.5, 'press_keys': 0.05, 'left_click': 0.05, 'right_click': 0.05}
+
+
+class PlanError(ValueError):
+    """A plan step that cannot be executed"""
+
+
+class PlanCompiler:
+    """Checks and tidies LLM plans before they run.
+
+    Every step is checked against the signature of its action (unknown
+    commands, missing or non-numeric parameters are rejected up front), then
+    a peephole pass merges adjacent sleeps, drops mouse moves that are
+    immediately overridden, joins consecutive type_text and scroll steps,
+    drops repeated idempotent shortcuts and trailing sleeps. stream() works
+    on plans that are still arriving. A plan stops at its first invalid
+    step, since later steps were planned assuming it would run.
+    """
+
+    def __init__(self, actions=None, log=print):
+        # None accepts any command name (no signature checks)
+        self.signatures = None
+        if actions is not None:
+            self.signatures = {name: self._signature(fn) for name, fn in actions.items()}
+        self.log = log
+        self.stats = {
+            'plans': 0,
+            'steps_in': 0,
+            'steps_out': 0,
+            'rejected': 0,
+            'merged_sleeps': 0,
+            'redundant_sleeps': 0,
+            'dead_moves': 0,
+            'coalesced_text': 0,
+            'coalesced_scrolls': 0,
+            'duplicate_keys': 0,
+            'noops': 0,
+            'seconds_saved': 0.0
+        }
+
+    def _signature(self, fn):
+        """(accepted names, required names, takes **kwargs), or None if not introspectable"""
+        try:
+            params = inspect.signature(fn).parameters.values()
+        except (TypeError, ValueError):
+            return None
+        named = [p for p in params if p.kind in (p.POSITIONAL_OR_KEYWORD, p.KEYWORD_ONLY)]
+        return ({p.name for p in named},
+                {p.name for p in named if p.default is p.empty},
+                any(p.kind == p.VAR_KEYWORD for p in params))
+
+    def check(self, cmd):
+        """Normalized copy of one step; raises PlanError if it cannot run"""
+        if not isinstance(cmd, dict) or not isinstance(cmd.get('command'), str):
+            raise PlanError(f"not a command: {cmd!r}")
+        name = cmd['command']
+        params = cmd.get('parameters') or {}
+        if not isinstance(params, dict):
+            raise PlanError(f"{name}: parameters must be an object")
+        if self.signatures is not None and name not in self.signatures:
+            raise PlanError(f"unknown command {name!r}")
+
+        params = dict(params)
+        for key, kind in NUMERIC.items():
+            if key in params:
+                try:
+                    params[key] = kind(float(params[key]))
+                except (TypeError, ValueError):
+                    raise PlanError(f"{name}: {key} must be a number, got {params[key]!r}")
+        if name == 'move_mouse' and not all(0 <= params.get(k, 0.5) <= 1 for k in ('move_x', 'move_y')):
+            raise PlanError(f"move_mouse: coordinates are screen fractions, got {params}")
+        if name == 'press_keys':
+            keys = params.get('keys', [])
+            # "ctrl+s" -> ["ctrl", "s"]
+            params['keys'] = keys.split('+') if isinstance(keys, str) else [str(k) for k in keys]
+
+        signature = self.signatures.get(name) if self.signatures else None
+        if signature:
+            accepted, required, any_kwargs = signature
+            missing = required - set(params)
+            if missing:
+                raise PlanError(f"{name}: missing {', '.join(sorted(missing))}")
+            if not any_kwargs:
+                params = {k: v for k, v in params.items() if k in accepted}
+        return {'command': name, 'parameters': params}
+
+    def compile(self, commands):
+        """Optimized list for a complete plan"""
+        return list(self.stream(commands))
+
+    def stream(self, commands):
+        """Yield optimized steps; mergeable ones wait for the next step to arrive"""
+        self.stats['plans'] += 1
+        pending = None
+        for raw in commands:
+            try:
+                cmd = self.check(raw)
+            except PlanError as e:
+                self.stats['rejected'] += 1
+                self.log(f"⛔ Stopping plan at invalid step: {e}")
+                break
+            self.stats['steps_in'] += 1
+            name, params = cmd['command'], cmd['parameters']
+
+            if self._noop(cmd):
+                self._removed('noops', cmd)
+                continue
+            if pending is not None:
+                merged = self._merge(pending, cmd)
+                if merged is not None:
+                    pending = merged
+                    continue
+                self.stats['steps_out'] += 1
+                yield pending
+                pending = None
+
+            if self._mergeable(cmd):
+                pending = cmd
+            else:
+                self.stats['steps_out'] += 1
+                yield cmd
+
+        if pending is not None:
+            if pending['command'] == 'sleep':
+                # Nothing left to wait for
+                self._removed('redundant_sleeps', pending)
+            else:
+                self.stats['steps_out'] += 1
+                yield pending
+
+    def _mergeable(self, cmd):
+        if cmd['command'] == 'press_keys':
+            return tuple(k.lower() for k in cmd['parameters']['keys']) in IDEMPOTENT_KEYS
+        return cmd['command'] in MERGEABLE
+
+    def _noop(self, cmd):
+        name, params = cmd['command'], cmd['parameters']
+        return ((name == 'sleep' and params.get('duration', 1) <= 0) or
+                (name == 'scroll' and params.get('scroll_amount', 5) == 0) or
+                (name == 'type_text' and not params.get('text')) or
+                (name == 'press_keys' and not params['keys']))
+
+    def _merge(self, first, second):
+        """One step doing the work of both, or None"""
+        name = first['command']
+        if name != second['command']:
+            return None
+        a, b = first['parameters'], second['parameters']
+        if name == 'sleep':
+            self.stats['merged_sleeps'] += 1
+            return {'command': 'sleep', 'parameters': {'duration': a.get('duration', 1) + b.get('duration', 1)}}
+        if name == 'move_mouse':
+            self._removed('dead_moves', first)
+            return second
+        if name == 'scroll':
+            self.stats['coalesced_scrolls'] += 1
+            return {'command': 'scroll', 'parameters': {'scroll_amount': a.get('scroll_amount', 5) + b.get('scroll_amount', 5)}}
+        rest_a = {k: v for k, v in a.items() if k != 'text'}
+        rest_b = {k: v for k, v in b.items() if k != 'text'}
+        if name == 'type_text' and rest_a == rest_b:
+            self.stats['coalesced_text'] += 1
+            return {'command': 'type_text', 'parameters': dict(rest_a, text=a['text'] + b['text'])}
+        if name == 'press_keys' and a == b:
+            self._removed('duplicate_keys', second)
+            return first
+        return None
+
+    def _removed(self, reason, cmd):
+        self.stats[reason] += 1
+        if cmd['command'] == 'sleep':
+            self.stats['seconds_saved'] += cmd['parameters'].get('duration', 1)
+        else:
+            self.stats['seconds_saved'] += STEP_SECONDS.get(cmd['command'], 0.0)
+
+    def stats_summary(self):
+        s = self.stats
+        if not s['steps_in']:
+            return "Plan compiler: no steps yet"
+        removed = s['steps_in'] - s['steps_out']
+        merges = ", ".join(f"{s[key]} {key.replace('_', ' ')}" for key in
+                           ('merged_sleeps', 'redundant_sleeps', 'dead_moves', 'coalesced_text',
+                            'coalesced_scrolls', 'duplicate_keys', 'noops') if s[key])
+        return (f"Plan compiler: {s['plans']} plans, {removed} of {s['steps_in']} steps removed "
+                f"({removed / s['steps_in']:.0%}), {s['rejected']} plans stopped at an invalid step, "
+                f"~{s['seconds_saved']:.1f}s saved" + (f" ({merges})" if merges else ""))
+
+
+def load_plans(path):
+    """Recorded plans from a JSON-lines file (one plan per line) or a plan cache database"""
+    if path.endswith(('.sqlite3', '.sqlite', '.db')):
+        import sqlite3
+        with sqlite3.connect(path) as db:
+            return [json.loads(row[0]) for row in db.execute("SELECT commands FROM plans")]
+    with open(path, encoding='utf-8') as f:
+        return [json.loads(line) for line in f if line.strip()]
@@ -0,0 +1,208 @@
+# plan_executor.py
+import time
+from urllib.parse import urlsplit
+
+
+def wait_until(predicate, timeout, interval=0.01):
+    """Poll `predicate` until it is truthy or `timeout` passes; returns its last value"""
+    deadline = time.perf_counter() + timeout
+    while True:
+        result = predicate()
+        if result or time.perf_counter() >= deadline:
+            return result
+        time.sleep(interval)
+
+
+def wait_for_clipboard(previous, timeout=0.5, interval=0.01):
+    """New clipboard text once it differs from `previous`, or None on timeout"""
+    import pyperclip
+
+    def changed():
+        text = pyperclip.paste()
+        return text if text != previous else None
+
+    return wait_until(changed, timeout, interval)
+
+
+# Readiness conditions. Each is built just before its action runs, so it can
+# snapshot the "before" state, and returns wait(timeout) -> bool.
+
+def window_appeared(executor, params):
+    """A new top-level window shows up (app launch)"""
+    mark = executor.watcher.mark()
+    return lambda timeout: executor.watcher.wait_for_window(mark, timeout=timeout) is not None
+
+
+# Titles a browser shows before the page has loaded
+PLACEHOLDER_TITLES = ('new tab', 'about:blank', 'untitled', 'loading', 'connecting')
+# Host labels too generic to identify a site by
+GENERIC_LABELS = ('www', 'com', 'org', 'net', 'co', 'ac', 'gov')
+
+
+def _site_name(url):
+    """'https://docs.python.org/3/' -> 'python', the part of the host a page title tends to show"""
+    host = urlsplit(url if '://' in url else '//' + url).hostname or ''
+    labels = [label for label in host.split('.')[:-1] if label not in GENERIC_LABELS]
+    return max(labels, key=len, default='')
+
+
+def title_changed(executor, params):
+    """The focused window shows the new page's title, e.g. a browser tab finished loading.
+
+    Focusing a browser still showing its previous tab is not enough: the
+    title must change on the focused window after the step starts, or name
+    the URL's site.
+    """
+    before = executor.registry.active(max_age=0)
+    mark = executor.watcher.mark()
+    url = params.get('url', '').lower()
+    site = _site_name(url)
+    # handle -> title it had when first seen focused during this step
+    seen = {before.handle: before.title} if before else {}
+
+    def loaded(title):
+        lowered = (title or '').lower()
+        return (title and not lowered.startswith(PLACEHOLDER_TITLES) and
+                lowered.rsplit(' - ', 1)[0] not in (url, url.split('://', 1)[-1]))
+
+    def names_site(title):
+        return bool(site) and site in (title or '').lower()
+
+    def changed():
+        window = executor.registry.active(max_age=executor.settings['poll_interval'])
+        if window is None:
+            return False
+        # Title events arrive on Windows; elsewhere the polled title has to change
+        if executor.watcher.wait_for_event(mark, ('title',), 0,
+                                           lambda e: e.handle == window.handle and loaded(e.title)):
+            return True
+        first = seen.setdefault(window.handle, window.title)
+        return loaded(window.title) and (window.title != first or names_site(window.title))
+
+    return lambda timeout: wait_until(changed, timeout, executor.settings['poll_interval'])
+
+
+def focus_changed(executor, params):
+    """Another window takes focus (alt+tab, win+number)"""
+    mark = executor.watcher.mark()
+    return lambda timeout: executor.watcher.wait_for_event(mark, ('focus',), timeout) is not None
+
+
+def settled(executor, params):
+    """No observable signal; give the target a brief moment to take the input"""
+    return lambda timeout: time.sleep(timeout) or True
+
+
+# Shortcuts that move focus to another window; plain tab or ctrl+tab stay inside it
+WINDOW_KEYS = {'win', 'windows', 'cmd'}
+ALT_WINDOW_KEYS = {'tab', 'f4', 'esc'}
+
+
+def _press_keys_readiness(params):
+    keys = {str(key).lower() for key in params.get('keys', [])}
+    if len(keys) > 1 and (keys & WINDOW_KEYS or ('alt' in keys and keys & ALT_WINDOW_KEYS)):
+        return 'focus changed', focus_changed, 'focus_timeout'
+    return 'settled', settled, 'input_settle'
+
+
+# action -> (description, condition, timeout setting); None to continue at once
+READINESS = {
+    'run_command': ('window appeared', window_appeared, 'launch_timeout'),
+    'open_url': ('page title changed', title_changed, 'page_timeout'),
+    'press_keys': _press_keys_readiness,
+    'left_click': ('settled', settled, 'input_settle'),
+    'right_click': ('settled', settled, 'input_settle'),
+}
+
+
+class PlanExecutor:
+    """Runs plan steps, waiting after each one only until it has taken effect.
+
+    Instead of fixed sleeps, every action declares a readiness condition
+    (window appeared, focus changed, page title changed, ...) that is
+    waited on with a deadline; the next step starts the moment it holds.
+    Every run records a timeline of action and wait times.
+    """
+
+    def __init__(self, actions, watcher, registry, settings, log=print):
+        self.actions = actions
+        self.watcher = watcher
+        self.registry = registry
+        self.settings = settings
+        self.log = log
+        self.last_timeline = None
+
+    def run(self, commands, cancelled=None, should_stop=None):
+        """Execute `commands` (a list or a still-filling iterator); returns the Timeline"""
+        timeline = Timeline()
+        skip_long_sleep = False
+
+        for cmd in commands:
+            if should_stop is not None and should_stop():
+                break
+            if cancelled is not None and cancelled.is_set():
+                self.log("🛑 Cancelled remaining commands")
+                break
+            command_name = cmd.get("command")
+            params = cmd.get("parameters", {})
+
+            # The launch/page load was confirmed, so the plan's safety margin
+            # after it is moot; if the wait gave up, the sleep still runs
+            if (skip_long_sleep and command_name == "sleep" and
+                    float(params.get("duration", 0)) > 0.5):
+                skip_long_sleep = False
+                timeline.add(command_name, time.perf_counter(), 0.0, 0.0, 'skipped, already ready', True)
+                continue
+            skip_long_sleep = False
+
+            handler = self.actions.get(command_name)
+            if not handler:
+                self.log(f"Unknown command: {command_name}")
+                continue
+
+            readiness = READINESS.get(command_name)
+            if callable(readiness):
+                readiness = readiness(params)
+            try:
+                wait = readiness[1](self, params) if readiness else None
+                self.log(f"Executing: {command_name} {params}")
+                start = time.perf_counter()
+                handler(**params)
+                acted = time.perf_counter()
+                ready = wait(self.settings[readiness[2]]) if wait else True
+                timeline.add(command_name, start, acted - start, time.perf_counter() - acted,
+                             readiness[0] if readiness else None, bool(ready))
+                skip_long_sleep = command_name in ('run_command', 'open_url') and bool(ready)
+            except Exception as e:
+                self.log(f"Execution error: {e}")
+
+        self.last_timeline = timeline
+        return timeline
+
+
+class Timeline:
+    """Per-step timing of one plan run"""
+
+    def __init__(self):
+        self.start = time.perf_counter()
+        self.steps = []  # (command, offset, action seconds, wait seconds, condition, met)
+
+    def add(self, command, started, action, wait, condition, met):
+        self.steps.append((command, started - self.start, action, wait, condition, met))
+
+    @property
+    def total(self):
+        if not self.steps:
+            return 0.0
+        command, offset, action, wait, _, _ = self.steps[-1]
+        return offset + action + wait
+
+    def format(self):
+        lines = [f"Plan timeline ({len(self.steps)} steps, {self.total:.2f}s):"]
+        for command, offset, action, wait, condition, met in self.steps:
+            line = f"  +{offset:6.3f}s {command:<16} action {action * 1000:6.0f} ms"
+            if condition:
+                outcome = condition if met else f"gave up waiting for {condition}"
+                line += f", wait {wait * 1000:6.0f} ms ({outcome})"
+            lines.append(line)
+        return "\n".join(lines)
@@ -0,0 +1,217 @@
+# plan_index.py
+import re
+from difflib import SequenceMatcher
+
+import numpy as np
+
+from plan_cache import cache_key
+
+# Verbs that ask for the same thing; mapped before comparing
+SYNONYMS = {
+    'launch': 'open', 'start': 'open', 'run': 'open', 'load': 'open', 'bring up': 'open',
+    'exit': 'close', 'quit': 'close', 'kill': 'close',
+    'visit': 'go to', 'browse to': 'go to', 'navigate to': 'go to',
+    'hit': 'press', 'push': 'press', 'tap': 'press', 'write': 'type',
+    'control': 'ctrl', 'escape': 'esc',
+}
+STOPWORDS = {'the', 'a', 'an', 'my', 'this', 'that'}
+# Close in spelling, opposite in meaning: never reuse across these
+ANTONYMS = [('open', 'close'), ('up', 'down'), ('left', 'right'), ('next', 'previous'),
+            ('show', 'hide'), ('increase', 'decrease'), ('on', 'off'), ('mute', 'unmute'),
+            ('maximize', 'minimize'), ('copy', 'paste'), ('undo', 'redo'), ('in', 'out'),
+            ('forward', 'back'), ('play', 'pause'), ('lock', 'unlock')]
+
+# Differing words at least this similar are treated as the same word misheard
+SPELLING_RATIO = 0.85
+
+_SYNONYM = re.compile(r"\b(" + "|".join(sorted(map(re.escape, SYNONYMS), key=len, reverse=True)) + r")\b")
+
+
+def canonical(text):
+    """Normalized transcript with synonyms folded and filler words removed"""
+    text = _SYNONYM.sub(lambda m: SYNONYMS[m.group(1)], cache_key(text))
+    return ' '.join(w for w in text.split() if w not in STOPWORDS)
+
+
+def conflicts(a, b):
+    """True if two canonical utterances ask for different things.
+
+    Synonyms, filler words and word order are already folded away by
+    canonical(), so any content word left on one side only ("email jane"
+    vs "email john", "java" vs "python") means a different target. Only
+    spelling variants of the same word ("notepad" / "note pad",
+    "tutorial" / "tutorials") are tolerated.
+    """
+    wa, wb = set(a.split()), set(b.split())
+    for x, y in ANTONYMS:
+        if (x in wa and y in wb) or (y in wa and x in wb):
+            return True
+    if {w for w in wa if w.isdigit()} != {w for w in wb if w.isdigit()}:
+        return True
+    only_a, only_b = wa - wb, wb - wa
+    if not only_a and not only_b:
+        return False
+    if not only_a or not only_b:
+        # Extra words on one side only ("notepad" vs "notepad settings")
+        return True
+    return SequenceMatcher(None, ''.join(sorted(only_a)), ''.join(sorted(only_b))).ratio() < SPELLING_RATIO
+
+
+class FuzzyPlanIndex:
+    """Character n-gram TF-IDF index over past plan keys with cosine search.
+
+    Postings are kept in CSR form (grams hashed into `buckets`), so a
+    query touches only the documents sharing a gram with it and scores
+    them with one bincount. New entries go to a small pending list that
+    is searched directly and folded into the CSR arrays in batches.
+    """
+
+    def __init__(self, threshold=0.8, n=3, buckets=1 << 18, rebuild_every=64):
+        self.threshold = threshold
+        self.n = n
+        self.buckets = buckets
+        self.rebuild_every = rebuild_every
+        self._docs = {}  # (utterance, window) -> doc id
+        self._keys = []
+        self._texts = []
+        self._features = []  # doc id -> (gram ids, tf)
+        self._windows = {}  # window class -> int id
+        # Grown by doubling; only the first len(self._keys) slots are used
+        self._doc_window = np.zeros(64, dtype=np.int32)
+        self._alive = np.zeros(64, dtype=bool)
+        self._built = 0
+        self._idf = np.ones(buckets, dtype=np.float32)
+        self._indptr = np.zeros(buckets + 1, dtype=np.int64)
+        self._indices = np.zeros(0, dtype=np.int32)
+        self._data = np.zeros(0, dtype=np.float32)
+        self.hits = 0
+        self.misses = 0
+
+    def __len__(self):
+        return int(self._alive[:len(self._keys)].sum())
+
+    def _featurize(self, text):
+        padded = f" {text} "
+        grams = [padded[i:i + self.n] for i in range(len(padded) - self.n + 1)]
+        grams += ['w:' + w for w in text.split()]
+        ids = np.fromiter((hash(g) % self.buckets for g in grams), dtype=np.int64, count=len(grams))
+        ids, tf = np.unique(ids, return_counts=True)
+        return ids, tf.astype(np.float32)
+
+    def _window_id(self, window):
+        return self._windows.setdefault(window or '', len(self._windows))
+
+    def add(self, utterance, window=''):
+        key = (cache_key(utterance), window or '')
+        doc = self._docs.get(key)
+        if doc is not None:
+            self._alive[doc] = True
+            return
+        text = canonical(utterance)
+        if not text:
+            return
+        doc = len(self._keys)
+        if doc == len(self._alive):
+            self._doc_window = np.resize(self._doc_window, 2 * doc)
+            self._alive = np.resize(self._alive, 2 * doc)
+        self._docs[key] = doc
+        self._keys.append(key)
+        self._texts.append(text)
+        self._features.append(self._featurize(text))
+        self._doc_window[doc] = self._window_id(window)
+        self._alive[doc] = True
+        if len(self._keys) - self._built >= self.rebuild_every:
+            self.rebuild()
+
+    def add_many(self, keys):
+        """Bulk load (utterance, window) pairs with a single rebuild"""
+        rebuild_every, self.rebuild_every = self.rebuild_every, float('inf')
+        for utterance, window in keys:
+            self.add(utterance, window)
+        self.rebuild_every = rebuild_every
+        self.rebuild()
+
+    def remove(self, utterance, window=None):
+        utterance = cache_key(utterance)
+        for (text, win), doc in self._docs.items():
+            if text == utterance and (window is None or win == (window or '')):
+                self._alive[doc] = False
+
+    def rebuild(self):
+        count = len(self._keys)
+        if not count:
+            return
+        lengths = np.fromiter((len(ids) for ids, _ in self._features), dtype=np.int64, count=count)
+        ids = np.concatenate([ids for ids, _ in self._features])
+        tf = np.concatenate([tf for _, tf in self._features])
+        doc = np.repeat(np.arange(count, dtype=np.int32), lengths)
+
+        df = np.bincount(ids, minlength=self.buckets)
+        self._idf = (np.log((1 + count) / (1 + df)) + 1).astype(np.float32)
+        weights = tf * self._idf[ids]
+        norms = np.sqrt(np.bincount(doc, weights=weights * weights, minlength=count))
+        weights /= norms[doc].astype(np.float32)
+
+        order = np.argsort(ids, kind='stable')
+        self._indices = doc[order]
+        self._data = weights[order]
+        self._indptr = np.concatenate(([0], np.cumsum(df)))
+        self._built = count
+
+    def _query(self, text):
+        ids, tf = self._featurize(text)
+        weights = tf * self._idf[ids]
+        return ids, weights / np.sqrt(np.dot(weights, weights))
+
+    def scores(self, text):
+        """Cosine similarity of `text` to every indexed entry"""
+        ids, weights = self._query(canonical(text))
+        scores = np.zeros(len(self._keys), dtype=np.float32)
+        if self._built:
+            starts, ends = self._indptr[ids], self._indptr[ids + 1]
+            lengths = ends - starts
+            if lengths.sum():
+                docs = np.concatenate([self._indices[s:e] for s, e in zip(starts, ends)])
+                contrib = np.concatenate([self._data[s:e] for s, e in zip(starts, ends)])
+                contrib *= np.repeat(weights, lengths)
+                scores[:self._built] = np.bincount(docs, weights=contrib, minlength=self._built)
+
+        # Entries added since the last rebuild, scored with the current idf
+        query = dict(zip(ids.tolist(), weights.tolist()))
+        for doc in range(self._built, len(self._keys)):
+            doc_ids, doc_tf = self._features[doc]
+            doc_w = doc_tf * self._idf[doc_ids]
+            doc_w /= np.sqrt(np.dot(doc_w, doc_w))
+            scores[doc] = sum(query.get(g, 0.0) * w for g, w in zip(doc_ids.tolist(), doc_w.tolist()))
+        return scores
+
+    def search(self, utterance, window='', candidates=5):
+        """(utterance key, window, score) of the closest safe match, or None"""
+        if not self._keys:
+            self.misses += 1
+            return None
+        text = canonical(utterance)
+        scores = self.scores(utterance)
+        wid = self._windows.get(window or '')
+        count = len(self._keys)
+        scores[~self._alive[:count] | (self._doc_window[:count] != wid)] = 0
+
+        top = min(candidates, len(scores))
+        best = np.argpartition(-scores, top - 1)[:top]
+        for doc in best[np.argsort(-scores[best])]:
+            if scores[doc] < self.threshold:
+                break
+            if not conflicts(text, self._texts[doc]):
+                self.hits += 1
+                return self._keys[doc] + (float(scores[doc]),)
+        self.misses += 1
+        return None
+
+    def stats(self):
+        total = self.hits + self.misses
+        return {
+            'entries': len(self),
+            'hits': self.hits,
+            'misses': self.misses,
+            'hit_rate': self.hits / total if total else 0.0,
+        }
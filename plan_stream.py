@@ -0,0 +1,75 @@
+# plan_stream.py
+import json
+
+
+class PlanStreamParser:
+    """Incremental parser for an LLM's JSON array of command objects.
+
+    feed() takes text as it streams in and returns each top-level
+    {"command": ...} object as soon as its closing brace arrives. Text
+    before the first '[' (```json fences, "Here is the plan:") and after
+    the closing ']' is ignored.
+    """
+
+    def __init__(self):
+        self._buf = []
+        self._started = False
+        self.done = False
+        self._depth = 0
+        self._in_string = False
+        self._escape = False
+        self.skipped = 0  # Objects that were not valid JSON
+
+    def feed(self, chunk):
+        commands = []
+        for ch in chunk:
+            if self.done:
+                break
+            if not self._started:
+                self._started = ch == '['
+                continue
+            if self._depth:
+                self._buf.append(ch)
+            if self._in_string:
+                if self._escape:
+                    self._escape = False
+                elif ch == '\\':
+                    self._escape = True
+                elif ch == '"':
+                    self._in_string = False
+                continue
+            if ch == '"':
+                self._in_string = self._depth > 0
+            elif ch == '{':
+                if not self._depth:
+                    self._buf = ['{']
+                self._depth += 1
+            elif ch == '}' and self._depth:
+                self._depth -= 1
+                if not self._depth:
+                    command = self._decode(''.join(self._buf))
+                    if command is not None:
+                        commands.append(command)
+            elif ch == ']' and not self._depth:
+                self.done = True
+        return commands
+
+    def _decode(self, text):
+        try:
+            command = json.loads(text)
+        except json.JSONDecodeError:
+            self.skipped += 1
+            return None
+        if not isinstance(command, dict) or 'command' not in command:
+            self.skipped += 1
+            return None
+        return command
+
+
+def iter_plan(chunks):
+    """Yield commands from an iterable of text chunks as each one completes"""
+    parser = PlanStreamParser()
+    for chunk in chunks:
+        yield from parser.feed(chunk)
+        if parser.done:
+            return
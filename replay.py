@@ -0,0 +1,207 @@
+# replay.py
+"""Drive FaceController from a recorded clip or landmark dump, without a webcam.
+
+    python replay.py clip.mp4                      # full pipeline on a video
+    python replay.py clip.mp4 --dump-landmarks clip.npz
+    python replay.py clip.npz                      # gestures only, no inference
+    python replay.py clip.mp4 --adaptive --json    # machine-readable report
+
+A landmark dump holds `landmarks` (T, N, 3) float32 in mirrored frame
+coordinates (NaN rows where no face was found), `timestamps` (T,) and `fps`.
+"""
+import argparse
+import json
+import time
+from collections import defaultdict
+
+import cv2
+import numpy as np
+
+from face_controller import FaceController, DEFAULT_PARAMS
+from input_sink import RecordingSink
+
+
+class StageTimer:
+    """Collects per-stage latency samples from FaceController"""
+
+    def __init__(self):
+        self.samples = defaultdict(list)
+
+    def record(self, stage, seconds):
+        self.samples[stage].append(seconds)
+
+    def summary(self):
+        report = {}
+        for stage, values in self.samples.items():
+            ms = np.array(values) * 1000
+            report[stage] = {
+                'mean_ms': float(ms.mean()),
+                'p95_ms': float(np.percentile(ms, 95)),
+                'max_ms': float(ms.max()),
+            }
+        return report
+
+
+class _ClipClock:
+    """Clip time, so gesture timing matches the recording rather than the CPU"""
+
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+def _video_frames(path):
+    """(fps, iterator of (clip_time, frame))"""
+    cap = cv2.VideoCapture(path)
+    if not cap.isOpened():
+        raise SystemExit(f"Cannot open {path}")
+    fps = cap.get(cv2.CAP_PROP_FPS) or 30.0
+
+    def frames():
+        index = 0
+        try:
+            while True:
+                ret, frame = cap.read()
+                if not ret:
+                    break
+                yield index / fps, frame
+                index += 1
+        finally:
+            cap.release()
+    return fps, frames()
+
+
+def _landmark_frames(path):
+    """(fps, iterator of (clip_time, points or None))"""
+    data = np.load(path)
+    landmarks = data['landmarks']
+    fps = float(data['fps']) if 'fps' in data else 30.0
+    timestamps = data['timestamps'] if 'timestamps' in data else np.arange(len(landmarks)) / fps
+    return fps, ((float(t), None if np.isnan(points[0, 0]) else points)
+                 for t, points in zip(timestamps, landmarks))
+
+
+def replay(path, params=None, adaptive=False, dump_path=None):
+    """Replay a .npz landmark dump or any video OpenCV can read; returns a report dict"""
+    params = dict(params or DEFAULT_PARAMS)
+    clock = _ClipClock()
+    sink = RecordingSink(clock=clock)
+    controller = FaceController(params, video_source=path, sink=sink)
+    controller.clock = clock
+    controller.stage_timer = StageTimer()
+    # Dumps hold every landmark, not just the ones the gestures read
+    controller.features.keep_all = dump_path is not None
+
+    from_landmarks = path.endswith('.npz')
+    fps, frames = _landmark_frames(path) if from_landmarks else _video_frames(path)
+    dump_points, dump_times = [], []
+
+    def dump(t, found):
+        points = np.full((len(controller.features.points), 3), np.nan, np.float32)
+        if found:
+            points[:controller.features.count] = controller.features.points[:controller.features.count]
+        dump_points.append(points)
+        dump_times.append(t)
+
+    calibrated = 0
+    total = processed = with_face = 0
+    next_due = 0.0
+    start = time.perf_counter()
+    for t, item in frames:
+        clock.now = t
+        total += 1
+
+        if calibrated < params['CALIBRATION_FRAMES']:
+            if from_landmarks:
+                found = item is not None
+                if found:
+                    controller.features.load(item)
+                    controller._collect_calibration_data(controller.features)
+            else:
+                found = controller._calibration_step(item)
+            calibrated += found
+            # Keep calibration frames so a replay of the dump calibrates too
+            if dump_path:
+                dump(t, found)
+            if calibrated == params['CALIBRATION_FRAMES']:
+                controller._finalize_calibration()
+            continue
+
+        # Adaptive mode skips the frames the scheduler would not have waited for
+        if adaptive and t < next_due:
+            continue
+        next_due = t + controller.scheduler.interval()
+        processed += 1
+
+        if from_landmarks:
+            found = item is not None
+            if found:
+                controller.features.load(item)
+                gesture_start = time.perf_counter()
+                controller._handle_face_landmarks(controller.features)
+                controller.stage_timer.record('gestures', time.perf_counter() - gesture_start)
+            else:
+                controller.scheduler.observe_no_face(t)
+        else:
+            found = controller._process_frame(item)
+        with_face += found
+
+        if dump_path:
+            dump(t, found)
+    elapsed = time.perf_counter() - start
+
+    if dump_path:
+        np.savez_compressed(dump_path, landmarks=np.array(dump_points, dtype=np.float32),
+                            timestamps=np.array(dump_times), fps=fps)
+
+    return {
+        'source': path,
+        'frames': total,
+        'calibration_frames': calibrated,
+        'processed_frames': processed,
+        'frames_with_face': with_face,
+        'wall_seconds': elapsed,
+        'frames_per_second': total / elapsed if elapsed else 0.0,
+        'stages': controller.stage_timer.summary(),
+        'events': dict(sink.counts()),
+        'event_log': [(t, event, list(args)) for t, event, args in sink.events],
+    }
+
+
+def _print_report(report):
+    print(f"Source:      {report['source']}")
+    print(f"Frames:      {report['frames']} ({report['calibration_frames']} calibration, "
+          f"{report['processed_frames']} processed, {report['frames_with_face']} with a face)")
+    print(f"Throughput:  {report['frames_per_second']:.1f} frames/s over {report['wall_seconds']:.2f}s")
+    print("Stage latency (ms):")
+    for stage, stats in report['stages'].items():
+        print(f"  {stage:<11} mean {stats['mean_ms']:7.3f}  p95 {stats['p95_ms']:7.3f}  max {stats['max_ms']:7.3f}")
+    print("Gesture events:")
+    for event, count in sorted(report['events'].items()):
+        print(f"  {event:<13} {count}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('source', help="Video file or .npz landmark dump")
+    parser.add_argument('--adaptive', action='store_true', help="Apply the adaptive frame-rate scheduler")
+    parser.add_argument('--dump-landmarks', metavar='NPZ', help="Save per-frame landmarks for later replay")
+    parser.add_argument('--json', action='store_true', help="Print the report as JSON")
+    parser.add_argument('--events', action='store_true', help="Include the timestamped event log")
+    args = parser.parse_args()
+
+    report = replay(args.source, adaptive=args.adaptive, dump_path=args.dump_landmarks)
+    if not args.events:
+        report.pop('event_log')
+    if args.json:
+        print(json.dumps(report, indent=2))
+    else:
+        _print_report(report)
+        for t, event, event_args in report.get('event_log', []):
+            print(f"  {t:8.3f}s {event} {event_args}")
+
+
+if __name__ == '__main__':
+    main()
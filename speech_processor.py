@@ -1,34 +1,129 @@
 import speech_recognition as sr
 from google.cloud import speech
 import pyautogui
+import numpy as np
+import subprocess
+import time
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
 from config import Config
+from audio_encoder import AudioEncoder
+from speech_streaming import GoogleStreamingBackend
+from audio_capture import CaptureStopped
+from vad import split_utterances, to_float
 
 class SpeechProcessor:
-    def __init__(self):
+    def __init__(self, streaming_backend=None):
         self.recognizer = sr.Recognizer()
         self.microphone = sr.Microphone()
         self.client = speech.SpeechClient()
+        self.streaming_backend = streaming_backend or GoogleStreamingBackend(
+            self.client,
+            language_code=Config.SPEECH_SETTINGS['language_code'],
+            model=Config.SPEECH_SETTINGS['model']
+        )
+        self.encoder = AudioEncoder(
+            encoding=Config.SPEECH_SETTINGS.get('encoding', 'linear16'),
+            sample_rate=Config.SPEECH_SETTINGS.get('sample_rate'),
+            opus_bitrate=Config.SPEECH_SETTINGS.get('opus_bitrate', '24k')
+        )
         
         # Configure audio settings from config
-        from config import Config
         self.recognizer.energy_threshold = Config.AUDIO_SETTINGS['energy_threshold']
         self.recognizer.pause_threshold = Config.AUDIO_SETTINGS['pause_threshold']
         self.recognizer.dynamic_energy_threshold = Config.AUDIO_SETTINGS['dynamic_energy']
 
-    def calibrate(self):
-        """Calibrate microphone without logging"""
+        # Upload counters for the VAD stage
+        self.stats = {
+            'requests': 0,
+            'bytes_captured': 0,
+            'bytes_sent': 0,
+            'segments_sent': 0,
+            'segments_dropped': 0,
+            'latency_total': 0.0,
+            'encode_total': 0.0
+        }
+        self._upload_pool = ThreadPoolExecutor(max_workers=3)
+
+    def calibrate(self, source=None):
+        """Calibrate microphone without logging.
+
+        Pass an already-open source (e.g. a RingBufferSource) when the
+        microphone is owned by a capture thread.
+        """
+        if source is not None:
+            self.recognizer.adjust_for_ambient_noise(source, duration=2)
+            return
         with self.microphone as source:
             # Silent calibration - logging handled by VoiceAssistant
             self.recognizer.adjust_for_ambient_noise(source, duration=2)
 
-    def transcribe(self, audio_data):
+    def transcribe_audio(self, audio):
+        """Trim silence and noise from an sr.AudioData, then transcribe what is left.
+
+        Separate utterances in one buffer are recognized in parallel and
+        joined in order. Returns None when nothing voiced remains.
+        """
+        start = time.perf_counter()
+        pcm = audio.get_raw_data(convert_width=2)
+        rate = audio.sample_rate
+        segments, dropped = split_utterances(to_float(pcm), rate)
+
+        self.stats['requests'] += 1
+        self.stats['bytes_captured'] += len(pcm)
+        self.stats['segments_dropped'] += dropped
+        if not segments:
+            return None
+
+        encode_start = time.perf_counter()
+        payloads = [self._encode(pcm[begin * 2:end * 2], rate) for begin, end in segments]
+        self.stats['encode_total'] += time.perf_counter() - encode_start
+        sent = sum(len(payload) for payload, _, _ in payloads)
+        self.stats['segments_sent'] += len(payloads)
+        self.stats['bytes_sent'] += sent
+        if len(payloads) == 1:
+            transcripts = [self.transcribe(*payloads[0])]
+        else:
+            transcripts = list(self._upload_pool.map(lambda args: self.transcribe(*args), payloads))
+
+        elapsed = time.perf_counter() - start
+        self.stats['latency_total'] += elapsed
+        print(f"STT: sent {sent / 1024:.1f} of {len(pcm) / 1024:.1f} KB {self.encoder.encoding} "
+              f"in {len(payloads)} segment(s), {elapsed * 1000:.0f} ms")
+        text = " ".join(t for t in transcripts if t).strip()
+        return text or None
+
+    def _encode(self, pcm, rate):
+        """Encoded payload, or plain LINEAR16 when the encoder fails (e.g. ffmpeg missing or crashing)"""
+        try:
+            return self.encoder.encode(pcm, rate)
+        except (subprocess.CalledProcessError, OSError) as e:
+            print(f"Audio encoding failed, sending LINEAR16: {e}")
+            return pcm, 'LINEAR16', rate
+
+    def stats_summary(self):
+        s = self.stats
+        if not s['requests']:
+            return "STT: no requests yet"
+        return (f"STT: {s['requests']} requests, {s['bytes_sent'] / 1024:.0f} of "
+                f"{s['bytes_captured'] / 1024:.0f} KB sent, {s['segments_dropped']} noise segments dropped, "
+                f"{s['encode_total'] / s['requests'] * 1000:.0f} ms mean encode, "
+                f"{s['latency_total'] / s['requests'] * 1000:.0f} ms mean latency")
+
+    def transcribe(self, audio_data, encoding='LINEAR16', sample_rate=None):
+        """Recognize an encoded payload (see AudioEncoder.encode).
+
+        A WAV blob needs no sample_rate; raw PCM and Opus do.
+        """
         config = speech.RecognitionConfig(
-            encoding=speech.RecognitionConfig.AudioEncoding.LINEAR16,
-            language_code="en-US",  # Set primary language to Hindi
+            encoding=speech.RecognitionConfig.AudioEncoding[encoding],
+            language_code=Config.SPEECH_SETTINGS['language_code'],
             #alternative_language_codes=["hi-IN", "en-IN"],
             enable_automatic_punctuation=True,
-            model="latest_long"
+            model=Config.SPEECH_SETTINGS['model']
         )
+        if sample_rate:
+            config.sample_rate_hertz = sample_rate
         audio = speech.RecognitionAudio(content=audio_data)
         
         try:
@@ -37,4 +132,74 @@ class SpeechProcessor:
                            for result in response.results]).strip()
         except Exception as e:
             print(f"Transcription error: {e}")
-            return None
\ No newline at end of file
+            return None
+
+    def stream_transcripts(self, source, timeout=None, phrase_time_limit=None, captured=None):
+        """Yield interim and final TranscriptEvents while the user is still speaking.
+
+        Waits for speech like Recognizer.listen (raising sr.WaitTimeoutError),
+        then pushes microphone chunks to the streaming backend as they are read.
+        Chunks sent are also appended to `captured` when given.
+        """
+        preroll = self._wait_for_speech(source, timeout)
+        chunks = self._phrase_chunks(source, preroll, phrase_time_limit, captured)
+        yield from self.streaming_backend.stream(chunks, source.SAMPLE_RATE, source.SAMPLE_WIDTH)
+
+    def stream_transcribe(self, source, on_interim=None, timeout=None, phrase_time_limit=None):
+        """Final transcript of one streamed utterance; interim text goes to on_interim.
+
+        If the streaming backend fails or recognizes nothing, the audio it was
+        sent is transcribed with one batch request instead.
+        """
+        captured = []
+        last_text = None
+        try:
+            for event in self.stream_transcripts(source, timeout, phrase_time_limit, captured):
+                if event.is_final:
+                    return event.text
+                last_text = event.text
+                if on_interim:
+                    on_interim(event.text)
+        except (sr.WaitTimeoutError, CaptureStopped):
+            raise
+        except Exception as e:
+            print(f"Streaming transcription error, transcribing in one request: {e}")
+            last_text = None
+        if last_text is None and captured:
+            return self.transcribe_audio(sr.AudioData(b''.join(captured), source.SAMPLE_RATE, source.SAMPLE_WIDTH))
+        # Phrase limit reached before the backend finalized
+        return last_text
+
+    def _wait_for_speech(self, source, timeout):
+        seconds_per_chunk = source.CHUNK / source.SAMPLE_RATE
+        # Keep ~0.5 s before onset so the first syllable is not clipped
+        preroll = deque(maxlen=int(0.5 / seconds_per_chunk) + 1)
+        elapsed = 0.0
+        while True:
+            chunk = source.stream.read(source.CHUNK)
+            preroll.append(chunk)
+            elapsed += seconds_per_chunk
+            if self._rms(chunk) > self.recognizer.energy_threshold:
+                return list(preroll)
+            if timeout and elapsed > timeout:
+                raise sr.WaitTimeoutError("listening timed out while waiting for phrase to start")
+
+    def _phrase_chunks(self, source, preroll, phrase_time_limit, captured=None):
+        seconds_per_chunk = source.CHUNK / source.SAMPLE_RATE
+        elapsed = 0.0
+        for chunk in preroll:
+            elapsed += seconds_per_chunk
+            if captured is not None:
+                captured.append(chunk)
+            yield chunk
+        while phrase_time_limit is None or elapsed < phrase_time_limit:
+            elapsed += seconds_per_chunk
+            chunk = source.stream.read(source.CHUNK)
+            if captured is not None:
+                captured.append(chunk)
+            yield chunk
+
+    @staticmethod
+    def _rms(chunk):
+        samples = np.frombuffer(chunk, dtype=np.int16).astype(np.float32)
+        return float(np.sqrt(np.mean(samples * samples))) if samples.size else 0.0
@@ -0,0 +1,72 @@
+# speech_streaming.py
+from collections import namedtuple
+
+TranscriptEvent = namedtuple('TranscriptEvent', ['text', 'is_final'])
+
+
+class StreamingBackend:
+    """Turns an iterator of raw PCM chunks into TranscriptEvents as they arrive"""
+
+    def stream(self, chunks, sample_rate, sample_width=2):
+        raise NotImplementedError
+
+
+class GoogleStreamingBackend(StreamingBackend):
+    """Google Cloud Speech streaming_recognize with interim results"""
+
+    def __init__(self, client, language_code="en-US", model="latest_long"):
+        self.client = client
+        self.language_code = language_code
+        self.model = model
+
+    def stream(self, chunks, sample_rate, sample_width=2):
+        from google.cloud import speech
+
+        config = speech.RecognitionConfig(
+            encoding=speech.RecognitionConfig.AudioEncoding.LINEAR16,
+            sample_rate_hertz=sample_rate,
+            language_code=self.language_code,
+            enable_automatic_punctuation=True,
+            model=self.model
+        )
+        # single_utterance lets the server end the stream as soon as it
+        # hears the end of the phrase instead of waiting for our own pause
+        streaming_config = speech.StreamingRecognitionConfig(
+            config=config,
+            interim_results=True,
+            single_utterance=True
+        )
+        requests = (speech.StreamingRecognizeRequest(audio_content=chunk) for chunk in chunks)
+        responses = self.client.streaming_recognize(config=streaming_config, requests=requests)
+        for response in responses:
+            for result in response.results:
+                if result.alternatives:
+                    yield TranscriptEvent(result.alternatives[0].transcript.strip(), result.is_final)
+                    if result.is_final:
+                        return
+
+
+class FakeStreamingBackend(StreamingBackend):
+    """Scripted backend for tests: emits one scripted event every N chunks.
+
+    `script` is a list of (text, is_final) pairs, e.g.
+    [("open", False), ("open note", False), ("open notepad", True)].
+    """
+
+    def __init__(self, script, chunks_per_event=1):
+        self.script = list(script)
+        self.chunks_per_event = chunks_per_event
+        self.chunks_received = 0
+
+    def stream(self, chunks, sample_rate, sample_width=2):
+        events = iter(self.script)
+        for i, _ in enumerate(chunks, 1):
+            self.chunks_received += 1
+            if i % self.chunks_per_event:
+                continue
+            event = next(events, None)
+            if event is None:
+                return
+            yield TranscriptEvent(*event)
+            if event[1]:
+                return
@@ -0,0 +1,31 @@
+from types import SimpleNamespace
+
+import pytest
+
+pytest.importorskip('speech_recognition')
+
+from audio_capture import AudioRingBuffer, CaptureStopped, RingBufferSource
+
+
+def _capture(error=None):
+    return SimpleNamespace(SAMPLE_RATE=16000, SAMPLE_WIDTH=2, CHUNK=4,
+                           ring=AudioRingBuffer(64), error=error)
+
+
+def test_read_after_mic_failure_raises_its_error():
+    capture = _capture(OSError("no input device"))
+    source = RingBufferSource(capture)
+    capture.ring.close()
+    with pytest.raises(CaptureStopped) as info:
+        source.stream.read(4)
+    assert isinstance(info.value.error, OSError)
+
+
+def test_closed_ring_is_drained_before_raising():
+    capture = _capture()
+    source = RingBufferSource(capture)
+    capture.ring.write(b'\1' * 6)
+    capture.ring.close()
+    assert source.read_bytes(8) == b'\1' * 6 + b'\0\0'
+    with pytest.raises(CaptureStopped):
+        source.read_bytes(8)
@@ -0,0 +1,87 @@
+import time
+from threading import Event
+from types import SimpleNamespace
+
+import pytest
+
+for module in ('keyboard', 'pyautogui', 'pyttsx3', 'pyperclip', 'dotenv'):
+    pytest.importorskip(module)
+
+import command_handler
+from command_handler import CommandHandler
+from command_pipeline import CommandPipeline
+from config import Config
+from fake_julep import FakeJulep
+from llm_backends import JulepBackend
+
+WINDOW = 'Notepad'
+PLAN = [{"command": "press_keys", "parameters": {"keys": ["ctrl", "shift", "m"]}}]
+BOLD_PLAN = [{"command": "press_keys", "parameters": {"keys": ["ctrl", "b"]}}]
+
+
+@pytest.fixture
+def handler(tmp_path, monkeypatch):
+    settings = dict(Config.COMMAND_SETTINGS, plan_cache=str(tmp_path / 'plans.sqlite3'))
+    monkeypatch.setattr(Config, 'COMMAND_SETTINGS', settings)
+    registry = SimpleNamespace(active_class=lambda max_age=None: WINDOW,
+                               active_title=lambda max_age=None: 'notes.txt - Notepad')
+    monkeypatch.setattr(command_handler, 'window_registry', lambda: registry)
+    handler = CommandHandler(backend=SimpleNamespace(name='none'))
+    handler.engine = None
+    yield handler
+    handler.plan_cache.close()
+
+
+def _run(handler, text):
+    for command in handler.stream_commands(text):
+        if command['command'] == 'forget_last_plan':
+            handler.forget_last_plan(**command['parameters'])
+
+
+def test_wrong_after_local_command_keeps_older_plan(handler):
+    handler.plan_cache.put("toggle the mixer panel", WINDOW, PLAN)
+    _run(handler, "toggle the mixer panel")  # Cache hit, becomes the last plan
+    _run(handler, "scroll down")             # Local intent
+    _run(handler, "that was wrong")
+    assert handler.plan_cache.get("toggle the mixer panel", WINDOW) == PLAN
+
+
+def test_wrong_right_after_cached_plan_forgets_it(handler):
+    handler.plan_cache.put("toggle the mixer panel", WINDOW, PLAN)
+    _run(handler, "toggle the mixer panel")
+    _run(handler, "that was wrong")
+    assert handler.plan_cache.get("toggle the mixer panel", WINDOW) is None
+
+
+def test_wrong_while_earlier_plan_still_runs(handler):
+    handler.plan_cache.put("toggle the mixer panel", WINDOW, PLAN)
+    handler.plan_cache.put("toggle the bold text", WINDOW, BOLD_PLAN)
+    release = Event()
+
+    def execute(job):
+        if job.seq == 1:
+            release.wait(5)  # Mixer still running while the next two are planned
+        for command in job.steps():
+            if command['command'] == 'forget_last_plan':
+                handler.forget_last_plan(**command['parameters'])
+
+    pipeline = CommandPipeline(handler.stream_commands, execute).start()
+    jobs = [pipeline.submit(text) for text in
+            ("toggle the mixer panel", "that was wrong", "toggle the bold text")]
+    deadline = time.perf_counter() + 5
+    while jobs[2].planned is None and time.perf_counter() < deadline:
+        time.sleep(0.01)
+    release.set()
+    while pipeline.busy and time.perf_counter() < deadline:
+        time.sleep(0.01)
+    pipeline.stop()
+
+    assert handler.plan_cache.get("toggle the mixer panel", WINDOW) is None
+    assert handler.plan_cache.get("toggle the bold text", WINDOW) == BOLD_PLAN
+
+
+def test_planner_deadline_answers_with_apology(handler):
+    handler.backend = JulepBackend(client=FakeJulep(latency=(2.0, 2.0), seed=0), timeout=0.1)
+    commands = handler.generate_commands("summarize the quarterly report")
+    assert [cmd['command'] for cmd in commands] == ['llm_response']
+    assert "took too long" in commands[0]['parameters']['text']
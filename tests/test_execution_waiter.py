@@ -0,0 +1,54 @@
+import json
+
+import pytest
+
+from execution_waiter import Backoff, ExecutionTimeout, wait_for_execution
+from fake_julep import DEFAULT_PLAN, FakeJulep
+
+
+def _run(client):
+    return client.executions.create(task_id='task-fake', input={'prompt': 'save'}).id
+
+
+@pytest.mark.parametrize('stream, mode', [(True, 'stream'), (False, 'poll')])
+def test_waits_until_succeeded(stream, mode):
+    client = FakeJulep(latency=(0.05, 0.05), stream=stream, seed=0)
+    stats = {}
+    result = wait_for_execution(client, _run(client), deadline=2.0, backoff=Backoff(initial=0.01), stats=stats)
+    assert result.status == 'succeeded'
+    assert stats['mode'] == mode
+
+
+def test_stream_needs_a_single_get():
+    client = FakeJulep(latency=(0.1, 0.1), stream=True, seed=0)
+    wait_for_execution(client, _run(client), deadline=2.0)
+    assert client.gets == 1
+
+
+@pytest.mark.parametrize('stream', [True, False])
+def test_deadline_raises_timeout(stream):
+    client = FakeJulep(latency=(2.0, 2.0), stream=stream, seed=0)
+    with pytest.raises(ExecutionTimeout) as info:
+        wait_for_execution(client, _run(client), deadline=0.1, backoff=Backoff(initial=0.01))
+    assert info.value.waited < 1.0
+
+
+def test_poll_count_is_per_call():
+    client = FakeJulep(latency=(0.05, 0.05), stream=False, seed=0)
+    stats = {}
+    wait_for_execution(client, _run(client), deadline=2.0, backoff=Backoff(initial=0.01), stats=stats)
+    before = client.gets
+    wait_for_execution(client, _run(client), deadline=2.0, backoff=Backoff(initial=0.01), stats=stats)
+    assert stats['polls'] == client.gets - before
+
+
+def test_julep_backend_returns_the_plan():
+    pytest.importorskip('yaml')
+    from llm_backends import JulepBackend, LLMTimeout
+
+    backend = JulepBackend(client=FakeJulep(latency=(0.05, 0.05), stream=False, seed=0), timeout=2.0)
+    assert json.dumps(DEFAULT_PLAN) in backend.complete("save")
+    assert backend.wait_stats['mode'] == 'poll'
+    slow = JulepBackend(client=FakeJulep(latency=(2.0, 2.0), seed=0), timeout=0.1)
+    with pytest.raises(LLMTimeout):
+        slow.complete("save")
@@ -0,0 +1,13 @@
+from frame_scheduler import AdaptiveRateScheduler
+
+PARAMS = {'MIN_FPS': 5, 'MAX_FPS': 30, 'IDLE_MOTION_THRESHOLD': 0.004, 'IDLE_HOLD_TIME': 1.5}
+
+
+def test_replay_clock_starts_active():
+    # A recording's timestamps start near zero, far from wall-clock time
+    scheduler = AdaptiveRateScheduler(PARAMS)
+    scheduler.observe(0.5, 0.5, False, now=0.0)
+    scheduler.observe(0.5, 0.5, False, now=1.0)
+    assert not scheduler.idle
+    scheduler.observe(0.5, 0.5, False, now=1.6)
+    assert scheduler.idle
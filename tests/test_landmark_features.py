@@ -0,0 +1,36 @@
+import random
+import struct
+from types import SimpleNamespace
+
+import numpy as np
+import pytest
+
+from landmark_features import NUM_LANDMARKS, LandmarkFeatures
+
+FEATURES = ('left_ear', 'right_ear', 'brow_left', 'brow_right', 'mouth_open', 'eye_x', 'eye_y')
+
+
+def _face(seed=0):
+    rng = random.Random(seed)
+    landmarks = [SimpleNamespace(x=rng.random(), y=rng.random(), z=rng.random()) for _ in range(NUM_LANDMARKS)]
+    raw = b"".join(b"\x0a\x0f" + struct.pack("<BfBfBf", 0x0d, lm.x, 0x15, lm.y, 0x1d, lm.z) for lm in landmarks)
+    return SimpleNamespace(landmark=landmarks, SerializeToString=lambda: raw)
+
+
+@pytest.mark.parametrize('as_message', [True, False])
+def test_partial_read_matches_full_read(as_message):
+    face = _face()
+    source = face if as_message else face.landmark
+    full = LandmarkFeatures(keep_all=True).update(source, roi=(0.2, 0.1, 0.5, 0.6), mirror=True)
+    partial = LandmarkFeatures().update(source, roi=(0.2, 0.1, 0.5, 0.6), mirror=True)
+    for name in FEATURES:
+        assert getattr(partial, name) == pytest.approx(getattr(full, name), abs=1e-6)
+    assert np.allclose(partial.bounds(), full.bounds())
+    assert partial.count == full.count == NUM_LANDMARKS
+
+
+def test_short_face_falls_back_to_full_read():
+    face = _face().landmark[:450]  # Fewer than the outline indices reach
+    features = LandmarkFeatures().update(face)
+    assert features.count == 450
+    assert np.allclose(features.points[:450], [(lm.x, lm.y, lm.z) for lm in face])
@@ -0,0 +1,21 @@
+import pytest
+
+from plan_cache import PlanCache, cache_key
+
+PLAN = [{"command": "run_command", "parameters": {"command": "start notepad"}}]
+
+
+@pytest.mark.parametrize('text', ["open notepad now please", "please could you open notepad for me now",
+                                  "Open Notepad, please!", "open notepad"])
+def test_cache_key_is_idempotent(text):
+    key = cache_key(text)
+    assert key == 'open notepad'
+    assert cache_key(key) == key
+
+
+def test_stored_key_found_again(tmp_path):
+    cache = PlanCache(str(tmp_path / 'plans.sqlite3'))
+    cache.put("open notepad now please", 'Notepad', PLAN)
+    key = cache.keys()[0][0]
+    assert cache.get(key, 'Notepad') == PLAN
+    cache.close()
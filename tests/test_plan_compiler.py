@@ -0,0 +1,57 @@
+from types import SimpleNamespace
+
+from plan_compiler import PlanCompiler
+from plan_executor import PlanExecutor
+
+LAUNCH_THEN_TYPE = [
+    {"command": "run_command", "parameters": {"command": "start notepad"}},
+    {"command": "sleep", "parameters": {"duration": 2}},
+    {"command": "type_text", "parameters": {"text": "hello"}},
+]
+SETTINGS = {'launch_timeout': 0.05, 'page_timeout': 0.05, 'focus_timeout': 0.05,
+            'input_settle': 0, 'poll_interval': 0.01}
+
+
+def _executor(window_opens, calls):
+    actions = {name: (lambda name: lambda **params: calls.append((name, params)))(name)
+               for name in ('run_command', 'sleep', 'type_text')}
+    watcher = SimpleNamespace(mark=lambda: 0,
+                              wait_for_window=lambda mark, timeout: object() if window_opens else None)
+    return PlanExecutor(actions, watcher, registry=None, settings=SETTINGS, log=lambda message: None)
+
+
+def test_sleep_after_launch_is_kept_in_plan():
+    plan = PlanCompiler(log=lambda message: None).compile(LAUNCH_THEN_TYPE)
+    assert [cmd['command'] for cmd in plan] == ['run_command', 'sleep', 'type_text']
+
+
+def test_sleep_after_launch_skipped_when_window_appeared():
+    calls = []
+    _executor(True, calls).run(LAUNCH_THEN_TYPE)
+    assert [name for name, _ in calls] == ['run_command', 'type_text']
+
+
+def test_sleep_after_launch_runs_when_wait_gave_up():
+    calls = []
+    _executor(False, calls).run(LAUNCH_THEN_TYPE)
+    assert [name for name, _ in calls] == ['run_command', 'sleep', 'type_text']
+
+
+def test_plan_stops_at_first_invalid_step():
+    actions = {'press_keys': lambda keys: None, 'type_text': lambda text: None,
+               'left_click': lambda: None}
+    compiler = PlanCompiler(actions, log=lambda message: None)
+    plan = compiler.compile([
+        {"command": "left_click", "parameters": {}},
+        {"command": "press_keys", "parameters": {"keys": ["ctrl", "a"]}},
+        {"command": "delete_everything", "parameters": {}},
+        {"command": "type_text", "parameters": {"text": "replacement"}},
+    ])
+    assert [cmd['command'] for cmd in plan] == ['left_click', 'press_keys']
+    assert compiler.stats['rejected'] == 1
+
+
+def test_repeated_escape_is_kept():
+    escape = {"command": "press_keys", "parameters": {"keys": ["esc"]}}
+    plan = PlanCompiler(log=lambda message: None).compile([escape, escape])
+    assert len(plan) == 2
@@ -0,0 +1,54 @@
+from types import SimpleNamespace
+
+from plan_executor import READINESS, _press_keys_readiness, _site_name, title_changed
+from window_events import WindowWatcher
+from window_utils import WindowInfo, WindowRegistry
+
+SETTINGS = {'poll_interval': 0.01}
+
+
+def _desktop(*windows, focus):
+    state = {'windows': {w.handle: w for w in windows}, 'focus': focus}
+    registry = WindowRegistry(enumerate=lambda: (list(state['windows'].values()), state['focus']))
+    executor = SimpleNamespace(watcher=WindowWatcher(), registry=registry, settings=SETTINGS)
+    return executor, state
+
+
+def test_focusing_browser_on_old_tab_is_not_loaded():
+    editor = WindowInfo(1, 10, "notes.txt - Notepad", "Notepad")
+    browser = WindowInfo(2, 20, "Inbox - Mail - Browser", "Browser")
+    executor, state = _desktop(editor, browser, focus=1)
+    wait = title_changed(executor, {'url': 'https://www.wikipedia.org'})
+    state['focus'] = 2
+    executor.watcher._emit('focus', 2, 20, browser.title, "Browser")
+    assert not wait(0.05)
+
+
+def test_retitle_of_focused_window_is_loaded():
+    browser = WindowInfo(2, 20, "Inbox - Mail - Browser", "Browser")
+    executor, state = _desktop(browser, focus=2)
+    wait = title_changed(executor, {'url': 'https://example.org/docs'})
+    executor.watcher._emit('title', 2, 20, "Docs - Browser", "Browser")
+    assert wait(0.05)
+
+
+def test_polled_title_naming_the_site_is_loaded():
+    editor = WindowInfo(1, 10, "notes.txt - Notepad", "Notepad")
+    executor, state = _desktop(editor, focus=1)
+    wait = title_changed(executor, {'url': 'https://en.wikipedia.org/wiki/Python'})
+    state['windows'][3] = WindowInfo(3, 30, "Python - Wikipedia - Browser", "Browser")
+    state['focus'] = 3
+    assert wait(0.05)
+
+
+def test_site_name():
+    assert _site_name('https://docs.python.org/3/') == 'python'
+    assert _site_name('www.bbc.co.uk') == 'bbc'
+
+
+def test_only_window_shortcuts_wait_for_focus():
+    assert _press_keys_readiness({'keys': ['alt', 'tab']})[0] == 'focus changed'
+    assert _press_keys_readiness({'keys': ['win', '2']})[0] == 'focus changed'
+    assert _press_keys_readiness({'keys': ['tab']})[0] == 'settled'
+    assert _press_keys_readiness({'keys': ['ctrl', 'tab']})[0] == 'settled'
+    assert READINESS['press_keys'] is _press_keys_readiness
@@ -0,0 +1,28 @@
+from plan_index import FuzzyPlanIndex
+
+
+def _index(*utterances):
+    index = FuzzyPlanIndex(threshold=0.75)
+    index.add_many((text, 'Chrome_WidgetWin_1') for text in utterances)
+    return index
+
+
+def test_different_name_is_not_reused():
+    index = _index("email john about the meeting")
+    assert index.search("email jane about the meeting", 'Chrome_WidgetWin_1') is None
+
+
+def test_different_search_term_is_not_reused():
+    index = _index("search python tutorials")
+    assert index.search("search java tutorials", 'Chrome_WidgetWin_1') is None
+
+
+def test_extra_target_word_is_not_reused():
+    index = _index("open notepad")
+    assert index.search("open notepad settings", 'Chrome_WidgetWin_1') is None
+
+
+def test_paraphrase_is_reused():
+    index = _index("open notepad")
+    match = index.search("launch the notepad", 'Chrome_WidgetWin_1')
+    assert match is not None and match[0] == "open notepad"
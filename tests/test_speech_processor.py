@@ -0,0 +1,91 @@
+from types import SimpleNamespace
+
+import numpy as np
+import pytest
+
+for module in ('speech_recognition', 'google.cloud.speech', 'pyautogui'):
+    pytest.importorskip(module)
+
+import speech_processor
+from config import Config
+from speech_processor import SpeechProcessor
+from speech_streaming import FakeStreamingBackend
+
+CHUNK = 160
+SPEECH = np.full(CHUNK, 3000, np.int16).tobytes()
+
+
+class FakeClient:
+    def __init__(self):
+        self.configs = []
+
+    def recognize(self, config, audio):
+        self.configs.append(config)
+        alternative = SimpleNamespace(transcript="open notepad")
+        return SimpleNamespace(results=[SimpleNamespace(alternatives=[alternative])])
+
+
+class FailingBackend:
+    def stream(self, chunks, sample_rate, sample_width=2):
+        next(chunks)
+        raise ConnectionError("stream reset")
+        yield
+
+
+def _source():
+    return SimpleNamespace(CHUNK=CHUNK, SAMPLE_RATE=16000, SAMPLE_WIDTH=2,
+                           stream=SimpleNamespace(read=lambda frames: SPEECH))
+
+
+@pytest.fixture
+def client(monkeypatch):
+    client = FakeClient()
+    monkeypatch.setattr(speech_processor.sr, 'Microphone', lambda: None)
+    monkeypatch.setattr(speech_processor.speech, 'SpeechClient', lambda: client)
+    return client
+
+
+def test_interim_then_final(client):
+    backend = FakeStreamingBackend([("open", False), ("open note", False), ("open notepad", True)])
+    processor = SpeechProcessor(streaming_backend=backend)
+    interim = []
+    assert processor.stream_transcribe(_source(), on_interim=interim.append) == "open notepad"
+    assert interim == ["open", "open note"]
+    assert client.configs == []  # No batch request
+
+
+def test_backend_failure_falls_back_to_batch(client, monkeypatch):
+    processor = SpeechProcessor(streaming_backend=FailingBackend())
+    batches = []
+    monkeypatch.setattr(processor, 'transcribe_audio',
+                        lambda audio: batches.append(audio.get_raw_data()) or "open notepad")
+    assert processor.stream_transcribe(_source(), phrase_time_limit=0.5) == "open notepad"
+    assert batches and batches[0].startswith(SPEECH)
+
+
+def test_nothing_recognized_falls_back_to_batch(client, monkeypatch):
+    processor = SpeechProcessor(streaming_backend=FakeStreamingBackend([]))
+    monkeypatch.setattr(processor, 'transcribe_audio', lambda audio: "open notepad")
+    assert processor.stream_transcribe(_source(), phrase_time_limit=0.5) == "open notepad"
+
+
+def test_batch_request_uses_speech_settings(client, monkeypatch):
+    monkeypatch.setattr(Config, 'SPEECH_SETTINGS', dict(Config.SPEECH_SETTINGS, language_code='de-DE', model='short'))
+    SpeechProcessor().transcribe(b'\0' * 320, 'LINEAR16', 16000)
+    assert client.configs[0].language_code == 'de-DE'
+    assert client.configs[0].model == 'short'
+
+
+def test_encoder_failure_sends_linear16(client):
+    processor = SpeechProcessor()
+
+    def broken(pcm, rate):
+        raise speech_processor.subprocess.CalledProcessError(1, 'ffmpeg')
+
+    processor.encoder.encode = broken
+    t = np.arange(16000) / 16000
+    voiced = (8000 * np.sin(2 * np.pi * 220 * t)).astype(np.int16)
+    silence = np.zeros(4000, np.int16)
+    audio = speech_processor.sr.AudioData(np.concatenate([silence, voiced, silence]).tobytes(), 16000, 2)
+    assert processor.transcribe_audio(audio) == "open notepad"
+    assert client.configs[0].encoding == speech_processor.speech.RecognitionConfig.AudioEncoding.LINEAR16
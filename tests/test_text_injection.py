@@ -0,0 +1,54 @@
+import pytest
+
+from text_injection import TextInjector
+
+SETTINGS = {'paste_min_chars': 40, 'paced_delay': 0, 'restore_delay': 0, 'window_overrides': {}}
+
+
+class FakeKeyboard:
+    def __init__(self):
+        self.written = []
+        self.sent = []
+
+    def write(self, text, delay=None):
+        self.written.append(text)
+
+    def send(self, hotkey):
+        self.sent.append(hotkey)
+
+
+class FakeClipboard:
+    def __init__(self):
+        self.text = ''
+
+    def copy(self, text):
+        self.text = text
+
+    def paste(self):
+        return self.text
+
+
+def _injector(**overrides):
+    keyboard = FakeKeyboard()
+    return TextInjector(dict(SETTINGS, **overrides), keyboard=keyboard, clipboard=FakeClipboard()), keyboard
+
+
+def test_unknown_strategy_types_nothing():
+    injector, keyboard = _injector()
+    with pytest.raises(ValueError, match="typing strategy 'fast'"):
+        injector.type("hello", strategy='fast')
+    assert keyboard.written == [] and keyboard.sent == []
+
+
+def test_unknown_window_override_is_rejected():
+    injector, keyboard = _injector(window_overrides={'Notepad': 'slow'})
+    injector.window_class = lambda: 'Notepad'
+    with pytest.raises(ValueError):
+        injector.type("hello")
+    assert keyboard.written == []
+
+
+def test_short_text_written_in_one_go():
+    injector, keyboard = _injector()
+    assert injector.type("hello") == 'bulk'
+    assert keyboard.written == ["hello"]
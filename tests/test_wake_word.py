@@ -0,0 +1,16 @@
+import numpy as np
+
+from wake_word import SAMPLE_RATE, WakeWordDetector
+
+
+def test_long_phrase_matched_on_its_first_seconds(tmp_path):
+    detector = WakeWordDetector(str(tmp_path), threshold=1.0, max_speech=1.5)
+    lengths = []
+    detector.extract = lambda voiced: lengths.append(len(voiced)) or np.zeros((1, 13), np.float32)
+    detector.templates = [np.zeros((1, 13), np.float32)]
+
+    t = np.arange(SAMPLE_RATE * 4) / SAMPLE_RATE
+    tone = (0.5 * np.sin(2 * np.pi * 220 * t)).astype(np.float32)
+    silence = np.zeros(SAMPLE_RATE // 4, np.float32)
+    assert detector.score(np.concatenate([silence, tone, silence])) is not None
+    assert lengths == [int(1.5 * SAMPLE_RATE)]
@@ -0,0 +1,28 @@
+import window_events
+from window_events import PollingWindowWatcher, WindowWatcher, create_watcher
+
+
+def _no_display():
+    raise OSError("no display")
+
+
+def test_create_watcher_survives_polling_failure(monkeypatch):
+    monkeypatch.setattr(window_events, 'PollingWindowWatcher',
+                        lambda interval: PollingWindowWatcher(_no_display, interval))
+    watcher = create_watcher('poll')
+    assert type(watcher) is WindowWatcher
+    mark = watcher.mark()
+    assert watcher.wait_for_window(mark, timeout=0.01) is None
+    watcher.stop()
+
+
+def test_registry_stays_fresh_without_title_events():
+    from window_utils import WindowRegistry
+
+    registry = WindowRegistry(max_age=0.25, enumerate=lambda: ([], None))
+    registry.attach(WindowWatcher(), max_age=5.0)
+    assert registry.max_age == 0.25
+    watcher = WindowWatcher()
+    watcher.reports_titles = True
+    registry.attach(watcher, max_age=5.0)
+    assert registry.max_age == 5.0
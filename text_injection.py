@@ -0,0 +1,101 @@
+# text_injection.py
+import time
+from threading import Lock, Timer
+
+STRATEGIES = ('paste', 'bulk', 'paced')
+
+
+class TextInjector:
+    """Puts text into the focused window by the fastest means it accepts.
+
+    'paste'  copies the text to the clipboard and sends ctrl+v, restoring
+             the previous clipboard afterwards (long text)
+    'bulk'   one keyboard write with no delay between characters
+    'paced'  one character at a time with a delay, for fields that reject
+             paste or drop fast keystrokes
+
+    Length thresholds pick between paste and bulk; `window_overrides` maps a
+    window class to a fixed strategy.
+    """
+
+    def __init__(self, settings, window_class=None, keyboard=None, clipboard=None):
+        if keyboard is None:
+            import keyboard
+        if clipboard is None:
+            import pyperclip as clipboard
+        self.settings = settings
+        self.window_class = window_class or (lambda: None)
+        self.keyboard = keyboard
+        self.clipboard = clipboard
+        self._clipboard_lock = Lock()
+        self._pasted = None  # Text we put on the clipboard and have not restored yet
+        self._saved = None   # Clipboard contents from before that paste
+        self.stats = {name: {'count': 0, 'chars': 0, 'seconds': 0.0} for name in STRATEGIES}
+
+    def choose(self, text, window_class=None):
+        override = self.settings['window_overrides'].get(window_class)
+        if override:
+            return override
+        if len(text) >= self.settings['paste_min_chars']:
+            return 'paste'
+        return 'bulk'
+
+    def type(self, text, strategy=None, delay=None):
+        """Inject `text`; returns the strategy used"""
+        if not text:
+            return None
+        strategy = strategy or self.choose(text, self.window_class())
+        if strategy not in STRATEGIES:
+            raise ValueError(f"Unknown typing strategy {strategy!r}, expected one of {', '.join(STRATEGIES)}")
+        start = time.perf_counter()
+        if strategy == 'paste':
+            try:
+                self._paste(text)
+            except Exception as e:
+                # No clipboard access (e.g. no xclip/xsel on Linux)
+                print(f"Paste failed, typing instead: {e}")
+                strategy = 'bulk'
+        if strategy == 'bulk':
+            self.keyboard.write(text, delay=0)
+        elif strategy == 'paced':
+            delay = self.settings['paced_delay'] if delay is None else float(delay)
+            for char in text:
+                self.keyboard.write(char)
+                time.sleep(delay)
+        stats = self.stats[strategy]
+        stats['count'] += 1
+        stats['chars'] += len(text)
+        stats['seconds'] += time.perf_counter() - start
+        return strategy
+
+    def _paste(self, text):
+        with self._clipboard_lock:
+            # A paste still waiting for its restore keeps the original contents
+            previous = self._saved if self._pasted is not None else self.clipboard.paste()
+            self._saved = previous
+            self._pasted = text
+            self.clipboard.copy(text)
+        self.keyboard.send('ctrl+v')
+        # The target reads the clipboard when it handles ctrl+v, so restoring
+        # right away could paste the old contents; do it a moment later
+        Timer(self.settings['restore_delay'], self._restore, (text,)).start()
+
+    def _restore(self, text):
+        with self._clipboard_lock:
+            if self._pasted != text:
+                return  # A newer paste owns the clipboard now
+            try:
+                if self.clipboard.paste() == text:
+                    self.clipboard.copy(self._saved)
+            except Exception as e:
+                print(f"Clipboard restore failed: {e}")
+            self._pasted = None
+
+    def stats_summary(self):
+        parts = []
+        for name in STRATEGIES:
+            s = self.stats[name]
+            if s['count']:
+                rate = s['chars'] / s['seconds'] if s['seconds'] else float('inf')
+                parts.append(f"{s['count']} {name} ({s['chars']} chars, {rate:.0f} chars/s)")
+        return "Typing: " + (", ".join(parts) if parts else "nothing typed")
@@ -0,0 +1,87 @@
+# vad.py
+import numpy as np
+
+FRAME_MS = 20
+
+
+def to_float(pcm):
+    """16-bit little-endian PCM bytes -> float32 samples in [-1, 1)"""
+    return np.frombuffer(pcm, dtype='<i2').astype(np.float32) / 32768.0
+
+
+def frame_energy_db(samples, rate, frame_ms=FRAME_MS):
+    """Per-frame RMS energy in dBFS"""
+    frame = max(1, int(rate * frame_ms / 1000))
+    n = len(samples) // frame
+    if not n:
+        return np.zeros(0, dtype=np.float32)
+    frames = samples[:n * frame].reshape(n, frame)
+    rms = np.sqrt(np.mean(frames * frames, axis=1))
+    return 20 * np.log10(np.maximum(rms, 1e-6))
+
+
+def speech_bounds(samples, rate, margin_db=12.0, min_db=-50.0, frame_ms=FRAME_MS):
+    """(start, end) sample indices of the voiced region, or None if silent.
+
+    A frame is voiced when it is `margin_db` above the quietest 10% of
+    frames (the noise floor) and louder than `min_db` overall.
+    """
+    energy = frame_energy_db(samples, rate, frame_ms)
+    if not len(energy):
+        return None
+    floor = np.percentile(energy, 10)
+    voiced = np.flatnonzero((energy > floor + margin_db) & (energy > min_db))
+    if not len(voiced):
+        return None
+    frame = int(rate * frame_ms / 1000)
+    return voiced[0] * frame, (voiced[-1] + 1) * frame
+
+
+def frame_zcr(samples, rate, frame_ms=FRAME_MS):
+    """Per-frame zero-crossing rate (sign changes per sample)"""
+    frame = max(1, int(rate * frame_ms / 1000))
+    n = len(samples) // frame
+    if not n:
+        return np.zeros(0, dtype=np.float32)
+    signs = np.signbit(samples[:n * frame].reshape(n, frame))
+    return np.count_nonzero(signs[:, 1:] != signs[:, :-1], axis=1) / frame
+
+
+def split_utterances(samples, rate, margin_db=12.0, min_db=-50.0, min_speech=0.15,
+                     max_gap=0.4, pad=0.15, noise_zcr=0.35, frame_ms=FRAME_MS):
+    """Voiced (start, end) sample ranges with silence and pure noise removed.
+
+    Frames are voiced by the same energy rule as speech_bounds. Voiced runs
+    separated by less than `max_gap` seconds are merged, runs shorter than
+    `min_speech` are dropped, and so are runs that look like broadband
+    noise: high zero-crossing rate without much energy above the floor.
+    Each kept range is padded by `pad` seconds so word edges survive.
+    Returns (segments, dropped_count).
+    """
+    energy = frame_energy_db(samples, rate, frame_ms)
+    if not len(energy):
+        return [], 0
+    zcr = frame_zcr(samples, rate, frame_ms)
+    floor = np.percentile(energy, 10)
+    voiced = np.flatnonzero((energy > floor + margin_db) & (energy > min_db))
+    if not len(voiced):
+        return [], 0
+
+    frame = int(rate * frame_ms / 1000)
+    gap_frames = max(1, int(max_gap * 1000 / frame_ms))
+    breaks = np.flatnonzero(np.diff(voiced) > gap_frames)
+    starts = np.concatenate(([voiced[0]], voiced[breaks + 1]))
+    ends = np.concatenate((voiced[breaks], [voiced[-1]])) + 1
+
+    segments, dropped = [], 0
+    pad_samples = int(pad * rate)
+    for start, end in zip(starts, ends):
+        too_short = (end - start) * frame_ms / 1000 < min_speech
+        noisy = (np.median(zcr[start:end]) > noise_zcr and
+                 np.mean(energy[start:end]) < floor + 2 * margin_db)
+        if too_short or noisy:
+            dropped += 1
+            continue
+        segments.append((max(0, start * frame - pad_samples),
+                         min(len(samples), end * frame + pad_samples)))
+    return segments, dropped
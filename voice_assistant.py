@@ -1,13 +1,16 @@
 # voice_assistant.py
-import time
 import os
 import speech_recognition as sr
 from speech_processor import SpeechProcessor
 from command_handler import CommandHandler
 from config import Config
-from window_utils import get_active_window
-import threading
-from window_utils import get_all_open_windows
+from window_utils import window_registry
+from window_events import create_watcher
+from wake_word import WakeWordDetector, SAMPLE_RATE
+from audio_capture import MicrophoneCapture, CaptureStopped
+from command_pipeline import CommandPipeline
+from plan_executor import PlanExecutor
+from plan_compiler import PlanCompiler
 
 
 class VoiceAssistant:
@@ -20,17 +23,76 @@ class VoiceAssistant:
         self.activated = False
         self.should_calibrate = True
         self.is_processing = False  # Add processing state flag
+        # The mic is read continuously into a ring buffer, so nothing said
+        # while a command runs is lost
+        self.capture = MicrophoneCapture(
+            self.speech_processor.microphone,
+            seconds=Config.AUDIO_SETTINGS.get('buffer_seconds', 30)
+        )
+        self.source = None
+        # Tells the executor the moment a launched app's window shows up
+        self.window_events = None
+        self.executor = None
+        # Checks and tidies each plan on its way to the executor
+        self.compiler = PlanCompiler(self.command_handler.actions, log=self.log)
+        # Recognized phrases are planned while the previous plan executes
+        self.pipeline = CommandPipeline(
+            self.command_handler.stream_commands,
+            self.process_command,
+            max_pending=Config.PIPELINE_SETTINGS['max_pending'],
+            max_planned=Config.PIPELINE_SETTINGS['max_planned'],
+            on_idle=self._on_idle
+        )
+        self.wake_detector = None
+        if Config.WAKE_WORD_SETTINGS['enabled']:
+            self.wake_detector = WakeWordDetector(
+                Config.WAKE_WORD_SETTINGS['samples_dir'],
+                threshold=Config.WAKE_WORD_SETTINGS['threshold']
+            )
 
     def run(self):
         """Main execution loop with proper logging"""
+        self.capture.start()
+        self.source = self.capture.reader()
         self.log("Calibrating microphone...")
-        self.speech_processor.calibrate()
+        try:
+            self.speech_processor.calibrate(self.source)
+        except CaptureStopped as e:
+            self.log(f"🎤 Microphone unavailable: {e}")
+            self.capture.stop()
+            return
         self.log("Calibration complete")
+        self.window_events = create_watcher(
+            Config.WINDOW_SETTINGS['watcher'],
+            poll_interval=Config.WINDOW_SETTINGS['poll_interval']
+        )
+        # Window lookups are answered from memory, kept current by the events
+        window_registry().max_age = Config.WINDOW_SETTINGS['registry_max_age']
+        window_registry().attach(self.window_events, max_age=Config.WINDOW_SETTINGS['registry_max_age_events'])
+        self.executor = PlanExecutor(
+            self.command_handler.actions,
+            self.window_events,
+            window_registry(),
+            Config.EXECUTOR_SETTINGS,
+            log=self.log
+        )
+        self.pipeline.start()
         
-        while VoiceAssistant.is_active:
-            self.activated = False
-            self.activate()
-            self.main_loop()
+        try:
+            while VoiceAssistant.is_active:
+                self.activated = False
+                self.activate()
+                self.main_loop()
+        finally:
+            self.capture.stop()
+            self.pipeline.stop()
+            if self.window_events:
+                self.window_events.stop()
+        print(self.speech_processor.stats_summary())
+        print(self.pipeline.stats_summary())
+        print(self.command_handler.stats_summary())
+        print(self.compiler.stats_summary())
+        print(self.capture.stats_summary())
 
     def log(self, message):
         """Handle logging through GUI or console"""
@@ -44,8 +106,11 @@ class VoiceAssistant:
         self.log(f"🔈 Say '{Config.WAKE_WORD}' to start...")
         if self.gui:
             self.gui.update_status("waiting")
+        local_gate = self.wake_detector is not None and self.wake_detector.ready
+        if self.wake_detector and not local_gate:
+            self.log("No wake-word samples enrolled, every phrase is checked in the cloud")
         
-        with self.speech_processor.microphone as source:
+        with self.source as source:
             while not self.activated and VoiceAssistant.is_active:
                 try:
                     # Increase timeout and phrase limit
@@ -54,7 +119,11 @@ class VoiceAssistant:
                         timeout=5,  # Increased from 3
                         phrase_time_limit=3  # Increased from 2
                     )
-                    transcript = self.speech_processor.transcribe(audio.get_wav_data())
+                    # Only phrases that locally match the wake word go upstream
+                    if local_gate and not self.wake_detector.detect(
+                            audio.get_raw_data(convert_rate=SAMPLE_RATE, convert_width=2)):
+                        continue
+                    transcript = self.speech_processor.transcribe_audio(audio)
                     print(transcript)
                     if transcript and Config.WAKE_WORD in transcript.lower():
                         self.activated = True
@@ -64,127 +133,75 @@ class VoiceAssistant:
                             
                 except sr.WaitTimeoutError:
                     continue  # Silently ignore timeouts during activation
+                except CaptureStopped as e:
+                    self._microphone_lost(e)
                 except Exception as e:
                     self.log(f"Activation Error: {e}")
-                time.sleep(0.1)  # Add small delay between attempts
 
     def main_loop(self):
-        """Continuous listening loop with processing state check"""
-        with self.speech_processor.microphone as source:
+        """Continuous listening loop; keeps listening while commands run"""
+        with self.source as source:
             while self.activated and VoiceAssistant.is_active:
                 try:
-                    # Check processing state before listening
-                    if self.is_processing:
-                        time.sleep(0.1)
-                        continue
-
-                    # Increased phrase time limit for main listening
-                    audio = self.speech_processor.recognizer.listen(
-                        source, 
-                        timeout=5,
-                        phrase_time_limit=10
-                    )
-                    transcript = self.speech_processor.transcribe(audio.get_wav_data())
+                    if Config.SPEECH_SETTINGS['streaming']:
+                        # Final result arrives as soon as the server detects
+                        # the end of the phrase, not after our own pause
+                        transcript = self.speech_processor.stream_transcribe(
+                            source,
+                            on_interim=lambda text: print(f"... {text}"),
+                            timeout=5,
+                            phrase_time_limit=10
+                        )
+                    else:
+                        # Increased phrase time limit for main listening
+                        audio = self.speech_processor.recognizer.listen(
+                            source, 
+                            timeout=5,
+                            phrase_time_limit=10
+                        )
+                        transcript = self.speech_processor.transcribe_audio(audio)
                     
                     if transcript:
-                        if not self.is_processing:
-                            self.log(f"Recognized: {transcript}")
-                            self.is_processing = True  # Set processing flag
-                            self.log("🔄 Processing commands - new requests will wait...")
-                            if self.gui:
-                                self.gui.start_loading()
-                            
-                            processing_thread = threading.Thread(
-                                target=self.process_command,
-                                args=(transcript,)
-                            )
-                            processing_thread.start()
-                        else:
-                            self.log("⚠️ Ignoring new request during command execution")
+                        self.log(f"Recognized: {transcript}")
+                        if self.pipeline.busy:
+                            self.log(f"⏳ Queued behind {self.pipeline.pending} request(s)")
+                        self.pipeline.submit(transcript)
                         
                 except sr.WaitTimeoutError:
                     continue
+                except CaptureStopped as e:
+                    self._microphone_lost(e)
                 except Exception as e:
                     self.log(f"Listening Error: {e}")
-                time.sleep(0.2)
 
-    def process_command(self, transcript):
-        """Handle command processing and clear processing flag"""
-        try:
-            if self.gui:
-                self.gui.start_loading(transcript)  # Pass transcript here
-            commands = self.command_handler.generate_commands(transcript)
-            self.execute_commands(commands)
-        finally:
-            self.is_processing = False
-            self.log("✅ Ready for new commands")
-            if self.gui:
-                self.gui.stop_loading()
+    def _microphone_lost(self, error):
+        """Stop listening for good; the capture thread is gone"""
+        self.log(f"🎤 Microphone stopped, shutting down: {error}")
+        self.activated = False
+        VoiceAssistant.is_active = False
 
-    def execute_commands(self, commands):
-        """Execute commands with enhanced synchronization"""
-        self.log("⚡ Executing commands...")
-        index = 0
-        #last_window_state = set(get_all_open_windows())
-        
-        while index < len(commands) and VoiceAssistant.is_active:
-            cmd = commands[index]
-            command_name = cmd.get("command")
-            params = cmd.get("parameters", {})
-            
-            try:
-                pre_windows = set(get_all_open_windows())
-                
-                self.log(f"Executing: {command_name} {params}")
-                handler = self.command_handler.actions.get(command_name)
-                
-                if handler:
-                    start_time = time.time()
-                    handler(**params)
-                    exec_time = time.time() - start_time
-                    
-                    # Enhanced synchronization logic
-                    if command_name == "run_command":
-                        # Extended window detection timeout
-                        launch_timeout = 7  # Increased from 3 seconds
-                        window_found = False
-                        
-                        # Detect window creation
-                        window_start = time.time()
-                        while (time.time() - window_start) < launch_timeout:
-                            current_windows = set(get_all_open_windows())
-                            new_windows = current_windows - pre_windows
-                            
-                            if new_windows:
-                                window_found = True
-                                break
-                            time.sleep(0.1)
-                        
-                        # Additional stabilization delay
-                        if window_found:
-                            time.sleep(0.5)  # Added post-window detection wait
-                            
-                            # Skip subsequent long waits
-                            if (index + 1 < len(commands)):
-                                next_cmd = commands[index+1]
-                                if (next_cmd.get("command") == "sleep" and 
-                                    next_cmd.get("parameters", {}).get("duration", 0) > 0.5):
-                                    index += 1
+    def process_command(self, job):
+        """Execute a planned pipeline job (runs on the executor thread)"""
+        self.is_processing = True
+        self.log("🔄 Processing commands - new requests will be queued...")
+        if self.gui:
+            self.gui.start_loading(job.transcript)  # Pass transcript here
+        # Steps arrive while the planner is still streaming the rest
+        self.execute_commands(self.compiler.stream(job.steps()), job.cancelled)
 
-                    # General inter-command synchronization
-                    if command_name != "sleep":
-                        # Extended minimum delay between commands
-                        remaining_delay = max(0, 0.3 - exec_time)  # Increased from 0.15
-                        time.sleep(remaining_delay)
+    def _on_idle(self):
+        self.is_processing = False
+        self.log("✅ Ready for new commands")
+        if self.gui:
+            self.gui.stop_loading()
 
-                    # Special handling for browser navigation
-                    if command_name == "open_url":
-                        time.sleep(1.5)  # Additional stabilization for web pages
+    def execute_commands(self, commands, cancelled=None):
+        """Execute commands, each waiting only until it took effect; stops early once `cancelled` is set.
 
-                index += 1
-                
-            except Exception as e:
-                self.log(f"Execution error: {e}")
-                index += 1
-                
+        `commands` may be a list or an iterator that is still being filled.
+        """
+        self.log("⚡ Executing commands...")
+        timeline = self.executor.run(commands, cancelled, should_stop=lambda: not VoiceAssistant.is_active)
+        if Config.EXECUTOR_SETTINGS['trace']:
+            self.log(timeline.format())
         self.log("🗝️ All commands executed")
\ No newline at end of file
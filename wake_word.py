@@ -0,0 +1,201 @@
+# wake_word.py
+"""Local wake-word spotting: energy VAD + MFCC + subsequence DTW.
+
+Enroll a few samples once, then WakeWordDetector.detect() decides locally
+whether a snippet is worth sending to the cloud recognizer:
+
+    python wake_word.py enroll --count 5
+"""
+import argparse
+import glob
+import os
+import time
+import wave
+
+import numpy as np
+
+from vad import speech_bounds, to_float
+
+SAMPLE_RATE = 16000
+
+
+def read_wav(path):
+    """Mono float32 samples at SAMPLE_RATE from a 16-bit PCM WAV file"""
+    with wave.open(path, 'rb') as wav:
+        rate, channels = wav.getframerate(), wav.getnchannels()
+        if wav.getsampwidth() != 2:
+            raise ValueError(f"{path}: only 16-bit PCM is supported")
+        samples = to_float(wav.readframes(wav.getnframes()))
+    if channels > 1:
+        samples = samples.reshape(-1, channels).mean(axis=1)
+    return resample(samples, rate, SAMPLE_RATE)
+
+
+def resample(samples, rate, target):
+    if rate == target or not len(samples):
+        return samples
+    n = int(len(samples) * target / rate)
+    return np.interp(np.linspace(0, len(samples) - 1, n), np.arange(len(samples)), samples).astype(np.float32)
+
+
+class _MfccExtractor:
+    """MFCCs with cepstral mean normalization, filterbank/DCT built once"""
+
+    def __init__(self, rate=SAMPLE_RATE, n_fft=512, n_mels=26, n_mfcc=13, frame_ms=25, hop_ms=10):
+        self.frame = int(rate * frame_ms / 1000)
+        self.hop = int(rate * hop_ms / 1000)
+        self.n_fft = n_fft
+        self.window = np.hamming(self.frame).astype(np.float32)
+
+        def to_mel(hz):
+            return 2595 * np.log10(1 + hz / 700)
+
+        def to_hz(mel):
+            return 700 * (10 ** (mel / 2595) - 1)
+
+        mel_points = to_hz(np.linspace(to_mel(0), to_mel(rate / 2), n_mels + 2))
+        bins = np.floor((n_fft + 1) * mel_points / rate).astype(int)
+        bank = np.zeros((n_mels, n_fft // 2 + 1), dtype=np.float32)
+        for m in range(1, n_mels + 1):
+            left, center, right = bins[m - 1], bins[m], bins[m + 1]
+            bank[m - 1, left:center] = (np.arange(left, center) - left) / max(center - left, 1)
+            bank[m - 1, center:right] = (right - np.arange(center, right)) / max(right - center, 1)
+        self.filterbank = bank.T
+
+        # Orthonormal DCT-II, skipping c0 (overall loudness)
+        k = np.arange(1, n_mfcc + 1)[:, None]
+        n = np.arange(n_mels)[None, :]
+        self.dct = (np.sqrt(2 / n_mels) * np.cos(np.pi * k * (2 * n + 1) / (2 * n_mels))).T.astype(np.float32)
+
+    def __call__(self, samples):
+        samples = np.append(samples[:1], samples[1:] - 0.97 * samples[:-1])  # Pre-emphasis
+        if len(samples) < self.frame:
+            samples = np.pad(samples, (0, self.frame - len(samples)))
+        n_frames = 1 + (len(samples) - self.frame) // self.hop
+        frames = np.lib.stride_tricks.as_strided(
+            samples, (n_frames, self.frame), (samples.strides[0] * self.hop, samples.strides[0]))
+        power = np.abs(np.fft.rfft(frames * self.window, self.n_fft)) ** 2
+        features = np.log(power @ self.filterbank + 1e-10) @ self.dct
+        return (features - features.mean(axis=0)).astype(np.float32)
+
+
+def subsequence_dtw(template, query):
+    """Best length-normalized DTW cost of `template` against any span of `query`.
+
+    Rows follow the template, so the horizontal term of each row is a
+    prefix-min scan: D[j] = S[j] + min_{k<=j}(A[k] - S[k]) with S the
+    cumulative row cost. That keeps the whole recursion vectorized per row.
+    """
+    sq_t = (template * template).sum(axis=1)[:, None]
+    sq_q = (query * query).sum(axis=1)[None, :]
+    cost = np.sqrt(np.maximum(sq_t + sq_q - 2 * template @ query.T, 0))
+
+    prev = cost[0].copy()  # Free start anywhere in the query
+    for row in cost[1:]:
+        diag = np.concatenate(([np.inf], prev[:-1]))
+        enter = row + np.minimum(prev, diag)
+        cumulative = np.cumsum(row)
+        prev = np.minimum.accumulate(enter - cumulative) + cumulative
+    return float(prev.min()) / len(template)  # Free end anywhere
+
+
+class WakeWordDetector:
+    """Matches voiced audio against enrolled wake-word templates"""
+
+    def __init__(self, samples_dir, threshold=None, min_speech=0.2, max_speech=2.5):
+        self.samples_dir = samples_dir
+        self.min_speech = min_speech
+        self.max_speech = max_speech
+        self.extract = _MfccExtractor()
+        self.templates = []
+        for path in sorted(glob.glob(os.path.join(samples_dir, '*.wav'))):
+            voiced = self._voiced(read_wav(path))
+            if voiced is not None:
+                self.templates.append(self.extract(voiced))
+        self.threshold = threshold or self._auto_threshold()
+
+        self.checked = 0
+        self.accepted = 0
+        self.total_seconds = 0.0
+
+    @property
+    def ready(self):
+        return bool(self.templates) and self.threshold is not None
+
+    def _auto_threshold(self):
+        """Loosest distance between enrolled samples, with some slack"""
+        if len(self.templates) < 2:
+            return None
+        distances = [subsequence_dtw(a, b) for i, a in enumerate(self.templates)
+                     for j, b in enumerate(self.templates) if i != j]
+        return max(distances) * 1.25
+
+    def _voiced(self, samples):
+        bounds = speech_bounds(samples, SAMPLE_RATE)
+        if bounds is None:
+            return None
+        return samples[bounds[0]:bounds[1]]
+
+    def score(self, samples):
+        """Best template distance for float samples at SAMPLE_RATE, None if no speech.
+
+        Only the first `max_speech` seconds of speech are matched; the wake
+        word opens the phrase, and DTW cost grows with the query length.
+        """
+        voiced = self._voiced(samples)
+        if voiced is None or len(voiced) < self.min_speech * SAMPLE_RATE:
+            return None
+        query = self.extract(voiced[:int(self.max_speech * SAMPLE_RATE)])
+        return min(subsequence_dtw(template, query) for template in self.templates)
+
+    def detect(self, pcm, rate=SAMPLE_RATE):
+        """True if 16-bit PCM bytes likely contain the wake word"""
+        start = time.perf_counter()
+        samples = resample(to_float(pcm), rate, SAMPLE_RATE)
+        score = self.score(samples)
+        hit = score is not None and score <= self.threshold
+        self.checked += 1
+        self.accepted += hit
+        self.total_seconds += time.perf_counter() - start
+        return hit
+
+    def stats(self):
+        return {
+            'checked': self.checked,
+            'sent_to_cloud': self.accepted,
+            'mean_ms': self.total_seconds / self.checked * 1000 if self.checked else 0.0,
+        }
+
+
+def enroll(samples_dir, count):
+    import speech_recognition as sr
+
+    os.makedirs(samples_dir, exist_ok=True)
+    recognizer = sr.Recognizer()
+    with sr.Microphone() as source:
+        recognizer.adjust_for_ambient_noise(source, duration=1)
+        for i in range(count):
+            input(f"[{i + 1}/{count}] Press Enter, then say the wake word...")
+            audio = recognizer.listen(source, timeout=5, phrase_time_limit=3)
+            path = os.path.join(samples_dir, f"sample_{int(time.time() * 1000)}.wav")
+            with open(path, 'wb') as f:
+                f.write(audio.get_wav_data(convert_rate=SAMPLE_RATE, convert_width=2))
+            print(f"Saved {path}")
+    detector = WakeWordDetector(samples_dir)
+    print(f"Enrolled {len(detector.templates)} samples, threshold {detector.threshold}")
+
+
+def main():
+    from config import Config
+
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    sub = parser.add_subparsers(dest='command', required=True)
+    p = sub.add_parser('enroll', help="Record wake-word samples from the microphone")
+    p.add_argument('--count', type=int, default=5)
+    p.add_argument('--dir', default=Config.WAKE_WORD_SETTINGS['samples_dir'])
+    args = parser.parse_args()
+    enroll(args.dir, args.count)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,381 @@
+# window_events.py
+"""Push notifications for top-level windows appearing, closing and taking focus.
+
+    watcher = create_watcher().start()
+    mark = watcher.mark()
+    subprocess.Popen(...)
+    event = watcher.wait_for_window(mark, timeout=7)
+
+Windows uses WinEvent hooks, Linux/X11 watches _NET_CLIENT_LIST on the root
+window (or MapNotify when no window manager runs, e.g. bare Xvfb). Anything
+else falls back to polling a window list.
+
+    python window_events.py                 # print events as they happen
+    python window_events.py --launch xterm  # time from launch to window
+"""
+import argparse
+import platform
+import subprocess
+import sys
+import time
+from collections import deque, namedtuple
+from threading import Thread, Condition, Event
+
+WindowEvent = namedtuple('WindowEvent', 'seq kind handle pid title window_class time')
+
+
+class WindowWatcher:
+    """Base class: a background thread feeding events to waiters and callbacks"""
+
+    name = 'base'
+    reports_titles = False  # Emits 'title' events when a window is retitled
+
+    def __init__(self, history=256):
+        self._cond = Condition()
+        self._events = deque(maxlen=history)
+        self._seq = 0
+        self._callbacks = []
+        self._stop = Event()
+        self._ready = Event()
+        self._error = None
+        self._thread = None
+
+    def start(self, timeout=2.0):
+        """Start watching; raises if the platform hook could not be installed"""
+        self._thread = Thread(target=self._guarded_run, daemon=True)
+        self._thread.start()
+        self._ready.wait(timeout)
+        if self._error:
+            raise self._error
+        return self
+
+    def stop(self):
+        self._stop.set()
+        if self._thread:
+            self._thread.join(timeout=1.0)
+
+    def subscribe(self, callback):
+        """callback(event) runs on the watcher thread for every event"""
+        self._callbacks.append(callback)
+
+    def mark(self):
+        """Position in the event stream; pass it to wait_for_window"""
+        with self._cond:
+            return self._seq
+
+    def wait_for_window(self, after, pid=None, timeout=7.0):
+        """First window created after `mark()` returned `after`, or None on timeout.
+
+        With `pid`, only windows owned by that process count (watchers that
+        cannot tell the owner report pid None, which always matches).
+        """
+        return self.wait_for_event(after, ('created',), timeout,
+                                   lambda event: pid is None or event.pid in (None, pid))
+
+    def wait_for_event(self, after, kinds, timeout, predicate=None):
+        """First event of one of `kinds` after `after` that passes `predicate`, or None"""
+        deadline = time.perf_counter() + timeout
+        with self._cond:
+            while True:
+                for event in self._events:
+                    if event.seq > after and event.kind in kinds and (predicate is None or predicate(event)):
+                        return event
+                remaining = deadline - time.perf_counter()
+                if remaining <= 0:
+                    return None
+                self._cond.wait(remaining)
+
+    def _emit(self, kind, handle, pid=None, title='', window_class=None):
+        with self._cond:
+            self._seq += 1
+            event = WindowEvent(self._seq, kind, handle, pid, title, window_class, time.perf_counter())
+            self._events.append(event)
+            self._cond.notify_all()
+        for callback in self._callbacks:
+            try:
+                callback(event)
+            except Exception as e:
+                print(f"Window event callback failed: {e}")
+
+    def _guarded_run(self):
+        try:
+            self._run()
+        except Exception as e:
+            self._error = e
+            self._ready.set()
+
+    def _run(self):
+        raise NotImplementedError
+
+
+class Win32WindowWatcher(WindowWatcher):
+    """SetWinEventHook on show/destroy/foreground/title, out of context (no DLL injection)"""
+
+    name = 'win32'
+    reports_titles = True
+
+    EVENT_SYSTEM_FOREGROUND = 0x0003
+    EVENT_OBJECT_DESTROY = 0x8001
+    EVENT_OBJECT_SHOW = 0x8002
+    EVENT_OBJECT_NAMECHANGE = 0x800C
+    WINEVENT_OUTOFCONTEXT = 0x0000
+    WINEVENT_SKIPOWNPROCESS = 0x0002
+    OBJID_WINDOW = 0
+    GA_ROOT = 2
+    GW_OWNER = 4
+    GWL_EXSTYLE = -20
+    WS_EX_TOOLWINDOW = 0x00000080
+    WM_QUIT = 0x0012
+
+    def _run(self):
+        import ctypes
+        from ctypes import wintypes
+
+        user32 = ctypes.windll.user32
+        kernel32 = ctypes.windll.kernel32
+        self._user32 = user32
+        self._thread_id = kernel32.GetCurrentThreadId()
+
+        WinEventProc = ctypes.WINFUNCTYPE(None, wintypes.HANDLE, wintypes.DWORD, wintypes.HWND,
+                                          wintypes.LONG, wintypes.LONG, wintypes.DWORD, wintypes.DWORD)
+        user32.SetWinEventHook.restype = wintypes.HANDLE
+        user32.SetWinEventHook.argtypes = [wintypes.DWORD, wintypes.DWORD, wintypes.HMODULE, WinEventProc,
+                                           wintypes.DWORD, wintypes.DWORD, wintypes.DWORD]
+        user32.GetAncestor.restype = wintypes.HWND
+        user32.GetWindow.restype = wintypes.HWND
+
+        # Windows that already exist are not "new"
+        known = set()
+        EnumProc = ctypes.WINFUNCTYPE(wintypes.BOOL, wintypes.HWND, wintypes.LPARAM)
+        user32.EnumWindows(EnumProc(lambda hwnd, _: known.add(hwnd) or True), 0)
+
+        def callback(hook, event, hwnd, id_object, id_child, thread, time_ms):
+            if id_object != self.OBJID_WINDOW or id_child != 0 or not hwnd:
+                return
+            if event == self.EVENT_OBJECT_DESTROY:
+                if hwnd in known:
+                    known.discard(hwnd)
+                    self._emit('destroyed', hwnd)
+            elif event == self.EVENT_OBJECT_SHOW:
+                if hwnd not in known and self._is_app_window(hwnd):
+                    known.add(hwnd)
+                    self._emit('created', hwnd, *self._describe(hwnd))
+            elif event == self.EVENT_OBJECT_NAMECHANGE:
+                if hwnd in known:
+                    self._emit('title', hwnd, *self._describe(hwnd))
+            elif event == self.EVENT_SYSTEM_FOREGROUND:
+                self._emit('focus', hwnd, *self._describe(hwnd))
+
+        # Keep the ctypes callback alive as long as the hooks are installed
+        self._proc = WinEventProc(callback)
+        flags = self.WINEVENT_OUTOFCONTEXT | self.WINEVENT_SKIPOWNPROCESS
+        hooks = [
+            user32.SetWinEventHook(self.EVENT_OBJECT_DESTROY, self.EVENT_OBJECT_SHOW, 0, self._proc, 0, 0, flags),
+            user32.SetWinEventHook(self.EVENT_SYSTEM_FOREGROUND, self.EVENT_SYSTEM_FOREGROUND, 0,
+                                   self._proc, 0, 0, flags),
+            user32.SetWinEventHook(self.EVENT_OBJECT_NAMECHANGE, self.EVENT_OBJECT_NAMECHANGE, 0,
+                                   self._proc, 0, 0, flags),
+        ]
+        if not all(hooks):
+            raise OSError("SetWinEventHook failed")
+        self._ready.set()
+
+        # Hook callbacks are delivered through this thread's message loop
+        msg = wintypes.MSG()
+        while user32.GetMessageW(ctypes.byref(msg), 0, 0, 0) > 0:
+            user32.TranslateMessage(ctypes.byref(msg))
+            user32.DispatchMessageW(ctypes.byref(msg))
+        for hook in hooks:
+            user32.UnhookWinEvent(hook)
+
+    def stop(self):
+        self._stop.set()
+        if getattr(self, '_thread_id', None):
+            self._user32.PostThreadMessageW(self._thread_id, self.WM_QUIT, 0, 0)
+        if self._thread:
+            self._thread.join(timeout=1.0)
+
+    def _is_app_window(self, hwnd):
+        """Visible, unowned, top-level and not a tool window: what Alt+Tab shows"""
+        user32 = self._user32
+        return (user32.IsWindowVisible(hwnd) and
+                user32.GetAncestor(hwnd, self.GA_ROOT) == hwnd and
+                not user32.GetWindow(hwnd, self.GW_OWNER) and
+                not user32.GetWindowLongW(hwnd, self.GWL_EXSTYLE) & self.WS_EX_TOOLWINDOW)
+
+    def _describe(self, hwnd):
+        """(pid, title, class) of a window"""
+        import ctypes
+        from ctypes import wintypes
+
+        pid = wintypes.DWORD()
+        self._user32.GetWindowThreadProcessId(hwnd, ctypes.byref(pid))
+        length = self._user32.GetWindowTextLengthW(hwnd)
+        title = ctypes.create_unicode_buffer(length + 1)
+        self._user32.GetWindowTextW(hwnd, title, length + 1)
+        window_class = ctypes.create_unicode_buffer(256)
+        self._user32.GetClassNameW(hwnd, window_class, 256)
+        return pid.value, title.value, window_class.value
+
+
+class X11WindowWatcher(WindowWatcher):
+    """PropertyNotify on the root's _NET_CLIENT_LIST / _NET_ACTIVE_WINDOW.
+
+    Without an EWMH window manager (bare Xvfb) nobody maintains the client
+    list, so top-level MapNotify/DestroyNotify events are used instead.
+    """
+
+    name = 'x11'
+
+    def _run(self):
+        import select
+        from Xlib import X, display
+
+        self._display = d = display.Display()
+        root = d.screen().root
+        self._atoms = {name: d.intern_atom(name) for name in
+                       ('_NET_CLIENT_LIST', '_NET_ACTIVE_WINDOW', '_NET_WM_PID', '_NET_WM_NAME', 'UTF8_STRING')}
+        client_list = self._atoms['_NET_CLIENT_LIST']
+        active = self._atoms['_NET_ACTIVE_WINDOW']
+
+        has_wm = root.get_full_property(client_list, X.AnyPropertyType) is not None
+        if has_wm:
+            root.change_attributes(event_mask=X.PropertyChangeMask)
+            known = set(self._client_list(root))
+        else:
+            root.change_attributes(event_mask=X.PropertyChangeMask | X.SubstructureNotifyMask)
+            known = {w.id for w in root.query_tree().children}
+        d.flush()
+        self._ready.set()
+
+        while not self._stop.is_set():
+            # Wake up now and then to notice stop()
+            if not d.pending_events() and not select.select([d], [], [], 0.2)[0]:
+                continue
+            for _ in range(d.pending_events() or 1):
+                event = d.next_event()
+                if event.type == X.PropertyNotify and event.atom == client_list:
+                    current = set(self._client_list(root))
+                    for wid in current - known:
+                        self._emit('created', wid, *self._describe(d.create_resource_object('window', wid)))
+                    for wid in known - current:
+                        self._emit('destroyed', wid)
+                    known = current
+                elif event.type == X.PropertyNotify and event.atom == active:
+                    prop = root.get_full_property(active, X.AnyPropertyType)
+                    if prop and prop.value[0]:
+                        wid = prop.value[0]
+                        self._emit('focus', wid, *self._describe(d.create_resource_object('window', wid)))
+                elif event.type == X.MapNotify and not has_wm:
+                    if not event.override_redirect and event.window.id not in known:
+                        known.add(event.window.id)
+                        self._emit('created', event.window.id, *self._describe(event.window))
+                elif event.type == X.DestroyNotify and not has_wm:
+                    if event.window.id in known:
+                        known.discard(event.window.id)
+                        self._emit('destroyed', event.window.id)
+        d.close()
+
+    def _client_list(self, root):
+        from Xlib import X
+
+        prop = root.get_full_property(self._atoms['_NET_CLIENT_LIST'], X.AnyPropertyType)
+        return list(prop.value) if prop else []
+
+    def _describe(self, window):
+        """(pid, title, class) of an X window; the window may already be gone"""
+        from Xlib import X
+
+        try:
+            prop = window.get_full_property(self._atoms['_NET_WM_PID'], X.AnyPropertyType)
+            pid = prop.value[0] if prop else None
+            name = window.get_full_property(self._atoms['_NET_WM_NAME'], self._atoms['UTF8_STRING'])
+            title = name.value.decode('utf-8', 'replace') if name else (window.get_wm_name() or '')
+            wm_class = window.get_wm_class()
+            return pid, title, wm_class[-1] if wm_class else None
+        except Exception:
+            return None, '', None
+
+
+class PollingWindowWatcher(WindowWatcher):
+    """Fallback: diff `snapshot()` (a set of titles) every `interval` seconds"""
+
+    name = 'poll'
+
+    def __init__(self, snapshot=None, interval=0.1):
+        super().__init__()
+        if snapshot is None:
+            from window_utils import get_all_open_windows as snapshot
+        self.snapshot = snapshot
+        self.interval = interval
+
+    def _run(self):
+        known = set(self.snapshot())
+        self._ready.set()
+        while not self._stop.wait(self.interval):
+            current = set(self.snapshot())
+            for title in current - known:
+                self._emit('created', title, None, title)
+            for title in known - current:
+                self._emit('destroyed', title, None, title)
+            known = current
+
+
+def create_watcher(kind='auto', poll_interval=0.1):
+    """The best watcher for this platform, started; falls back to polling.
+
+    If even polling fails, returns an idle base WindowWatcher: marks work and
+    every wait runs to its timeout, so plans still execute, just slower.
+    """
+    if kind == 'auto':
+        if platform.system() == 'Windows':
+            kind = 'win32'
+        elif platform.system() == 'Linux':
+            kind = 'x11'
+        else:
+            kind = 'poll'
+    watchers = {'win32': Win32WindowWatcher, 'x11': X11WindowWatcher}
+    if kind in watchers:
+        try:
+            return watchers[kind]().start()
+        except Exception as e:
+            print(f"Window events unavailable ({kind}: {e}), polling instead")
+    try:
+        return PollingWindowWatcher(interval=poll_interval).start()
+    except Exception as e:
+        print(f"Window polling unavailable ({e}); readiness waits will time out")
+        return WindowWatcher()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Print window events")
+    parser.add_argument("--kind", default='auto', choices=['auto', 'win32', 'x11', 'poll'])
+    parser.add_argument("--launch", help="command to start; reports when its window appears")
+    parser.add_argument("--timeout", type=float, default=10.0)
+    args = parser.parse_args()
+
+    watcher = create_watcher(args.kind)
+    print(f"Watching with {watcher.name}")
+    if args.launch:
+        mark = watcher.mark()
+        start = time.perf_counter()
+        process = subprocess.Popen(args.launch, shell=True)
+        event = watcher.wait_for_window(mark, timeout=args.timeout)
+        if event is None:
+            print(f"No window within {args.timeout} s")
+        else:
+            print(f"Window '{event.title}' (pid {event.pid}, launched pid {process.pid}) "
+                  f"after {(event.time - start) * 1000:.0f} ms")
+        watcher.stop()
+        return
+    watcher.subscribe(lambda e: print(f"{e.kind:9} {e.handle} pid={e.pid} {e.title!r}"))
+    try:
+        while True:
+            time.sleep(1)
+    except KeyboardInterrupt:
+        watcher.stop()
+        sys.exit(0)
+
+
+if __name__ == "__main__":
+    main()
@@ -1,6 +1,9 @@
 import platform
 import sys
 import os
+import time
+from collections import namedtuple
+from threading import Lock
 
 def get_active_window():
     """Get current focused window title"""
@@ -17,12 +20,25 @@ def get_active_window():
     except Exception as e:
         print(f"Window detection error: {e}")
         return "Unknown"
-    
-import winreg
 
+def get_active_window_class():
+    """Get the focused window's class (stable across documents, unlike the title)"""
+    try:
+        if platform.system() == 'Windows':
+            import win32gui
+            return win32gui.GetClassName(win32gui.GetForegroundWindow())
+        elif platform.system() == 'Linux':
+            from subprocess import check_output
+            return check_output(['xdotool', 'getwindowfocus', 'getwindowclassname']).decode().strip()
+    except Exception:
+        pass
+    # "notes.txt - Notepad" -> "Notepad"
+    return get_active_window().rsplit(' - ', 1)[-1]
 
 def find_installed_app(app_name):
     """Search Windows registry for application paths"""
+    import winreg
+
     locations = [
         (winreg.HKEY_LOCAL_MACHINE, r"SOFTWARE\Microsoft\Windows\CurrentVersion\App Paths"),
         (winreg.HKEY_CURRENT_USER, r"SOFTWARE\Microsoft\Windows\CurrentVersion\App Paths")
@@ -43,14 +59,183 @@ def find_installed_app(app_name):
             
     return None
 
-import win32gui
-
 def get_all_open_windows():
     """Fast window detection using Win32 API"""
+    import win32gui
+
     def callback(hwnd, windows):
         if win32gui.IsWindowVisible(hwnd):
             windows.append(win32gui.GetWindowText(hwnd))
         return True
     windows = []
     win32gui.EnumWindows(callback, windows)
-    return set(windows)
\ No newline at end of file
+    return set(windows)
+
+
+WindowInfo = namedtuple('WindowInfo', 'handle pid title window_class')
+
+
+def enumerate_windows():
+    """(every visible top-level window as WindowInfo, focused handle), in one pass"""
+    if platform.system() == 'Windows':
+        import win32gui
+        import win32process
+
+        windows = []
+
+        def callback(hwnd, _):
+            if win32gui.IsWindowVisible(hwnd):
+                _, pid = win32process.GetWindowThreadProcessId(hwnd)
+                windows.append(WindowInfo(hwnd, pid, win32gui.GetWindowText(hwnd), win32gui.GetClassName(hwnd)))
+            return True
+
+        win32gui.EnumWindows(callback, None)
+        return windows, win32gui.GetForegroundWindow()
+    if platform.system() == 'Linux':
+        return _enumerate_x11()
+    raise OSError(f"Window enumeration not supported on {platform.system()}")
+
+
+_x11 = None
+
+
+def _enumerate_x11():
+    """Same as enumerate_windows via the EWMH client list; one X connection, no subprocesses"""
+    global _x11
+    from Xlib import X, display
+
+    if _x11 is None:
+        d = display.Display()
+        _x11 = (d, {name: d.intern_atom(name) for name in
+                    ('_NET_CLIENT_LIST', '_NET_ACTIVE_WINDOW', '_NET_WM_PID', '_NET_WM_NAME', 'UTF8_STRING')})
+    d, atoms = _x11
+    root = d.screen().root
+    prop = root.get_full_property(atoms['_NET_CLIENT_LIST'], X.AnyPropertyType)
+    windows = []
+    for wid in (prop.value if prop else []):
+        window = d.create_resource_object('window', wid)
+        try:
+            pid = window.get_full_property(atoms['_NET_WM_PID'], X.AnyPropertyType)
+            name = window.get_full_property(atoms['_NET_WM_NAME'], atoms['UTF8_STRING'])
+            wm_class = window.get_wm_class()
+        except Exception:
+            continue  # Closed while we were looking
+        windows.append(WindowInfo(
+            wid,
+            pid.value[0] if pid else None,
+            name.value.decode('utf-8', 'replace') if name else (window.get_wm_name() or ''),
+            wm_class[-1] if wm_class else None
+        ))
+    active = root.get_full_property(atoms['_NET_ACTIVE_WINDOW'], X.AnyPropertyType)
+    return windows, active.value[0] if active else None
+
+
+class WindowRegistry:
+    """In-memory snapshot of the top-level windows and which one has focus.
+
+    Queries are dictionary lookups; no syscall or subprocess. The snapshot is
+    re-enumerated when it is older than `max_age` seconds, so answers are
+    never staler than that. With a window_events watcher attached, windows
+    opening, closing and taking focus update it in place as they happen; if
+    the watcher also reports retitles, `max_age` is relaxed since it then
+    only bounds drift the watcher cannot see.
+    """
+
+    def __init__(self, max_age=0.25, enumerate=enumerate_windows):
+        self.max_age = max_age
+        self._enumerate = enumerate
+        self._lock = Lock()
+        self._windows = {}  # handle -> WindowInfo
+        self._titles = None  # Cached set of titles, rebuilt after changes
+        self._focus = None
+        self._refreshed = 0.0
+        self.stats = {'queries': 0, 'refreshes': 0, 'events': 0, 'refresh_total': 0.0}
+
+    def attach(self, watcher, max_age=5.0):
+        """Apply `watcher`'s events as they arrive; relax to `max_age` only if it reports retitles"""
+        if watcher.name != 'poll':  # Poll events are keyed by title, not handle
+            watcher.subscribe(self._on_event)
+        if watcher.reports_titles:
+            self.max_age = max_age
+
+    def refresh(self):
+        """Re-enumerate every window now"""
+        start = time.perf_counter()
+        try:
+            windows, focus = self._enumerate()
+        except Exception as e:
+            print(f"Window enumeration error: {e}")
+            windows, focus = [], None
+        with self._lock:
+            self._windows = {w.handle: w for w in windows}
+            self._titles = None
+            self._focus = focus
+            self._refreshed = time.perf_counter()
+        self.stats['refreshes'] += 1
+        self.stats['refresh_total'] += time.perf_counter() - start
+
+    @property
+    def age(self):
+        """Seconds since the last full enumeration"""
+        return time.perf_counter() - self._refreshed
+
+    def _fresh(self, max_age=None):
+        self.stats['queries'] += 1
+        if time.perf_counter() - self._refreshed > (self.max_age if max_age is None else max_age):
+            self.refresh()
+
+    def _on_event(self, event):
+        self.stats['events'] += 1
+        with self._lock:
+            if event.kind == 'destroyed':
+                self._windows.pop(event.handle, None)
+                if self._focus == event.handle:
+                    self._focus = None
+            else:
+                self._windows[event.handle] = WindowInfo(event.handle, event.pid, event.title, event.window_class)
+                if event.kind == 'focus':
+                    self._focus = event.handle
+            self._titles = None
+
+    def active(self, max_age=None):
+        """WindowInfo of the focused window, or None; `max_age` tightens the bound"""
+        self._fresh(max_age)
+        return self._windows.get(self._focus)
+
+    def active_title(self, max_age=None):
+        window = self.active(max_age)
+        return window.title if window else "Unknown"
+
+    def active_class(self, max_age=None):
+        window = self.active(max_age)
+        if window is None:
+            return "Unknown"
+        # "notes.txt - Notepad" -> "Notepad" when the class is unknown
+        return window.window_class or window.title.rsplit(' - ', 1)[-1]
+
+    def titles(self):
+        """Set of visible window titles, like get_all_open_windows()"""
+        self._fresh()
+        with self._lock:
+            if self._titles is None:
+                self._titles = frozenset(w.title for w in self._windows.values())
+            return self._titles
+
+    def get(self, handle):
+        self._fresh()
+        return self._windows.get(handle)
+
+    def windows(self):
+        self._fresh()
+        return list(self._windows.values())
+
+
+_registry = None
+
+
+def window_registry():
+    """Process-wide WindowRegistry"""
+    global _registry
+    if _registry is None:
+        _registry = WindowRegistry()
+    return _registry